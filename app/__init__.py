@@ -0,0 +1,4 @@
+import time
+
+# Taken before any app module loads, so the startup report can tell import time apart from warm-up.
+IMPORT_STARTED = time.perf_counter()
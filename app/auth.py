@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import logging
+import time
+
 import jwt
 import httpx
 from fastapi import Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
 from app.config import get_settings
+from app.services.cache import TTLCache
 from app.services.supabase_client import get_supabase_client
 
+logger = logging.getLogger(__name__)
+
+# Minimum gap between JWKS fetches triggered by an unknown ``kid``.
+_JWKS_MIN_REFETCH_SECONDS = 30
+
 
 class AuthenticatedUser(BaseModel):
     user_id: str
@@ -16,6 +27,108 @@ class AuthenticatedUser(BaseModel):
     is_admin: bool = False
 
 
+_auth_http: httpx.AsyncClient | None = None
+_token_cache: TTLCache[str, dict] | None = None
+
+
+def _get_auth_http() -> httpx.AsyncClient:
+    global _auth_http
+    if _auth_http is None:
+        settings = get_settings()
+        _auth_http = httpx.AsyncClient(
+            base_url=str(settings.supabase_url).rstrip("/"),
+            timeout=10,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            http2=True,
+        )
+    return _auth_http
+
+
+def _get_token_cache() -> TTLCache[str, dict]:
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TTLCache(maxsize=get_settings().token_cache_size)
+    return _token_cache
+
+
+def token_cache_stats() -> dict[str, int]:
+    return _get_token_cache().stats()
+
+
+async def close_auth_client() -> None:
+    global _auth_http
+    if _auth_http is not None:
+        await _auth_http.aclose()
+        _auth_http = None
+
+
+class _JWKSKeys:
+    """Signing keys from Supabase's JWKS endpoint, refreshed periodically and on unknown ``kid``."""
+
+    def __init__(self) -> None:
+        self._keys: dict[str, tuple[str, jwt.PyJWK]] = {}
+        self._fetched_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _age(self) -> float:
+        return float("inf") if self._fetched_at is None else time.monotonic() - self._fetched_at
+
+    async def get(self, kid: str | None) -> tuple[str, jwt.PyJWK] | None:
+        age = self._age()
+        if age > get_settings().jwks_refresh_seconds or (kid not in self._keys and age > _JWKS_MIN_REFETCH_SECONDS):
+            await self.refresh()
+        return self._keys.get(kid)
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            if self._age() <= _JWKS_MIN_REFETCH_SECONDS:
+                return
+            self._fetched_at = time.monotonic()
+            try:
+                response = await _get_auth_http().get("/auth/v1/.well-known/jwks.json")
+                response.raise_for_status()
+                jwks = response.json().get("keys", [])
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning("JWKS refresh failed, keeping %d cached keys: %s", len(self._keys), exc)
+                return
+            keys = {}
+            for jwk in jwks:
+                if not jwk.get("kid") or not jwk.get("alg"):
+                    continue
+                try:
+                    keys[jwk["kid"]] = (jwk["alg"], jwt.PyJWK(jwk, algorithm=jwk["alg"]))
+                except jwt.PyJWTError as exc:
+                    # e.g. a key type or curve PyJWT does not support.
+                    logger.warning("Skipping unusable JWKS key %s: %s", jwk["kid"], exc)
+            self._keys = keys
+
+
+_jwks = _JWKSKeys()
+
+
+async def warm_auth() -> None:
+    """Fetch the JWKS, and with it open the auth connection, unless tokens are checked with ``JWT_SECRET``."""
+    if not get_settings().jwt_secret:
+        await _jwks.refresh()
+
+
+async def _validate_with_jwks(token: str) -> dict | None:
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    if not header.get("kid"):
+        return None
+    entry = await _jwks.get(header["kid"])
+    if entry is None or entry[0] != header.get("alg"):
+        return None
+    algorithm, key = entry
+    try:
+        return jwt.decode(token, key.key, algorithms=[algorithm], options={"verify_aud": False})
+    except jwt.PyJWTError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+
+
 async def _validate_with_supabase(token: str) -> dict:
     settings = get_settings()
     if not settings.supabase_anon_key:
@@ -24,27 +137,52 @@ async def _validate_with_supabase(token: str) -> dict:
         "Authorization": f"Bearer {token}",
         "apikey": settings.supabase_anon_key,
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(f"{settings.supabase_url}/auth/v1/user", headers=headers)
+    response = await _get_auth_http().get("/auth/v1/user", headers=headers)
     if response.status_code != 200:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     return response.json()
 
 
-async def get_current_user(request: Request) -> AuthenticatedUser:
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
-    token = auth_header.split(" ", 1)[1]
+def _cache_ttl(token: str, payload: dict) -> float:
+    ttl = float(get_settings().token_cache_ttl_seconds)
+    exp = payload.get("exp")
+    if exp is None:
+        try:
+            exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+        except jwt.PyJWTError:
+            exp = None
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    return ttl
+
+
+async def _verify_token(token: str) -> dict:
+    cache = _get_token_cache()
+    key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = cache.get(key)
+    if payload is not None:
+        return payload
+
     settings = get_settings()
-    payload = None
     if settings.jwt_secret:
         try:
             payload = jwt.decode(token, settings.jwt_secret, algorithms=["HS256"], options={"verify_aud": False})
         except jwt.PyJWTError as exc:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
     else:
-        payload = await _validate_with_supabase(token)
+        payload = await _validate_with_jwks(token)
+        if payload is None:
+            payload = await _validate_with_supabase(token)
+    cache.set(key, payload, ttl=_cache_ttl(token, payload))
+    return payload
+
+
+async def get_current_user(request: Request) -> AuthenticatedUser:
+    auth_header = request.headers.get("Authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
+    token = auth_header.split(" ", 1)[1]
+    payload = await _verify_token(token)
     user_id = payload.get("sub") or payload.get("id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
@@ -65,5 +203,5 @@ async def get_admin_user(user: AuthenticatedUser = Depends(get_current_user)) ->
 
 async def ensure_user_record(user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
     client = get_supabase_client()
-    client.ensure_user(user)
+    await client.ensure_user(user)
     return user
@@ -15,6 +15,56 @@ class Settings(BaseModel):
     dossier_bucket: str = "dossiers"
     max_upload_mb: int = 10
     enable_admin_audit: bool = True
+    supabase_max_connections: int = 100
+    supabase_max_keepalive: int = 20
+    supabase_timeout_seconds: float = 10.0
+    token_cache_size: int = 10000
+    token_cache_ttl_seconds: int = 300
+    jwks_refresh_seconds: int = 600
+    known_user_cache_size: int = 50000
+    db_pool_min_size: int = 1
+    db_pool_max_size: int = 10
+    db_pool_health_check_seconds: float = 30.0
+    audit_queue_size: int = 10000
+    audit_batch_size: int = 100
+    audit_flush_interval_seconds: float = 1.0
+    dossier_job_store: str = "supabase"
+    dossier_job_db_path: str = "dossier_jobs.sqlite3"
+    dossier_job_concurrency: int = 2
+    dossier_job_stale_seconds: int = 600
+    dossier_render_processes: int = 2
+    signed_url_cache_size: int = 10000
+    signed_url_min_remaining_seconds: int = 300
+    signed_url_negative_ttl_seconds: int = 30
+    filing_cache_size: int = 10000
+    filing_cache_ttl_seconds: float = 10.0
+    blockchain_anchor_mode: str = "single"
+    anchor_batch_size: int = 256
+    anchor_batch_wait_seconds: float = 2.0
+    blockchain_rpc_max_connections: int = 10
+    blockchain_rpc_concurrency: int = 10
+    blockchain_rpc_timeout_seconds: float = 10.0
+    blockchain_rpc_retries: int = 3
+    ml_batch_chunk_size: int = 500
+    ml_batch_max_items: int = 50000
+    audit_export_page_size: int = 1000
+    metrics_enabled: bool = True
+    profile_store: str = "local"
+    profile_dir: str = "profiles"
+    profile_sample_interval_ms: float = 5.0
+    profile_keep: int = 100
+    startup_warmup: bool = True
+    startup_warmup_timeout_seconds: float = 10.0
+    generate_dossier_concurrency: int = 4
+    upload_concurrency: int = 16
+    finalize_concurrency: int = 16
+    per_user_concurrency: int = 2
+    admission_queue_size: int = 32
+    admission_queue_timeout_seconds: float = 10.0
+    admission_retry_after_seconds: int = 2
+    idempotency_store: str = "supabase"
+    idempotency_ttl_seconds: int = 86400
+    idempotency_lock_seconds: float = 120.0
 
 
 @lru_cache
@@ -31,4 +81,54 @@ def get_settings() -> Settings:
         dossier_bucket=os.getenv("SUPABASE_DOSSIER_BUCKET", "dossiers"),
         max_upload_mb=int(os.getenv("MAX_UPLOAD_MB", "10")),
         enable_admin_audit=os.getenv("ENABLE_ADMIN_AUDIT", "true").lower() == "true",
+        supabase_max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100")),
+        supabase_max_keepalive=int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20")),
+        supabase_timeout_seconds=float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "10")),
+        token_cache_size=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+        token_cache_ttl_seconds=int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300")),
+        jwks_refresh_seconds=int(os.getenv("JWKS_REFRESH_SECONDS", "600")),
+        known_user_cache_size=int(os.getenv("KNOWN_USER_CACHE_SIZE", "50000")),
+        db_pool_min_size=int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        db_pool_max_size=int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        db_pool_health_check_seconds=float(os.getenv("DB_POOL_HEALTH_CHECK_SECONDS", "30")),
+        audit_queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+        audit_batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "100")),
+        audit_flush_interval_seconds=float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1")),
+        dossier_job_store=os.getenv("DOSSIER_JOB_STORE", "supabase"),
+        dossier_job_db_path=os.getenv("DOSSIER_JOB_DB_PATH", "dossier_jobs.sqlite3"),
+        dossier_job_concurrency=int(os.getenv("DOSSIER_JOB_CONCURRENCY", "2")),
+        dossier_job_stale_seconds=int(os.getenv("DOSSIER_JOB_STALE_SECONDS", "600")),
+        dossier_render_processes=int(os.getenv("DOSSIER_RENDER_PROCESSES", "2")),
+        signed_url_cache_size=int(os.getenv("SIGNED_URL_CACHE_SIZE", "10000")),
+        signed_url_min_remaining_seconds=int(os.getenv("SIGNED_URL_MIN_REMAINING_SECONDS", "300")),
+        signed_url_negative_ttl_seconds=int(os.getenv("SIGNED_URL_NEGATIVE_TTL_SECONDS", "30")),
+        filing_cache_size=int(os.getenv("FILING_CACHE_SIZE", "10000")),
+        filing_cache_ttl_seconds=float(os.getenv("FILING_CACHE_TTL_SECONDS", "10")),
+        blockchain_anchor_mode=os.getenv("BLOCKCHAIN_ANCHOR_MODE", "single"),
+        anchor_batch_size=int(os.getenv("ANCHOR_BATCH_SIZE", "256")),
+        anchor_batch_wait_seconds=float(os.getenv("ANCHOR_BATCH_WAIT_SECONDS", "2")),
+        blockchain_rpc_max_connections=int(os.getenv("BLOCKCHAIN_RPC_MAX_CONNECTIONS", "10")),
+        blockchain_rpc_concurrency=int(os.getenv("BLOCKCHAIN_RPC_CONCURRENCY", "10")),
+        blockchain_rpc_timeout_seconds=float(os.getenv("BLOCKCHAIN_RPC_TIMEOUT_SECONDS", "10")),
+        blockchain_rpc_retries=int(os.getenv("BLOCKCHAIN_RPC_RETRIES", "3")),
+        ml_batch_chunk_size=int(os.getenv("ML_BATCH_CHUNK_SIZE", "500")),
+        ml_batch_max_items=int(os.getenv("ML_BATCH_MAX_ITEMS", "50000")),
+        audit_export_page_size=int(os.getenv("AUDIT_EXPORT_PAGE_SIZE", "1000")),
+        metrics_enabled=os.getenv("METRICS_ENABLED", "true").lower() == "true",
+        profile_store=os.getenv("PROFILE_STORE", "local"),
+        profile_dir=os.getenv("PROFILE_DIR", "profiles"),
+        profile_sample_interval_ms=float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")),
+        profile_keep=int(os.getenv("PROFILE_KEEP", "100")),
+        startup_warmup=os.getenv("STARTUP_WARMUP", "true").lower() == "true",
+        startup_warmup_timeout_seconds=float(os.getenv("STARTUP_WARMUP_TIMEOUT_SECONDS", "10")),
+        generate_dossier_concurrency=int(os.getenv("GENERATE_DOSSIER_CONCURRENCY", "4")),
+        upload_concurrency=int(os.getenv("UPLOAD_CONCURRENCY", "16")),
+        finalize_concurrency=int(os.getenv("FINALIZE_CONCURRENCY", "16")),
+        per_user_concurrency=int(os.getenv("PER_USER_CONCURRENCY", "2")),
+        admission_queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "32")),
+        admission_queue_timeout_seconds=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "10")),
+        admission_retry_after_seconds=int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "2")),
+        idempotency_store=os.getenv("IDEMPOTENCY_STORE", "supabase"),
+        idempotency_ttl_seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+        idempotency_lock_seconds=float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120")),
     )
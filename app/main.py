@@ -1,11 +1,61 @@
 import logging
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
 
-from app.routers import auth, filing, documents, ml_results, finalize, dossier, reports, audit
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.auth import close_auth_client
+from app.config import get_settings
+from app.middleware import (
+    AdmissionControlMiddleware,
+    IdempotencyMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    UploadSizeLimitMiddleware,
+)
+from app.routers import auth, filing, documents, ml_results, finalize, dossier, reports, audit, blockchain, profiles
+from app.services.anchoring import close_anchor_batcher
+from app.services.audit import close_audit_sink, start_audit_sink
+from app.services.db import close_db_pool
+from app.services.dossier import shutdown_render_executor
+from app.services.jobs import close_job_runner, start_job_runner
+from app.services.metrics import get_metrics_registry, set_metrics_enabled
+from app.services.rpc import close_rpc_client
+from app.services.startup import report_startup, warm_up
+from app.services.supabase_client import close_supabase_client
 
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI(title="DhanRakshak Backend", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    set_metrics_enabled(get_settings().metrics_enabled)
+    await warm_up()
+    start_audit_sink()
+    await start_job_runner()
+    report_startup(started)
+    yield
+    await close_anchor_batcher()
+    await close_rpc_client()
+    await close_job_runner()
+    shutdown_render_executor()
+    await close_audit_sink()
+    await close_db_pool()
+    await close_supabase_client()
+    await close_auth_client()
+
+
+app = FastAPI(title="DhanRakshak Backend", version="1.0.0", lifespan=lifespan)
+# Innermost, so profiles cover the request handling itself rather than the other middleware.
+app.add_middleware(ProfilingMiddleware)
+# Inside the upload size check, so oversized uploads are refused without taking a slot.
+app.add_middleware(AdmissionControlMiddleware)
+# Outside admission control, so replays never wait for or take a slot.
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(UploadSizeLimitMiddleware, paths=("/documents/upload",))
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(filing.router)
@@ -15,8 +65,18 @@ app.include_router(finalize.router)
 app.include_router(dossier.router)
 app.include_router(reports.router)
 app.include_router(audit.router)
+app.include_router(blockchain.router)
+app.include_router(profiles.router)
 
 
 @app.get("/health")
 async def health() -> dict:
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    registry = get_metrics_registry()
+    if not registry.enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Metrics disabled")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.auth import get_admin_user, get_current_user
+from app.config import Settings, get_settings
+from app.services import idempotency
+from app.services.admission import USER_LIMIT, AdmissionRejected, ConcurrencyLimiter, UserSlots, route_limits
+from app.services.metrics import get_metrics_registry
+from app.services.profiler import SamplingProfiler, collapsed, get_profile_store, new_profile_id
+
+logger = logging.getLogger(__name__)
+
+REUSED_KEY = "Idempotency-Key reused for a different request"
+
+# Slack for multipart boundaries and part headers on top of the file size limit.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Rejects upload bodies above ``MAX_UPLOAD_MB`` before they are parsed or spooled.
+
+    Requests with a larger Content-Length are refused without reading the body, and
+    chunked or mis-declared bodies are cut off as soon as the byte count crosses the limit.
+    """
+
+    def __init__(self, app: ASGIApp, paths: tuple[str, ...]) -> None:
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        limit = get_settings().max_upload_mb * 1024 * 1024 + MULTIPART_OVERHEAD_BYTES
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._too_large(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Answer here rather than raise: readers outside FastAPI's exception handling
+                    # (other middleware draining the body) would turn an exception into a 500.
+                    rejected = True
+                    if not response_started:
+                        await self._too_large(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if rejected:
+                return  # the 400 has been sent; drop whatever the app makes of the disconnect
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+            logger.debug("Upload cut off at %d bytes", received, exc_info=True)
+
+    @staticmethod
+    async def _too_large(scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse({"detail": "File too large"}, status_code=status.HTTP_400_BAD_REQUEST)
+        await response(scope, receive, send)
+
+
+class AdmissionControlMiddleware:
+    """Caps concurrent POSTs on expensive routes, per route and per user, before the body is read.
+
+    Each route in ``route_limits`` runs up to its limit at once and queues up to
+    ``ADMISSION_QUEUE_SIZE`` more for at most ``ADMISSION_QUEUE_TIMEOUT_SECONDS``; anything beyond
+    that gets a 503. A user who already has ``PER_USER_CONCURRENCY`` requests running or queued
+    on the route gets a 429 without queueing. Both responses carry ``Retry-After``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._settings: Settings | None = None
+        self._guards: dict[str, tuple[ConcurrencyLimiter, UserSlots | None]] = {}
+        registry = get_metrics_registry()
+        self._registry = registry
+        self._rejections = registry.counter(
+            "dhanrakshak_admission_rejections_total", "Requests turned away by admission control.", ("route", "reason")
+        )
+        self._wait = registry.histogram(
+            "dhanrakshak_admission_wait_seconds", "Time admitted requests spent queued for a slot.", ("route",)
+        )
+        registry.gauge(
+            "dhanrakshak_admission_queue_depth",
+            "Requests queued for a slot, by route.",
+            lambda: {(path,): limiter.queued for path, (limiter, _) in self._guards.items()},
+            ("route",),
+        )
+        registry.gauge(
+            "dhanrakshak_admission_active",
+            "Requests holding a slot, by route.",
+            lambda: {(path,): limiter.active for path, (limiter, _) in self._guards.items()},
+            ("route",),
+        )
+
+    def _guard(self, path: str) -> tuple[ConcurrencyLimiter, UserSlots | None] | None:
+        settings = get_settings()
+        if settings is not self._settings:
+            # Limits are read once per settings instance, i.e. once per worker outside tests.
+            self._settings = settings
+            self._guards = {
+                route: (
+                    ConcurrencyLimiter(limit, settings.admission_queue_size, settings.admission_queue_timeout_seconds),
+                    UserSlots(settings.per_user_concurrency) if settings.per_user_concurrency > 0 else None,
+                )
+                for route, limit in route_limits(settings).items()
+                if limit > 0
+            }
+        return self._guards.get(path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        guard = self._guard(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if guard is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter, users = guard
+        user_id = None
+        if users is not None:
+            try:
+                user_id = (await get_current_user(Request(scope))).user_id
+            except HTTPException:
+                pass  # the route answers 401 itself
+        start = time.perf_counter()
+        try:
+            if user_id is not None:
+                users.take(user_id)
+            try:
+                await limiter.acquire()
+            except AdmissionRejected:
+                if user_id is not None:
+                    users.give_back(user_id)
+                raise
+        except AdmissionRejected as exc:
+            self._rejections.labels(scope["path"], exc.reason).inc()
+            if exc.reason == USER_LIMIT:
+                status_code, detail = status.HTTP_429_TOO_MANY_REQUESTS, "Too many concurrent requests"
+            else:
+                status_code, detail = status.HTTP_503_SERVICE_UNAVAILABLE, "Server busy"
+            headers = {"Retry-After": str(get_settings().admission_retry_after_seconds)}
+            await JSONResponse({"detail": detail}, status_code=status_code, headers=headers)(scope, receive, send)
+            return
+
+        if self._registry.enabled:
+            self._wait.labels(scope["path"]).observe(time.perf_counter() - start)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+            if user_id is not None:
+                users.give_back(user_id)
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response for a repeated ``Idempotency-Key`` instead of redoing the request.
+
+    Applies to authenticated POST, PUT, PATCH and DELETE requests that send the header. Keys
+    are scoped to the user. A repeat must match the method, path, query and body of the
+    original, or it gets a 422. A repeat that arrives while the original is still running waits
+    for it, for up to ``IDEMPOTENCY_LOCK_SECONDS``. Server errors, retryable statuses, oversized
+    responses and responses marked ``Cache-Control: no-store`` (e.g. ones carrying a signed URL that
+    expires long before the key would) are not stored, so retrying those redoes the request.
+    """
+
+    methods = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        key = None
+        if scope["type"] == "http" and scope["method"] in self.methods:
+            key = next((value for name, value in scope["headers"] if name == b"idempotency-key"), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = key.decode("latin-1")
+        if not key or len(key) > idempotency.MAX_KEY_LENGTH:
+            await self._error(scope, receive, send, status.HTTP_400_BAD_REQUEST, "Invalid Idempotency-Key")
+            return
+        try:
+            user_id = (await get_current_user(Request(scope))).user_id
+        except HTTPException:
+            await self.app(scope, receive, send)  # the route answers 401 itself
+            return
+
+        settings = get_settings()
+        store = idempotency.get_idempotency_store()
+        fingerprint = idempotency.request_hash(scope["method"], scope["path"], scope.get("query_string", b""))
+        deadline = time.monotonic() + settings.idempotency_lock_seconds
+        delay = 0.01
+        while True:
+            record = await store.reserve(user_id, key, fingerprint, settings.idempotency_lock_seconds)
+            if record is None:
+                await self._run_original(scope, receive, send, store, user_id, key)
+                return
+            if record["request_hash"] != fingerprint:
+                await self._error(scope, receive, send, status.HTTP_422_UNPROCESSABLE_ENTITY, REUSED_KEY)
+                return
+            if record["status"] == idempotency.COMPLETED:
+                await self._replay(scope, receive, send, record)
+                return
+            if time.monotonic() >= deadline:
+                await self._error(
+                    scope, receive, send, status.HTTP_409_CONFLICT, "A request with this Idempotency-Key is in progress"
+                )
+                return
+            # The original may be on another worker, so poll; if it fails, its key is released
+            # and the next reserve makes this request the original.
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+    async def _run_original(
+        self, scope: Scope, receive: Receive, send: Send, store: idempotency.IdempotencyStore, user_id: str, key: str
+    ) -> None:
+        hasher = idempotency.BodyHasher(idempotency.multipart_boundary(scope["headers"]))
+        body_done = False
+        status_code = 500
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        size = 0
+        no_store = False
+
+        async def hashing_receive() -> Message:
+            nonlocal body_done
+            message = await receive()
+            if message["type"] == "http.request":
+                hasher.update(message.get("body", b""))
+                body_done = not message.get("more_body", False)
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status_code, headers, size, no_store
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                no_store = idempotency.marked_no_store(message.get("headers", []))
+                headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in idempotency.UNSTORED_HEADERS
+                ]
+            elif message["type"] == "http.response.body" and size <= idempotency.MAX_STORED_RESPONSE_BYTES:
+                body = message.get("body", b"")
+                size += len(body)
+                chunks.append(body)
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+            storable = (
+                not no_store
+                and status_code < 500
+                and status_code not in idempotency.RETRYABLE_STATUSES
+                and size <= idempotency.MAX_STORED_RESPONSE_BYTES
+            )
+            if storable:
+                # Routes that answer before reading the whole body (validation errors) still
+                # need the full body hashed, so a repeat is compared against all of it.
+                while not body_done:
+                    message = await hashing_receive()
+                    if message["type"] == "http.disconnect":
+                        break
+                if body_done:
+                    response = idempotency.response_record(status_code, headers, b"".join(chunks))
+                    ttl = get_settings().idempotency_ttl_seconds
+                    await store.complete(user_id, key, hasher.hexdigest(), response, ttl)
+                    stored = True
+        finally:
+            if not stored:
+                await store.release(user_id, key)
+
+    async def _replay(self, scope: Scope, receive: Receive, send: Send, record: dict[str, Any]) -> None:
+        hasher = idempotency.BodyHasher(idempotency.multipart_boundary(scope["headers"]))
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            hasher.update(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        if hasher.hexdigest() != record["body_hash"]:
+            await self._error(scope, receive, send, status.HTTP_422_UNPROCESSABLE_ENTITY, REUSED_KEY)
+            return
+        status_code, headers, body = idempotency.replayed_response(record)
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _error(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str) -> None:
+        await JSONResponse({"detail": detail}, status_code=status_code)(scope, receive, send)
+
+
+class MetricsMiddleware:
+    """Counts requests and records their latency per method, route template and status.
+
+    Routes are labelled by their template (``/filing/{filing_id}``), never the raw path, so
+    label cardinality stays bounded. Does nothing but pass through when metrics are disabled.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.in_flight = 0
+        self._route_paths: dict[Any, str] | None = None
+        registry = get_metrics_registry()
+        self._registry = registry
+        self._requests = registry.counter(
+            "dhanrakshak_http_requests_total", "HTTP requests handled.", ("method", "route", "status")
+        )
+        self._latency = registry.histogram(
+            "dhanrakshak_http_request_duration_seconds",
+            "HTTP request latency, until the last body byte is sent.",
+            ("method", "route", "status"),
+        )
+        registry.gauge("dhanrakshak_http_requests_in_flight", "HTTP requests being handled.", lambda: {(): self.in_flight})
+
+    def _route(self, scope: Scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            self._route_paths = {route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")}
+        return self._route_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.in_flight -= 1
+            labels = (scope["method"], self._route(scope), str(status_code))
+            self._latency.labels(*labels).observe(time.perf_counter() - start)
+            self._requests.labels(*labels).inc()
+
+
+class ProfilingMiddleware:
+    """Runs a request under the sampling profiler when an admin sends ``X-Profile: 1`` or ``?profile=1``.
+
+    The profile id is returned in ``X-Profile-Id`` and the collapsed stacks are saved to the
+    profile store once the response has been sent. Requests without the flag pay for one
+    header scan and a substring check on the query string.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        if any(name == b"x-profile" and value == b"1" for name, value in scope["headers"]):
+            return True
+        query = scope.get("query_string", b"")
+        return b"profile=" in query and parse_qs(query.decode("latin-1")).get("profile") == ["1"]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await get_admin_user(await get_current_user(Request(scope)))
+        except HTTPException as exc:
+            response = JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+            await response(scope, receive, send)
+            return
+
+        profile_id = new_profile_id(scope["method"], scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler = SamplingProfiler(
+            threading.get_ident(),
+            interval=get_settings().profile_sample_interval_ms / 1000,
+            loop=asyncio.get_running_loop(),
+            task=asyncio.current_task(),
+        )
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = await asyncio.to_thread(profiler.stop)
+            try:
+                await get_profile_store().save(profile_id, collapsed(stacks))
+            except Exception:
+                logger.exception("Failed to save profile %s", profile_id)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any
+from datetime import datetime
+from typing import Any, Literal
 from pydantic import BaseModel, Field
 
 
@@ -17,6 +18,7 @@ class FilingResponse(BaseModel):
 class UploadDocumentResponse(BaseModel):
     document_id: str
     storage_path: str
+    sha256: str | None = None
 
 
 class MLResultRequest(BaseModel):
@@ -25,6 +27,24 @@ class MLResultRequest(BaseModel):
     risk_flags: dict[str, str] | None = None
 
 
+class MLBatchItemResult(BaseModel):
+    index: int
+    status: str
+    filing_id: str | None = None
+    ml_result_id: str | None = None
+    error: str | None = None
+
+
+class MLBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    failed: int
+    partial: int = 0
+    # True when the body held more than ML_BATCH_MAX_ITEMS items; those after the limit were not read.
+    truncated: bool = False
+    results: list[MLBatchItemResult]
+
+
 class FinalizeRequest(BaseModel):
     filing_id: str
 
@@ -33,6 +53,35 @@ class GenerateDossierRequest(BaseModel):
     filing_id: str
 
 
+class MerkleProofStep(BaseModel):
+    side: Literal["left", "right"]
+    hash: str
+
+
+class VerifyProofRequest(BaseModel):
+    payload_hash: str
+    merkle_root: str
+    merkle_proof: list[MerkleProofStep]
+
+
+class VerifyProofResponse(BaseModel):
+    verified: bool
+    payload_hash: str
+    merkle_root: str
+    merkle_proof: list[MerkleProofStep]
+    filing_id: str | None = None
+    tx_hash: str | None = None
+
+
+class DossierJobResponse(BaseModel):
+    job_id: str
+    filing_id: str
+    status: str
+    dossier_path: str | None = None
+    signed_url: str | None = None
+    error: str | None = None
+
+
 class FilingDetailResponse(BaseModel):
     filing: dict[str, Any]
     documents: list[dict[str, Any]]
@@ -40,5 +89,24 @@ class FilingDetailResponse(BaseModel):
     risk_flags: dict[str, Any] | None
 
 
+class AuditLogFilter(BaseModel):
+    user_id: str | None = None
+    event_type: str | None = None
+    filing_id: str | None = None
+    since: datetime | None = None
+    until: datetime | None = None
+
+
 class AuditLogResponse(BaseModel):
     logs: list[dict[str, Any]] = Field(default_factory=list)
+    next_cursor: str | None = None
+
+
+class ProfileInfo(BaseModel):
+    profile_id: str
+    size: int | None = None
+    created_at: str | None = None
+
+
+class ProfileListResponse(BaseModel):
+    profiles: list[ProfileInfo] = Field(default_factory=list)
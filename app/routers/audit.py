@@ -1,16 +1,57 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
 from app.auth import AuthenticatedUser, get_admin_user
-from app.models import AuditLogResponse
+from app.config import get_settings
+from app.models import AuditLogFilter, AuditLogResponse
+from app.services.audit import csv_lines, decode_audit_cursor, encode_audit_cursor, iter_audit_logs, ndjson_lines
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/audit", tags=["audit"])
 
 
+def audit_filter(
+    user_id: str | None = None,
+    event_type: str | None = None,
+    filing_id: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> AuditLogFilter:
+    return AuditLogFilter(user_id=user_id, event_type=event_type, filing_id=filing_id, since=since, until=until)
+
+
 @router.get("", response_model=AuditLogResponse)
 async def list_audit_logs(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: str | None = None,
+    filters: AuditLogFilter = Depends(audit_filter),
     user: AuthenticatedUser = Depends(get_admin_user),
 ) -> AuditLogResponse:
     client = get_supabase_client()
-    logs = client.list_audit_logs()
-    return AuditLogResponse(logs=logs)
+    try:
+        after = decode_audit_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    # One extra row tells whether another page exists without a trailing empty page.
+    logs = await client.list_audit_logs(limit=limit + 1, after=after, **filters.model_dump(exclude_none=True))
+    next_cursor = encode_audit_cursor(logs[limit - 1]) if len(logs) > limit else None
+    return AuditLogResponse(logs=logs[:limit], next_cursor=next_cursor)
+
+
+@router.get("/export")
+async def export_audit_logs(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: AuditLogFilter = Depends(audit_filter),
+    user: AuthenticatedUser = Depends(get_admin_user),
+) -> StreamingResponse:
+    rows = iter_audit_logs(get_settings().audit_export_page_size, **filters.model_dump(exclude_none=True))
+    if format == "csv":
+        return StreamingResponse(
+            csv_lines(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="audit_logs.csv"'},
+        )
+    return StreamingResponse(ndjson_lines(rows), media_type="application/x-ndjson")
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 
-from app.auth import AuthenticatedUser, ensure_user_record
+from app.auth import AuthenticatedUser, ensure_user_record, get_admin_user, token_cache_stats
+from app.services.audit import get_audit_sink
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -8,6 +9,15 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.post("/init")
 async def init_user(user: AuthenticatedUser = Depends(ensure_user_record)) -> dict:
-    client = get_supabase_client()
-    client.insert_audit(user.user_id, "USER_LOGIN", {"email": user.email})
+    await get_audit_sink().emit(user.user_id, "USER_LOGIN", {"email": user.email})
     return {"user_id": user.user_id, "email": user.email}
+
+
+@router.get("/cache-stats")
+async def cache_stats(user: AuthenticatedUser = Depends(get_admin_user)) -> dict:
+    client = get_supabase_client()
+    return {
+        "token_cache": token_cache_stats(),
+        "signed_url_cache": client.signed_url_cache_stats(),
+        "filing_cache": client.filing_cache_stats(),
+    }
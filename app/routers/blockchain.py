@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.auth import AuthenticatedUser, ensure_user_record
+from app.models import VerifyProofRequest, VerifyProofResponse
+from app.services import blockchain
+from app.services.loader import FilingLoader, get_filing_loader
+
+router = APIRouter(prefix="/blockchain", tags=["blockchain"])
+
+
+@router.get("/verify/{filing_id}", response_model=VerifyProofResponse)
+async def verify_filing_anchor(
+    filing_id: str,
+    loader: FilingLoader = Depends(get_filing_loader),
+) -> VerifyProofResponse:
+    record = await loader.blockchain_record(filing_id)
+    if not record:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blockchain record not found")
+    if not record.get("merkle_root"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Filing was not batch-anchored")
+    proof = record.get("merkle_proof") or []
+    return VerifyProofResponse(
+        verified=blockchain.verify_merkle_proof(record["payload_hash"], proof, record["merkle_root"]),
+        payload_hash=record["payload_hash"],
+        merkle_root=record["merkle_root"],
+        merkle_proof=proof,
+        filing_id=filing_id,
+        tx_hash=record["tx_hash"],
+    )
+
+
+@router.post("/verify", response_model=VerifyProofResponse)
+async def verify_proof(
+    payload: VerifyProofRequest,
+    user: AuthenticatedUser = Depends(ensure_user_record),
+) -> VerifyProofResponse:
+    proof = [step.model_dump() for step in payload.merkle_proof]
+    return VerifyProofResponse(
+        verified=blockchain.verify_merkle_proof(payload.payload_hash, proof, payload.merkle_root),
+        payload_hash=payload.payload_hash,
+        merkle_root=payload.merkle_root,
+        merkle_proof=payload.merkle_proof,
+    )
@@ -1,13 +1,31 @@
+import hashlib
+from typing import AsyncIterator
+
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 
 from app.auth import AuthenticatedUser, ensure_user_record
 from app.config import get_settings
 from app.models import UploadDocumentResponse
+from app.services.audit import get_audit_sink
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
 ALLOWED_CONTENT_TYPES = {"application/pdf", "image/png", "image/jpeg"}
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+_MAGIC_NUMBERS = {
+    b"%PDF-": "application/pdf",
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+}
+
+
+def _sniff_content_type(head: bytes) -> str | None:
+    for magic, content_type in _MAGIC_NUMBERS.items():
+        if head.startswith(magic):
+            return content_type
+    return None
 
 
 @router.post("/upload", response_model=UploadDocumentResponse)
@@ -19,15 +37,33 @@ async def upload_document(
     settings = get_settings()
     if file.content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type")
-    content = await file.read()
+    head = await file.read(UPLOAD_CHUNK_SIZE)
+    if _sniff_content_type(head) != file.content_type:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File content does not match file type")
+
     max_bytes = settings.max_upload_mb * 1024 * 1024
-    if len(content) > max_bytes:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large")
+    digest = hashlib.sha256()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        size = 0
+        chunk = head
+        while chunk:
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File too large")
+            digest.update(chunk)
+            yield chunk
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
 
     client = get_supabase_client()
     storage_path = f"{user.user_id}/{filing_id}/form16.pdf"
-    client.upload_file(settings.storage_bucket, storage_path, content, file.content_type)
-    document = client.insert_document(filing_id, user.user_id, storage_path, file.content_type)
-    client.update_filing_status(filing_id, user.user_id, "DOCUMENT_UPLOADED")
-    client.insert_audit(user.user_id, "FORM16_UPLOADED", {"filing_id": filing_id, "document_id": document["id"]})
-    return UploadDocumentResponse(document_id=document["id"], storage_path=storage_path)
+    await client.upload_stream(settings.storage_bucket, storage_path, chunks(), file.content_type)
+    sha256 = digest.hexdigest()
+    document = await client.insert_document(filing_id, user.user_id, storage_path, file.content_type, sha256=sha256)
+    await client.update_filing_status(filing_id, user.user_id, "DOCUMENT_UPLOADED")
+    await get_audit_sink().emit(
+        user.user_id,
+        "FORM16_UPLOADED",
+        {"filing_id": filing_id, "document_id": document["id"], "sha256": sha256},
+    )
+    return UploadDocumentResponse(document_id=document["id"], storage_path=storage_path, sha256=sha256)
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from app.auth import AuthenticatedUser, ensure_user_record
 from app.config import get_settings
-from app.models import GenerateDossierRequest
-from app.services.dossier import build_dossier
+from app.models import DossierJobResponse, GenerateDossierRequest
+from app.services.dossier import DossierError, cached_dossier_path, load_dossier_inputs, produce_dossier
+from app.services.jobs import DONE, get_job_runner
+from app.services.loader import FilingLoader, get_filing_loader
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="", tags=["dossier"])
@@ -12,36 +16,52 @@ router = APIRouter(prefix="", tags=["dossier"])
 @router.post("/generate-dossier")
 async def generate_dossier(
     payload: GenerateDossierRequest,
+    response: Response,
+    mode: Literal["sync", "async"] = "sync",
     user: AuthenticatedUser = Depends(ensure_user_record),
+    loader: FilingLoader = Depends(get_filing_loader),
 ) -> dict:
     client = get_supabase_client()
     settings = get_settings()
-    filing = client.get_filing(payload.filing_id, user.user_id)
-    if not filing:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Filing not found")
-    if filing.get("status") != "FINAL":
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Filing not finalized")
-
-    blockchain_record = client.get_blockchain_record(payload.filing_id, user.user_id)
-    if not blockchain_record:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blockchain record missing")
-
-    documents = client.get_documents(payload.filing_id, user.user_id)
-    if not documents:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Form-16 required")
-
-    form16_doc = documents[0]
-    form16_bytes = client.download_file(settings.storage_bucket, form16_doc["storage_path"])
-
-    summary_data = {
-        "filing_id": payload.filing_id,
-        "status": filing.get("status"),
-    }
-
-    full_name = filing.get("metadata", {}).get("full_name") or user.full_name or "Unknown"
-    dossier_bytes = build_dossier(form16_bytes, summary_data, full_name, blockchain_record["tx_hash"])
-    dossier_path = client.store_dossier(settings.dossier_bucket, payload.filing_id, dossier_bytes)
-    client.insert_audit(user.user_id, "DOSSIER_GENERATED", {"filing_id": payload.filing_id})
-
-    signed_url = client.create_signed_url(settings.dossier_bucket, dossier_path, expires_in=3600)
+    # One lookup when the dossier is already stored; the filing is only loaded on a miss.
+    dossier_path = cached_dossier_path(payload.filing_id, await loader.blockchain_record(payload.filing_id))
+    if dossier_path is None:
+        try:
+            inputs = await load_dossier_inputs(loader, payload.filing_id, user.full_name)
+        except DossierError as exc:
+            raise HTTPException(status_code=exc.status_code, detail=exc.detail) from exc
+
+        if mode == "async":
+            job = await get_job_runner().enqueue(inputs)
+            response.status_code = status.HTTP_202_ACCEPTED
+            return {"job_id": job["id"], "status": job["status"]}
+
+        dossier_path = await produce_dossier(client, inputs)
+
+    signed_url = await client.create_signed_url(settings.dossier_bucket, dossier_path, expires_in=3600)
+    # The signed URL expires long before an Idempotency-Key would; a retry is answered from the
+    # stored dossier and signs a fresh URL instead of replaying this one.
+    response.headers["Cache-Control"] = "no-store"
     return {"dossier_path": dossier_path, "signed_url": signed_url}
+
+
+@router.get("/dossier-jobs/{job_id}", response_model=DossierJobResponse)
+async def get_dossier_job(
+    job_id: str,
+    user: AuthenticatedUser = Depends(ensure_user_record),
+) -> DossierJobResponse:
+    job = await get_job_runner().store.get(job_id, user.user_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    signed_url = None
+    if job["status"] == DONE:
+        client = get_supabase_client()
+        signed_url = await client.create_signed_url(get_settings().dossier_bucket, job["dossier_path"], expires_in=3600)
+    return DossierJobResponse(
+        job_id=job["id"],
+        filing_id=job["filing_id"],
+        status=job["status"],
+        dossier_path=job.get("dossier_path"),
+        signed_url=signed_url,
+        error=job.get("error"),
+    )
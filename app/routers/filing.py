@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 
 from app.auth import AuthenticatedUser, ensure_user_record
 from app.models import FilingCreateRequest, FilingDetailResponse, FilingResponse
+from app.services.audit import get_audit_sink
 from app.services.supabase_client import get_supabase_client
 
 router = APIRouter(prefix="/filing", tags=["filing"])
@@ -13,20 +14,37 @@ async def create_filing(
     user: AuthenticatedUser = Depends(ensure_user_record),
 ) -> FilingResponse:
     client = get_supabase_client()
-    filing = client.create_filing(user, payload.metadata)
-    client.insert_audit(user.user_id, "FILING_CREATED", {"filing_id": filing["id"]})
+    filing = await client.create_filing(user, payload.metadata)
+    await get_audit_sink().emit(user.user_id, "FILING_CREATED", {"filing_id": filing["id"]})
     return FilingResponse(id=filing["id"], status=filing["status"], metadata=filing.get("metadata", {}))
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
 @router.get("/{filing_id}", response_model=FilingDetailResponse)
 async def get_filing(
     filing_id: str,
+    request: Request,
+    response: Response,
     user: AuthenticatedUser = Depends(ensure_user_record),
-) -> FilingDetailResponse:
+) -> FilingDetailResponse | Response:
     client = get_supabase_client()
-    filing = client.get_filing(filing_id, user.user_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Answer polls for an unchanged filing from the cached ETag alone.
+        etag = client.cached_filing_etag(filing_id, user.user_id)
+        if etag is not None and _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    filing, etag = await client.get_filing_cached(filing_id, user.user_id)
     if not filing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Filing not found")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
     return FilingDetailResponse(
         filing={k: v for k, v in filing.items() if k not in {"documents", "ml_results", "risk_flags"}},
         documents=filing.get("documents", []),
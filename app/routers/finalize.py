@@ -1,9 +1,13 @@
+import asyncio
+
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.auth import AuthenticatedUser, ensure_user_record
+from app.config import get_settings
 from app.models import FinalizeRequest
 from app.services import blockchain
-from app.services.supabase_client import get_supabase_client
+from app.services.anchoring import get_anchor_batcher
+from app.services.loader import FilingLoader, get_filing_loader
 from app.services.transactions import finalize_filing_transaction
 
 router = APIRouter(prefix="", tags=["finalize"])
@@ -13,37 +17,44 @@ router = APIRouter(prefix="", tags=["finalize"])
 async def finalize_filing(
     payload: FinalizeRequest,
     user: AuthenticatedUser = Depends(ensure_user_record),
+    loader: FilingLoader = Depends(get_filing_loader),
 ) -> dict:
-    client = get_supabase_client()
-    filing = client.get_filing(payload.filing_id, user.user_id)
+    filing = await loader.filing(payload.filing_id)
     if not filing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Filing not found")
 
-    documents = client.get_documents(payload.filing_id, user.user_id)
+    documents = await loader.documents(payload.filing_id)
     if not documents:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Form-16 required")
 
-    ml_result = client.get_ml_result(payload.filing_id, user.user_id)
+    ml_result = await loader.ml_result(payload.filing_id)
     if not ml_result:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ML results required")
 
-    payload_hash = blockchain.canonical_hash(
-        {
-            "filing": {k: v for k, v in filing.items() if k not in {"documents", "ml_results", "risk_flags"}},
-            "documents": documents,
-            "ml_results": ml_result,
-        }
-    )
-    tx_hash = blockchain.send_to_blockchain(payload_hash)
+    # Rows written since section hashing carry their hash; anything else is hashed off the event loop.
+    section_hashes = await asyncio.to_thread(blockchain.section_hashes, filing, documents, ml_result)
+    payload_hash = blockchain.payload_hash_from_sections(section_hashes)
+    merkle_root = merkle_proof = None
+    if get_settings().blockchain_anchor_mode == "batch":
+        receipt = await get_anchor_batcher().submit(payload_hash)
+        tx_hash, merkle_root, merkle_proof = receipt.tx_hash, receipt.merkle_root, receipt.merkle_proof
+    else:
+        tx_hash = await blockchain.send_to_blockchain(payload_hash)
 
     try:
-        finalize_filing_transaction(payload.filing_id, user.user_id, tx_hash, payload_hash)
+        await finalize_filing_transaction(
+            payload.filing_id,
+            user.user_id,
+            tx_hash,
+            payload_hash,
+            merkle_root=merkle_root,
+            merkle_proof=merkle_proof,
+            hash_version=blockchain.HASH_VERSION,
+            section_hashes=section_hashes,
+        )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc)) from exc
 
-    client.insert_audit(user.user_id, "BLOCKCHAIN_WRITTEN", {"filing_id": payload.filing_id, "tx_hash": tx_hash})
-    client.insert_audit(user.user_id, "FINALIZED", {"filing_id": payload.filing_id})
-
-    return {"tx_hash": tx_hash, "payload_hash": payload_hash}
+    return {"tx_hash": tx_hash, "payload_hash": payload_hash, "merkle_root": merkle_root}
@@ -1,11 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+import logging
+import uuid
+from collections import Counter
+from typing import Any, AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
 
 from app.auth import AuthenticatedUser, ensure_user_record
-from app.models import MLResultRequest
-from app.services.supabase_client import get_supabase_client
+from app.config import get_settings
+from app.models import MLBatchItemResult, MLBatchResponse, MLResultRequest
+from app.services.audit import get_audit_sink
+from app.services.supabase_client import AsyncSupabaseService, get_supabase_client
+from app.services.transactions import write_ml_results_transaction
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["ml"])
 
+RISK_FLAG_VALUES = {"green", "yellow"}
+ACCEPTED = "ACCEPTED"
+REJECTED = "REJECTED"
+FAILED = "FAILED"
+# The ml_results row was stored but the risk flags or filing status were not.
+PARTIAL = "PARTIAL"
+
+
+def _invalid_risk_flags(risk_flags: dict[str, str] | None) -> bool:
+    return bool(risk_flags) and any(value not in RISK_FLAG_VALUES for value in risk_flags.values())
+
 
 @router.post("/ml-results")
 async def ingest_ml_results(
@@ -13,13 +36,159 @@ async def ingest_ml_results(
     user: AuthenticatedUser = Depends(ensure_user_record),
 ) -> dict:
     client = get_supabase_client()
+    if _invalid_risk_flags(payload.risk_flags):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Risk flags must be green or yellow",
+        )
+    ml_result = await client.insert_ml_results(payload.filing_id, user.user_id, payload.parsed_json)
     if payload.risk_flags:
-        invalid = {value for value in payload.risk_flags.values() if value not in {"green", "yellow"}}
-        if invalid:
-            raise HTTPException(\n                status_code=status.HTTP_400_BAD_REQUEST,\n                detail=\"Risk flags must be green or yellow\",\n            )
-    ml_result = client.insert_ml_results(payload.filing_id, user.user_id, payload.parsed_json)
-    if payload.risk_flags:
-        client.upsert_risk_flags(payload.filing_id, user.user_id, payload.risk_flags)
-    client.update_filing_status(payload.filing_id, user.user_id, "ML_PARSED")
-    client.insert_audit(user.user_id, "ML_RESULT_RECEIVED", {"filing_id": payload.filing_id})
+        await client.upsert_risk_flags(payload.filing_id, user.user_id, payload.risk_flags)
+    await client.update_filing_status(payload.filing_id, user.user_id, "ML_PARSED")
+    await get_audit_sink().emit(user.user_id, "ML_RESULT_RECEIVED", {"filing_id": payload.filing_id})
     return {"ml_result_id": ml_result["id"]}
+
+
+async def _raw_items(request: Request) -> AsyncIterator[str | bytes | dict[str, Any]]:
+    """Yield NDJSON lines as they arrive, or the elements of a JSON array body."""
+    if "ndjson" in request.headers.get("content-type", ""):
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+    try:
+        items = json.loads(await request.body())
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array") from exc
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array")
+    for item in items:
+        yield item
+
+
+def _validate(raw: str | bytes | dict[str, Any]) -> MLResultRequest:
+    if isinstance(raw, (str, bytes)):
+        item = MLResultRequest.model_validate_json(raw)
+    else:
+        item = MLResultRequest.model_validate(raw)
+    try:
+        # filings.id is a uuid column; anything else would fail the whole chunk's ownership lookup.
+        uuid.UUID(item.filing_id)
+    except ValueError:
+        raise ValueError("filing_id must be a UUID") from None
+    if _invalid_risk_flags(item.risk_flags):
+        raise ValueError("Risk flags must be green or yellow")
+    return item
+
+
+async def _write_chunk(
+    client: AsyncSupabaseService,
+    user: AuthenticatedUser,
+    chunk: list[tuple[int, MLResultRequest]],
+) -> list[MLBatchItemResult]:
+    try:
+        owned = await client.get_owned_filing_ids(sorted({item.filing_id for _, item in chunk}), user.user_id)
+    except Exception:
+        logger.exception("Looking up filings for a chunk of %d ML results failed", len(chunk))
+        return _chunk_results(chunk, FAILED, error="Write failed")
+    results = [
+        MLBatchItemResult(index=index, status=REJECTED, filing_id=item.filing_id, error="Filing not found")
+        for index, item in chunk
+        if item.filing_id not in owned
+    ]
+    accepted = [(index, item) for index, item in chunk if item.filing_id in owned]
+    if not accepted:
+        return results
+
+    # Later items win, as they would with one POST /ml-results per item.
+    risk_flags = {item.filing_id: item.risk_flags for _, item in accepted if item.risk_flags}
+    pairs = [(item.filing_id, item.parsed_json) for _, item in accepted]
+    transactional = bool(get_settings().supabase_db_url)
+    try:
+        if transactional:
+            ids = await write_ml_results_transaction(user.user_id, pairs, risk_flags, "ML_PARSED")
+        else:
+            ids = [row["id"] for row in await client.insert_ml_results_batch(user.user_id, pairs)]
+    except Exception:
+        logger.exception("Writing a chunk of %d ML results failed", len(accepted))
+        return results + _chunk_results(accepted, FAILED, error="Write failed")
+    if not transactional:
+        # Separate PostgREST writes: if these fail, the ml_results rows above are already stored.
+        try:
+            if risk_flags:
+                await client.upsert_risk_flags_batch(user.user_id, risk_flags)
+            await client.update_filings_status(sorted({filing_id for filing_id, _ in pairs}), user.user_id, "ML_PARSED")
+        except Exception:
+            logger.exception("Updating filings after %d stored ML results failed", len(accepted))
+            return results + _chunk_results(accepted, PARTIAL, ids, "Stored; risk flags or filing status not updated")
+
+    sink = get_audit_sink()
+    for _, item in accepted:
+        await sink.emit(user.user_id, "ML_RESULT_RECEIVED", {"filing_id": item.filing_id, "batch": True})
+    return results + _chunk_results(accepted, ACCEPTED, ids)
+
+
+def _chunk_results(
+    chunk: list[tuple[int, MLResultRequest]],
+    state: str,
+    ids: list[str] | None = None,
+    error: str | None = None,
+) -> list[MLBatchItemResult]:
+    return [
+        MLBatchItemResult(index=index, status=state, filing_id=item.filing_id, ml_result_id=ml_result_id, error=error)
+        for (index, item), ml_result_id in zip(chunk, ids or [None] * len(chunk))
+    ]
+
+
+@router.post("/ml-results/batch", response_model=MLBatchResponse)
+async def ingest_ml_results_batch(
+    request: Request,
+    user: AuthenticatedUser = Depends(ensure_user_record),
+) -> MLBatchResponse:
+    """Ingest a JSON array or an NDJSON stream of ML results.
+
+    Items are validated as they arrive and written in chunks of ``ML_BATCH_CHUNK_SIZE`` with
+    multi-row inserts; every item gets its own result. Reading stops at ``ML_BATCH_MAX_ITEMS``.
+    """
+    settings = get_settings()
+    client = get_supabase_client()
+    results: list[MLBatchItemResult] = []
+    chunk: list[tuple[int, MLResultRequest]] = []
+    truncated = False
+    index = -1
+    async for raw in _raw_items(request):
+        index += 1
+        if index >= settings.ml_batch_max_items:
+            # The rest of the body is left unread, so work stays bounded however much is sent.
+            truncated = True
+            results.append(MLBatchItemResult(index=index, status=REJECTED, error="Batch item limit exceeded"))
+            break
+        try:
+            item = _validate(raw)
+        except (ValidationError, ValueError) as exc:
+            error = exc.errors()[0]["msg"] if isinstance(exc, ValidationError) else str(exc)
+            results.append(MLBatchItemResult(index=index, status=REJECTED, error=error))
+            continue
+        chunk.append((index, item))
+        if len(chunk) >= settings.ml_batch_chunk_size:
+            results.extend(await _write_chunk(client, user, chunk))
+            chunk = []
+    if chunk:
+        results.extend(await _write_chunk(client, user, chunk))
+
+    results.sort(key=lambda result: result.index)
+    counts = Counter(result.status for result in results)
+    return MLBatchResponse(
+        accepted=counts[ACCEPTED],
+        rejected=counts[REJECTED],
+        failed=counts[FAILED],
+        partial=counts[PARTIAL],
+        truncated=truncated,
+        results=results,
+    )
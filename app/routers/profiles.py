@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import Response
+
+from app.auth import AuthenticatedUser, get_admin_user
+from app.models import ProfileListResponse
+from app.services.profiler import PROFILE_ID, PROFILE_SUFFIX, get_profile_store
+
+router = APIRouter(prefix="/admin/profiles", tags=["profiles"])
+
+
+@router.get("", response_model=ProfileListResponse)
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=1000),
+    user: AuthenticatedUser = Depends(get_admin_user),
+) -> ProfileListResponse:
+    return ProfileListResponse(profiles=await get_profile_store().list(limit))
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, user: AuthenticatedUser = Depends(get_admin_user)) -> Response:
+    data = await get_profile_store().load(profile_id) if PROFILE_ID.match(profile_id) else None
+    if data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return Response(
+        data,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}{PROFILE_SUFFIX}"'},
+    )
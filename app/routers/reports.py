@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from app.auth import AuthenticatedUser, ensure_user_record
 from app.config import get_settings
-from app.services.supabase_client import get_supabase_client
+from app.services.loader import FilingLoader, get_filing_loader
+from app.services.supabase_client import dossier_object_path, get_supabase_client
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
@@ -14,9 +16,29 @@ async def download_report(
 ) -> dict:
     settings = get_settings()
     client = get_supabase_client()
-    dossier_path = f"{filing_id}/dossier.zip"
-    try:
-        signed_url = client.create_signed_url(settings.dossier_bucket, dossier_path, expires_in=3600)
-    except Exception as exc:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier not found") from exc
+    dossier_path = dossier_object_path(filing_id)
+    signed_url = await client.create_signed_url(settings.dossier_bucket, dossier_path, expires_in=3600)
+    if signed_url is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier not found")
     return {"signed_url": signed_url}
+
+
+@router.get("/dossier/{filing_id}")
+async def stream_dossier(
+    filing_id: str,
+    user: AuthenticatedUser = Depends(ensure_user_record),
+    loader: FilingLoader = Depends(get_filing_loader),
+) -> StreamingResponse:
+    settings = get_settings()
+    client = get_supabase_client()
+    filing = await loader.filing(filing_id)
+    if not filing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Filing not found")
+    chunks = await client.stream_file(settings.dossier_bucket, dossier_object_path(filing_id))
+    if chunks is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dossier not found")
+    return StreamingResponse(
+        chunks,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="dossier-{filing_id}.zip"'},
+    )
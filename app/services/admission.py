@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+
+from app.config import Settings
+
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+USER_LIMIT = "user_limit"
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+
+
+class ConcurrencyLimiter:
+    """At most ``limit`` holders at once, with up to ``queue_size`` callers waiting in FIFO order.
+
+    ``acquire`` raises AdmissionRejected straight away when the queue is full, and after
+    ``timeout`` seconds of waiting. A released slot is handed directly to the oldest waiter,
+    so late arrivals cannot overtake the queue.
+    """
+
+    def __init__(self, limit: int, queue_size: int, timeout: float) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise AdmissionRejected(QUEUE_FULL)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            raise AdmissionRejected(QUEUE_TIMEOUT) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away; pass it on.
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _discard(self, waiter: asyncio.Future[None]) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+class UserSlots:
+    """Per-user count of requests admitted or queued on one route."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._counts: dict[str, int] = {}
+
+    def take(self, user_id: str) -> None:
+        count = self._counts.get(user_id, 0)
+        if count >= self.limit:
+            raise AdmissionRejected(USER_LIMIT)
+        self._counts[user_id] = count + 1
+
+    def give_back(self, user_id: str) -> None:
+        count = self._counts.pop(user_id) - 1
+        if count:
+            self._counts[user_id] = count
+
+
+def route_limits(settings: Settings) -> dict[str, int]:
+    """Concurrency limit per guarded POST route; 0 leaves a route unlimited."""
+    return {
+        "/generate-dossier": settings.generate_dossier_concurrency,
+        "/documents/upload": settings.upload_concurrency,
+        "/finalize": settings.finalize_concurrency,
+    }
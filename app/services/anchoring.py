@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from app.config import get_settings
+from app.services.metrics import get_metrics_registry
+from app.services import blockchain
+
+logger = logging.getLogger(__name__)
+
+
+class AnchorReceipt(BaseModel):
+    tx_hash: str
+    merkle_root: str
+    merkle_proof: list[dict[str, str]]
+
+
+class AnchorBatcher:
+    """Anchors payload hashes in batches, one transaction per Merkle root.
+
+    ``submit`` returns once the batch holding its hash is anchored. A batch is closed when
+    ``batch_size`` hashes are pending or ``max_wait`` seconds after its first hash arrived.
+    """
+
+    def __init__(self, anchor: Callable[[str], Awaitable[str]], batch_size: int = 256, max_wait: float = 2.0) -> None:
+        self._anchor = anchor
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[str, asyncio.Future[AnchorReceipt]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, payload_hash: str) -> AnchorReceipt:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[AnchorReceipt] = loop.create_future()
+        self._pending.append((payload_hash, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        # Shielded so one cancelled request does not fail the rest of its batch.
+        return await asyncio.shield(future)
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._anchor_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _anchor_batch(self, batch: list[tuple[str, asyncio.Future[AnchorReceipt]]]) -> None:
+        levels = blockchain.merkle_levels([payload_hash for payload_hash, _ in batch])
+        root = blockchain.merkle_root(levels)
+        try:
+            tx_hash = await self._anchor(root)
+        except Exception as exc:
+            logger.exception("Anchoring a batch of %d payload hashes failed", len(batch))
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(
+                    AnchorReceipt(tx_hash=tx_hash, merkle_root=root, merkle_proof=blockchain.merkle_proof(levels, index))
+                )
+
+    async def close(self) -> None:
+        """Anchor whatever is still pending and wait for in-flight batches."""
+        self._flush()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+async def _anchor_root(merkle_root: str) -> str:
+    # Without BLOCKCHAIN_RPC this is the simulated transaction, which keeps batching testable offline.
+    return await blockchain.send_to_blockchain(merkle_root)
+
+
+_anchor_batcher: AnchorBatcher | None = None
+
+
+def get_anchor_batcher() -> AnchorBatcher:
+    global _anchor_batcher
+    if _anchor_batcher is None:
+        settings = get_settings()
+        _anchor_batcher = AnchorBatcher(
+            _anchor_root,
+            batch_size=settings.anchor_batch_size,
+            max_wait=settings.anchor_batch_wait_seconds,
+        )
+    return _anchor_batcher
+
+
+get_metrics_registry().gauge(
+    "dhanrakshak_anchor_pending_hashes",
+    "Payload hashes waiting for the next anchored batch.",
+    lambda: {(): _anchor_batcher.pending()} if _anchor_batcher is not None else {},
+)
+
+
+async def close_anchor_batcher() -> None:
+    global _anchor_batcher
+    if _anchor_batcher is not None:
+        await _anchor_batcher.close()
+        _anchor_batcher = None
+
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import csv
+import io
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from app.config import get_settings
+from app.services.metrics import get_metrics_registry
+from app.services.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+_WRITE_ATTEMPTS = 3
+_STOP = object()
+
+
+def audit_row(user_id: str, event_type: str, metadata: dict[str, Any] | None = None) -> dict[str, Any]:
+    # created_at is stamped at emit time so rows written in one batch keep their order.
+    return {
+        "user_id": user_id,
+        "event_type": event_type,
+        "metadata": metadata or {},
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def insert_audit_sql(cursor: Any, user_id: str, event_type: str, metadata: dict[str, Any] | None = None) -> None:
+    """Write an audit event on an open psycopg2 cursor, atomically with the surrounding transaction."""
+    from psycopg2.extras import Json
+
+    cursor.execute(
+        "INSERT INTO audit_logs (user_id, event_type, metadata) VALUES (%s, %s, %s)",
+        (user_id, event_type, Json(metadata or {})),
+    )
+
+
+EXPORT_COLUMNS = ("id", "created_at", "user_id", "event_type", "metadata")
+
+
+def encode_audit_cursor(row: dict[str, Any]) -> str:
+    """Opaque cursor for the keyset position just after ``row``."""
+    return base64.urlsafe_b64encode(json.dumps([row["created_at"], row["id"]]).encode()).decode().rstrip("=")
+
+
+def decode_audit_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        # Both values end up inside a PostgREST filter, so only well-formed ones are let through.
+        datetime.fromisoformat(created_at)
+        uuid.UUID(row_id)
+    except (AttributeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid audit cursor") from exc
+    return created_at, row_id
+
+
+async def iter_audit_logs(page_size: int, **filters: Any) -> AsyncIterator[dict[str, Any]]:
+    """Yield every matching audit row newest first, holding at most one page in memory."""
+    client = get_supabase_client()
+    after = None
+    while True:
+        rows = await client.list_audit_logs(limit=page_size, after=after, **filters)
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+async def ndjson_lines(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for row in rows:
+        yield (json.dumps(row, default=str) + "\n").encode()
+
+
+async def csv_lines(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    async for row in rows:
+        writer.writerow(
+            [json.dumps(row.get(column) or {}) if column == "metadata" else row.get(column) for column in EXPORT_COLUMNS]
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class AuditSink:
+    """Queues audit events in memory and writes them to audit_logs as multi-row inserts.
+
+    A single background flusher preserves emit order. ``emit`` only waits when the queue is
+    full, and ``close`` drains everything still queued.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[dict[str, Any]]], Awaitable[None]],
+        max_queue: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self._write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_queue)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def emit(self, user_id: str, event_type: str, metadata: dict[str, Any] | None = None) -> None:
+        row = audit_row(user_id, event_type, metadata)
+        if self._task is None:
+            # No flusher running (e.g. outside the app lifespan): write through.
+            await self._write([row])
+            return
+        await self._queue.put(row)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        await self._queue.put(_STOP)
+        await task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch: list[dict[str, Any]]) -> None:
+        for attempt in range(_WRITE_ATTEMPTS):
+            try:
+                await self._write_batch(batch)
+                return
+            except Exception:
+                if attempt == _WRITE_ATTEMPTS - 1:
+                    logger.exception("Dropping %d audit events after %d attempts", len(batch), _WRITE_ATTEMPTS)
+                    return
+                await asyncio.sleep(0.5 * 2**attempt)
+
+
+async def _write_to_supabase(rows: list[dict[str, Any]]) -> None:
+    await get_supabase_client().insert_audit_batch(rows)
+
+
+_audit_sink: AuditSink | None = None
+
+
+def get_audit_sink() -> AuditSink:
+    global _audit_sink
+    if _audit_sink is None:
+        settings = get_settings()
+        _audit_sink = AuditSink(
+            _write_to_supabase,
+            max_queue=settings.audit_queue_size,
+            batch_size=settings.audit_batch_size,
+            flush_interval=settings.audit_flush_interval_seconds,
+        )
+    return _audit_sink
+
+
+get_metrics_registry().gauge(
+    "dhanrakshak_audit_queue_depth",
+    "Audit events queued and not yet written.",
+    lambda: {(): _audit_sink.pending()} if _audit_sink is not None else {},
+)
+
+
+def start_audit_sink() -> None:
+    get_audit_sink().start()
+
+
+async def close_audit_sink() -> None:
+    global _audit_sink
+    if _audit_sink is not None:
+        await _audit_sink.close()
+        _audit_sink = None
@@ -6,21 +6,89 @@ import os
 import secrets
 from typing import Any
 
-import httpx
-
 from app.config import get_settings
+from app.services.metrics import timed
+from app.services.rpc import get_rpc_client
+
+
+# Scheme used for new payload hashes; blockchain_records.hash_version says how each stored one was built.
+HASH_VERSION = 2
+
+_EMBEDDED = {"documents", "ml_results", "risk_flags"}
+_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@timed("canonical_hash")
+def canonical_hash(payload: Any) -> str:
+    """sha256 of the canonical JSON encoding, fed to the hash chunk by chunk rather than as one string."""
+    digest = hashlib.sha256()
+    for chunk in _ENCODER.iterencode(payload):
+        digest.update(chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def filing_section(filing: dict[str, Any]) -> dict[str, Any]:
+    # Identity and content only: status and timestamps move during finalize itself.
+    return {"id": filing.get("id"), "user_id": filing.get("user_id"), "metadata": filing.get("metadata") or {}}
+
+
+def document_section(document: dict[str, Any]) -> dict[str, Any]:
+    return {key: document.get(key) for key in ("document_type", "storage_path", "content_type", "sha256")}
+
+
+def ml_section(ml_result: dict[str, Any]) -> dict[str, Any]:
+    return {"parsed_json": ml_result.get("parsed_json")}
+
+
+def section_hashes(
+    filing: dict[str, Any],
+    documents: list[dict[str, Any]],
+    ml_result: dict[str, Any],
+    use_stored: bool = True,
+) -> dict[str, Any]:
+    """Version-2 section hashes. Rows carry ``content_hash`` from write time, which is reused unless ``use_stored`` is off."""
+
+    def stored_or(row: dict[str, Any], section: dict[str, Any]) -> str:
+        return (use_stored and row.get("content_hash")) or canonical_hash(section)
+
+    return {
+        "filing": canonical_hash(filing_section(filing)),
+        "documents": sorted(stored_or(document, document_section(document)) for document in documents),
+        "ml_results": stored_or(ml_result, ml_section(ml_result)),
+    }
 
 
-def canonical_hash(payload: dict[str, Any]) -> str:
-    serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+def payload_hash_from_sections(sections: dict[str, Any]) -> str:
+    return canonical_hash({"version": 2, **sections})
+
+
+def compute_payload_hash(
+    version: int,
+    filing: dict[str, Any],
+    documents: list[dict[str, Any]],
+    ml_result: dict[str, Any],
+    use_stored: bool = True,
+) -> str:
+    """Rebuild a payload hash with the scheme it was created under."""
+    if version == 1:
+        return canonical_hash(
+            {
+                "filing": {k: v for k, v in filing.items() if k not in _EMBEDDED},
+                "documents": documents,
+                "ml_results": ml_result,
+            }
+        )
+    if version == 2:
+        return payload_hash_from_sections(section_hashes(filing, documents, ml_result, use_stored=use_stored))
+    raise ValueError(f"Unknown payload hash version {version}")
 
 
 def simulate_tx() -> str:
     return f"SIMULATED_TX_{secrets.token_hex(16)}"
 
 
-def send_to_blockchain(payload_hash: str) -> str:
+@timed("send_to_blockchain")
+async def send_to_blockchain(payload_hash: str) -> str:
     settings = get_settings()
     if not settings.blockchain_rpc:
         return simulate_tx()
@@ -29,15 +97,58 @@ def send_to_blockchain(payload_hash: str) -> str:
     if not private_key:
         return simulate_tx()
 
-    payload = {
-        "jsonrpc": "2.0",
-        "method": "eth_sendRawTransaction",
-        "params": [payload_hash],
-        "id": 1,
-    }
-    response = httpx.post(settings.blockchain_rpc, json=payload, timeout=10)
-    response.raise_for_status()
-    result = response.json().get("result")
+    result = await get_rpc_client().call("eth_sendRawTransaction", [payload_hash])
     if not result:
         return simulate_tx()
     return result
+
+
+# Leaves and interior nodes are hashed with distinct prefixes so a node can never pass as a leaf.
+def _leaf_hash(payload_hash: str) -> bytes:
+    return hashlib.sha256(b"\x00" + payload_hash.encode("utf-8")).digest()
+
+
+def _node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def merkle_levels(payload_hashes: list[str]) -> list[list[bytes]]:
+    """All levels of the Merkle tree over ``payload_hashes``, leaves first and the root last.
+
+    An odd node at the end of a level is carried up unchanged rather than paired with itself.
+    """
+    level = [_leaf_hash(payload_hash) for payload_hash in payload_hashes]
+    levels = [level]
+    while len(level) > 1:
+        parents = [_node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+        level = parents
+    return levels
+
+
+def merkle_root(levels: list[list[bytes]]) -> str:
+    return levels[-1][0].hex()
+
+
+def merkle_proof(levels: list[list[bytes]], index: int) -> list[dict[str, str]]:
+    """Sibling hashes from leaf ``index`` up to the root, each tagged with the side it sits on."""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({"side": "left" if sibling < index else "right", "hash": level[sibling].hex()})
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(payload_hash: str, proof: list[dict[str, str]], root: str) -> bool:
+    node = _leaf_hash(payload_hash)
+    try:
+        for step in proof:
+            sibling = bytes.fromhex(step["hash"])
+            node = _node_hash(sibling, node) if step["side"] == "left" else _node_hash(node, sibling)
+    except (KeyError, TypeError, ValueError):
+        return False
+    return node.hex() == root
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, TypeVar
+
+from app.config import get_settings
+from app.services.metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DatabasePool:
+    """Bounded pool of psycopg2 connections for direct-SQL paths.
+
+    Connections are opened, health-checked and used on worker threads so the event loop
+    never blocks on the database; ``maxconn`` caps how many are checked out at once.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        minconn: int = 1,
+        maxconn: int = 10,
+        health_check_seconds: float = 30.0,
+        connect: Callable[[str], Any] | None = None,
+    ) -> None:
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.health_check_seconds = health_check_seconds
+        self._connect = connect or _psycopg2_connect
+        self._idle: deque[tuple[Any, float]] = deque()
+        self._in_use = 0
+        self._semaphore = asyncio.Semaphore(maxconn)
+        self._closed = False
+
+    async def open(self) -> None:
+        """Open ``minconn`` connections up front so the first requests skip connection setup."""
+        while len(self._idle) < self.minconn:
+            conn = await asyncio.to_thread(self._connect, self.dsn)
+            self._idle.append((conn, time.monotonic()))
+
+    async def _checkout(self) -> Any:
+        while self._idle:
+            conn, last_used = self._idle.pop()
+            if conn.closed:
+                continue
+            if time.monotonic() - last_used < self.health_check_seconds:
+                return conn
+            if await asyncio.to_thread(_is_healthy, conn):
+                return conn
+            _close_quietly(conn)
+        return await asyncio.to_thread(self._connect, self.dsn)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[Any]:
+        if self._closed:
+            raise RuntimeError("Database pool is closed")
+        async with self._semaphore:
+            conn = await self._checkout()
+            self._in_use += 1
+            try:
+                yield conn
+            finally:
+                self._in_use -= 1
+                if conn.closed or self._closed:
+                    _close_quietly(conn)
+                else:
+                    self._idle.append((conn, time.monotonic()))
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run ``fn(conn, *args)`` in one transaction on a worker thread."""
+        async with self.connection() as conn:
+            work = asyncio.ensure_future(asyncio.to_thread(_run_in_transaction, conn, fn, args))
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                # The thread cannot be interrupted, so keep the connection checked out until it is done;
+                # returning it now would hand another request a connection that is mid-transaction.
+                while not work.done():
+                    try:
+                        await asyncio.wait({work})
+                    except asyncio.CancelledError:
+                        pass
+                if not work.cancelled() and work.exception() is not None:
+                    logger.warning("Transaction failed after its caller was cancelled: %s", work.exception())
+                raise
+
+    async def close(self) -> None:
+        self._closed = True
+        while self._idle:
+            conn, _ = self._idle.pop()
+            await asyncio.to_thread(_close_quietly, conn)
+
+    def stats(self) -> dict[str, int]:
+        return {"idle": len(self._idle), "in_use": self._in_use, "max": self.maxconn}
+
+
+def _run_in_transaction(conn: Any, fn: Callable[..., T], args: tuple[Any, ...]) -> T:
+    try:
+        result = fn(conn, *args)
+        conn.commit()
+        return result
+    except BaseException:
+        if not conn.closed:
+            conn.rollback()
+        raise
+
+
+def _psycopg2_connect(dsn: str) -> Any:
+    # Imported on first connect: workers without SUPABASE_DB_URL never load psycopg2.
+    import psycopg2
+
+    return psycopg2.connect(dsn)
+
+
+def _is_healthy(conn: Any) -> bool:
+    import psycopg2
+
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _close_quietly(conn: Any) -> None:
+    import psycopg2
+
+    try:
+        conn.close()
+    except psycopg2.Error:
+        pass
+
+
+_db_pool: DatabasePool | None = None
+
+
+def get_db_pool() -> DatabasePool:
+    global _db_pool
+    if _db_pool is None:
+        settings = get_settings()
+        if not settings.supabase_db_url:
+            raise RuntimeError("SUPABASE_DB_URL required for direct SQL access")
+        _db_pool = DatabasePool(
+            settings.supabase_db_url,
+            minconn=settings.db_pool_min_size,
+            maxconn=settings.db_pool_max_size,
+            health_check_seconds=settings.db_pool_health_check_seconds,
+        )
+    return _db_pool
+
+
+async def init_db_pool() -> None:
+    if not get_settings().supabase_db_url:
+        return
+    import psycopg2
+
+    try:
+        await get_db_pool().open()
+    except psycopg2.Error as exc:
+        logger.warning("Database pool warm-up failed, connecting on demand: %s", exc)
+
+
+def _pool_gauge() -> dict[tuple[str, ...], float]:
+    if _db_pool is None:
+        return {}
+    return {(state,): value for state, value in _db_pool.stats().items()}
+
+
+get_metrics_registry().gauge(
+    "dhanrakshak_db_pool_connections", "Direct-SQL pool connections by state.", _pool_gauge, ("state",)
+)
+
+
+async def close_db_pool() -> None:
+    global _db_pool
+    if _db_pool is not None:
+        await _db_pool.close()
+        _db_pool = None
@@ -1,26 +1,185 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import shutil
+import tempfile
 import zipfile
-from typing import Any
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import IO, TYPE_CHECKING, Any
 
-from app.services.pdf import create_certificate_pdf, create_heatmap_pdf, create_summary_pdf
+from pydantic import BaseModel
 
+from app.config import get_settings
+from app.services.audit import get_audit_sink
+from app.services.metrics import timed
+from app.services.supabase_client import AsyncSupabaseService, dossier_object_path
 
+if TYPE_CHECKING:
+    from app.services.loader import FilingLoader
+
+# Bump whenever the layouts in app.services.pdf change; dossier cache keys include it.
+TEMPLATE_VERSION = 1
+# Archives and downloaded inputs stay in memory up to this size, then spill to disk.
+SPOOL_MAX_BYTES = 1024 * 1024
+# Entries whose sample compresses to more than this fraction are stored, not deflated.
+STORE_RATIO = 0.9
+_SAMPLE_BYTES = 64 * 1024
+_COPY_CHUNK = 256 * 1024
+
+
+def spooled_file() -> IO[bytes]:
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+
+
+def _compress_type(sample: bytes) -> int:
+    if not sample:
+        return zipfile.ZIP_STORED
+    ratio = len(zlib.compress(sample, 1)) / len(sample)
+    return zipfile.ZIP_STORED if ratio > STORE_RATIO else zipfile.ZIP_DEFLATED
+
+
+def _write_entry(zipf: zipfile.ZipFile, name: str, source: IO[bytes] | bytes) -> None:
+    if isinstance(source, bytes):
+        zipf.writestr(name, source, compress_type=_compress_type(source[:_SAMPLE_BYTES]))
+        return
+    sample = source.read(_SAMPLE_BYTES)
+    source.seek(0)
+    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = _compress_type(sample)
+    with zipf.open(info, "w") as entry:
+        shutil.copyfileobj(source, entry, _COPY_CHUNK)
+
+
+@timed("build_dossier")
 def build_dossier(
-    form16_bytes: bytes,
+    form16: IO[bytes],
     summary_data: dict[str, Any],
     full_name: str,
     tx_hash: str,
-) -> bytes:
-    summary_pdf = create_summary_pdf(summary_data)
-    heatmap_pdf = create_heatmap_pdf()
-    certificate_pdf = create_certificate_pdf(full_name, tx_hash)
-
-    buffer = io.BytesIO()
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
-        zipf.writestr("form16.pdf", form16_bytes)
-        zipf.writestr("summary.pdf", summary_pdf)
-        zipf.writestr("heatmap.pdf", heatmap_pdf)
-        zipf.writestr("certificate.pdf", certificate_pdf)
-    return buffer.getvalue()
+    archive: IO[bytes] | None = None,
+) -> IO[bytes]:
+    """Write the dossier ZIP entry by entry into ``archive`` (a spooled temp file by default).
+
+    Each PDF is rendered just before it is written, so at most one entry is held in memory
+    alongside the in-progress archive. The archive is returned rewound.
+    """
+    # ReportLab is imported on first render rather than at startup.
+    from app.services.pdf import create_certificate_pdf, create_heatmap_pdf, create_summary_pdf
+
+    archive = archive if archive is not None else spooled_file()
+    with zipfile.ZipFile(archive, "w") as zipf:
+        _write_entry(zipf, "form16.pdf", form16)
+        _write_entry(zipf, "summary.pdf", create_summary_pdf(summary_data))
+        _write_entry(zipf, "heatmap.pdf", create_heatmap_pdf())
+        _write_entry(zipf, "certificate.pdf", create_certificate_pdf(full_name, tx_hash))
+    archive.seek(0)
+    return archive
+
+
+def build_dossier_file(form16_path: str, summary_data: dict[str, Any], full_name: str, tx_hash: str, archive_path: str) -> None:
+    """Process-pool entry point: build the dossier from and to files on disk."""
+    with open(form16_path, "rb") as form16, open(archive_path, "wb") as archive:
+        build_dossier(form16, summary_data, full_name, tx_hash, archive)
+
+
+class DossierError(Exception):
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class DossierInputs(BaseModel):
+    filing_id: str
+    user_id: str
+    form16_path: str
+    summary_data: dict[str, Any]
+    full_name: str
+    tx_hash: str
+    cache_key: str | None = None
+
+
+def dossier_cache_key(payload_hash: str, tx_hash: str) -> str:
+    """Content address of a dossier: the finalized payload, its anchor and the PDF layout version."""
+    return hashlib.sha256(f"{payload_hash}:{tx_hash}:{TEMPLATE_VERSION}".encode()).hexdigest()
+
+
+def cached_dossier_path(filing_id: str, blockchain_record: dict[str, Any] | None) -> str | None:
+    """Path of the stored dossier when it was built from this record's payload and the current templates."""
+    if not blockchain_record or not blockchain_record.get("dossier_key"):
+        return None
+    expected = dossier_cache_key(blockchain_record["payload_hash"], blockchain_record["tx_hash"])
+    return dossier_object_path(filing_id) if blockchain_record["dossier_key"] == expected else None
+
+
+async def load_dossier_inputs(loader: FilingLoader, filing_id: str, full_name: str | None) -> DossierInputs:
+    """Check that the filing can produce a dossier and collect everything rendering needs."""
+    filing, blockchain_record = await asyncio.gather(loader.filing(filing_id), loader.blockchain_record(filing_id))
+    if not filing:
+        raise DossierError(404, "Filing not found")
+    if filing.get("status") != "FINAL":
+        raise DossierError(400, "Filing not finalized")
+
+    if not blockchain_record:
+        raise DossierError(400, "Blockchain record missing")
+
+    documents = await loader.documents(filing_id)
+    if not documents:
+        raise DossierError(400, "Form-16 required")
+
+    return DossierInputs(
+        filing_id=filing_id,
+        user_id=loader.user_id,
+        form16_path=documents[0]["storage_path"],
+        summary_data={"filing_id": filing_id, "status": filing.get("status")},
+        full_name=filing.get("metadata", {}).get("full_name") or full_name or "Unknown",
+        tx_hash=blockchain_record["tx_hash"],
+        cache_key=dossier_cache_key(blockchain_record["payload_hash"], blockchain_record["tx_hash"]),
+    )
+
+
+async def produce_dossier(client: AsyncSupabaseService, inputs: DossierInputs) -> str:
+    """Download the Form-16, render the archive off the event loop, upload it and return its path."""
+    settings = get_settings()
+    with tempfile.TemporaryDirectory(prefix="dossier-") as workdir:
+        form16_path = os.path.join(workdir, "form16.pdf")
+        archive_path = os.path.join(workdir, "dossier.zip")
+        with open(form16_path, "wb") as form16:
+            await client.download_to_file(settings.storage_bucket, inputs.form16_path, form16)
+        await _render_dossier_file(form16_path, inputs.summary_data, inputs.full_name, inputs.tx_hash, archive_path)
+        with open(archive_path, "rb") as archive:
+            dossier_path = await client.store_dossier(settings.dossier_bucket, inputs.filing_id, archive)
+    if inputs.cache_key:
+        await client.set_dossier_key(inputs.filing_id, inputs.user_id, inputs.cache_key)
+    await get_audit_sink().emit(inputs.user_id, "DOSSIER_GENERATED", {"filing_id": inputs.filing_id})
+    return dossier_path
+
+
+@timed("dossier.render")
+async def _render_dossier_file(*args: Any) -> None:
+    # Measured here as well as in build_dossier: renders on the process pool are timed in the
+    # worker, whose metrics never reach this process.
+    await asyncio.get_running_loop().run_in_executor(get_render_executor(), build_dossier_file, *args)
+
+
+_render_executor: Executor | None = None
+
+
+def get_render_executor() -> Executor | None:
+    """Process pool for ReportLab rendering; None (the loop's thread pool) when disabled."""
+    global _render_executor
+    processes = get_settings().dossier_render_processes
+    if _render_executor is None and processes > 0:
+        _render_executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+    return _render_executor
+
+
+def shutdown_render_executor() -> None:
+    global _render_executor
+    if _render_executor is not None:
+        _render_executor.shutdown(wait=True, cancel_futures=True)
+        _render_executor = None
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Protocol
+
+from app.config import get_settings
+from app.services.cache import TTLCache
+from app.services.supabase_client import get_supabase_client
+
+IN_PROGRESS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+MAX_KEY_LENGTH = 255
+# Larger responses are sent as usual but not stored, so a retry redoes the request.
+MAX_STORED_RESPONSE_BYTES = 1024 * 1024
+# Responses that tell the client to try again are never replayed.
+RETRYABLE_STATUSES = frozenset({408, 409, 425, 429})
+# Per-response headers that should not be replayed.
+UNSTORED_HEADERS = frozenset({b"date", b"server", b"x-profile-id", b"set-cookie"})
+_PURGE_INTERVAL_SECONDS = 600
+
+
+def request_hash(method: str, path: str, query_string: bytes) -> str:
+    return hashlib.sha256(b"\n".join([method.encode(), path.encode(), query_string])).hexdigest()
+
+
+def marked_no_store(headers: list[tuple[bytes, bytes]]) -> bool:
+    """True for responses sent with ``Cache-Control: no-store``, which are never kept for replay."""
+    return any(
+        name.lower() == b"cache-control" and b"no-store" in value.lower().replace(b" ", b"").split(b",")
+        for name, value in headers
+    )
+
+
+def multipart_boundary(headers: list[tuple[bytes, bytes]]) -> bytes | None:
+    content_type = dict(headers).get(b"content-type", b"")
+    if not content_type.startswith(b"multipart/"):
+        return None
+    for param in content_type.split(b";")[1:]:
+        name, _, value = param.strip().partition(b"=")
+        if name.lower() == b"boundary" and value:
+            return value.strip(b'"')
+    return None
+
+
+class BodyHasher:
+    """SHA-256 of a request body fed in chunks, with a multipart boundary removed.
+
+    Clients pick a fresh random boundary for every multipart request, so a retried upload
+    would otherwise never match the original. Occurrences split across chunks are handled by
+    holding back the last ``len(boundary) - 1`` bytes of each chunk.
+    """
+
+    def __init__(self, boundary: bytes | None = None) -> None:
+        self.boundary = boundary
+        self._digest = hashlib.sha256()
+        self._tail = b""
+
+    def update(self, chunk: bytes) -> None:
+        if not self.boundary:
+            self._digest.update(chunk)
+            return
+        *complete, last = (self._tail + chunk).split(self.boundary)
+        for part in complete:
+            self._digest.update(part)
+        keep = len(self.boundary) - 1
+        self._digest.update(last[: max(0, len(last) - keep)])
+        self._tail = last[max(0, len(last) - keep) :]
+
+    def hexdigest(self) -> str:
+        self._digest.update(self._tail)
+        self._tail = b""
+        return self._digest.hexdigest()
+
+
+def response_record(status_code: int, headers: list[tuple[bytes, bytes]], body: bytes) -> dict[str, Any]:
+    return {
+        "response_status": status_code,
+        "response_headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers],
+        "response_body": base64.b64encode(body).decode("ascii"),
+    }
+
+
+def replayed_response(record: dict[str, Any]) -> tuple[int, list[tuple[bytes, bytes]], bytes]:
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["response_headers"]]
+    return record["response_status"], headers, base64.b64decode(record["response_body"])
+
+
+class IdempotencyStore(Protocol):
+    async def reserve(self, user_id: str, key: str, request_hash: str, lease_seconds: float) -> dict[str, Any] | None:
+        """Claim ``key`` for a new request; returns None on success or the live record holding it."""
+
+    async def get(self, user_id: str, key: str) -> dict[str, Any] | None: ...
+
+    async def complete(
+        self, user_id: str, key: str, body_hash: str, response: dict[str, Any], ttl_seconds: float
+    ) -> None: ...
+
+    async def release(self, user_id: str, key: str) -> None: ...
+
+
+def _expires_at(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+def _expired(record: dict[str, Any]) -> bool:
+    return datetime.fromisoformat(record["expires_at"]) <= datetime.now(timezone.utc)
+
+
+class SupabaseIdempotencyStore:
+    """Keys in the ``idempotency_keys`` table, shared by every worker.
+
+    The primary key on ``(user_id, key)`` makes the reservation atomic. Expired rows are
+    ignored on read, replaced on reservation and purged every few minutes.
+    """
+
+    def __init__(self) -> None:
+        self._purged_at = 0.0
+
+    async def reserve(self, user_id: str, key: str, request_hash: str, lease_seconds: float) -> dict[str, Any] | None:
+        client = get_supabase_client()
+        now = datetime.now(timezone.utc).isoformat()
+        if time.monotonic() - self._purged_at > _PURGE_INTERVAL_SECONDS:
+            self._purged_at = time.monotonic()
+            await client.delete_idempotency_keys(expired_before=now)
+        row = {
+            "user_id": user_id,
+            "key": key,
+            "request_hash": request_hash,
+            "status": IN_PROGRESS,
+            "expires_at": _expires_at(lease_seconds),
+        }
+        # Two attempts: the second follows the removal of an expired row holding the key.
+        for _ in range(2):
+            if await client.insert_idempotency_key(row):
+                return None
+            existing = await self.get(user_id, key)
+            if existing is not None:
+                return existing
+            await client.delete_idempotency_keys(user_id, key, expired_before=now)
+        raise RuntimeError(f"Could not reserve idempotency key {key!r}")
+
+    async def get(self, user_id: str, key: str) -> dict[str, Any] | None:
+        record = await get_supabase_client().get_idempotency_key(user_id, key)
+        return None if record is None or _expired(record) else record
+
+    async def complete(
+        self, user_id: str, key: str, body_hash: str, response: dict[str, Any], ttl_seconds: float
+    ) -> None:
+        fields = {"status": COMPLETED, "body_hash": body_hash, "expires_at": _expires_at(ttl_seconds), **response}
+        await get_supabase_client().update_idempotency_key(user_id, key, fields)
+
+    async def release(self, user_id: str, key: str) -> None:
+        await get_supabase_client().delete_idempotency_keys(user_id, key)
+
+
+class MemoryIdempotencyStore:
+    """Single-process stand-in for SupabaseIdempotencyStore, for tests and local runs."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self._records: TTLCache[tuple[str, str], dict[str, Any]] = TTLCache(maxsize=maxsize)
+
+    async def reserve(self, user_id: str, key: str, request_hash: str, lease_seconds: float) -> dict[str, Any] | None:
+        existing = self._records.get((user_id, key))
+        if existing is not None:
+            return existing
+        record = {"user_id": user_id, "key": key, "request_hash": request_hash, "status": IN_PROGRESS}
+        self._records.set((user_id, key), record, ttl=lease_seconds)
+        return None
+
+    async def get(self, user_id: str, key: str) -> dict[str, Any] | None:
+        return self._records.get((user_id, key))
+
+    async def complete(
+        self, user_id: str, key: str, body_hash: str, response: dict[str, Any], ttl_seconds: float
+    ) -> None:
+        record = self._records.get((user_id, key))
+        if record is not None:
+            record = {**record, "status": COMPLETED, "body_hash": body_hash, **response}
+            self._records.set((user_id, key), record, ttl=ttl_seconds)
+
+    async def release(self, user_id: str, key: str) -> None:
+        self._records.pop((user_id, key))
+
+
+_idempotency_store: IdempotencyStore | None = None
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    global _idempotency_store
+    if _idempotency_store is None:
+        if get_settings().idempotency_store == "memory":
+            _idempotency_store = MemoryIdempotencyStore()
+        else:
+            _idempotency_store = SupabaseIdempotencyStore()
+    return _idempotency_store
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.config import get_settings
+from app.services.dossier import DossierInputs, cached_dossier_path, produce_dossier
+from app.services.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class SupabaseJobStore:
+    """Dossier jobs persisted in the ``dossier_jobs`` table."""
+
+    async def create(self, user_id: str, filing_id: str, inputs: dict[str, Any]) -> dict[str, Any]:
+        now = _now()
+        return await get_supabase_client().create_dossier_job(
+            {
+                "user_id": user_id,
+                "filing_id": filing_id,
+                "status": QUEUED,
+                "inputs": inputs,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+
+    async def get(self, job_id: str, user_id: str) -> dict[str, Any] | None:
+        return await get_supabase_client().get_dossier_job(job_id, user_id)
+
+    async def claim(self, job_id: str) -> bool:
+        return await get_supabase_client().update_dossier_job(job_id, {"status": RUNNING, "updated_at": _now()}, from_status=QUEUED)
+
+    async def update(self, job_id: str, fields: dict[str, Any]) -> None:
+        await get_supabase_client().update_dossier_job(job_id, {**fields, "updated_at": _now()})
+
+    async def requeue_stale(self, updated_before: str) -> None:
+        client = get_supabase_client()
+        for job in await client.list_dossier_jobs(RUNNING, updated_before=updated_before):
+            await client.update_dossier_job(job["id"], {"status": QUEUED, "updated_at": _now()}, from_status=RUNNING)
+
+    async def list_queued(self) -> list[dict[str, Any]]:
+        return await get_supabase_client().list_dossier_jobs(QUEUED)
+
+
+class SQLiteJobStore:
+    """Local stand-in for SupabaseJobStore; use ``":memory:"`` in tests."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dossier_jobs (
+                  id TEXT PRIMARY KEY,
+                  user_id TEXT NOT NULL,
+                  filing_id TEXT NOT NULL,
+                  status TEXT NOT NULL,
+                  inputs TEXT NOT NULL,
+                  dossier_path TEXT,
+                  error TEXT,
+                  created_at TEXT NOT NULL,
+                  updated_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def _execute(self, sql: str, params: tuple[Any, ...] = ()) -> tuple[list[dict[str, Any]], int]:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(sql, params)
+            rows = [dict(row) for row in cursor.fetchall()]
+        for row in rows:
+            row["inputs"] = json.loads(row["inputs"])
+        return rows, cursor.rowcount
+
+    async def _run(self, sql: str, params: tuple[Any, ...] = ()) -> tuple[list[dict[str, Any]], int]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    async def create(self, user_id: str, filing_id: str, inputs: dict[str, Any]) -> dict[str, Any]:
+        now = _now()
+        job_id = str(uuid.uuid4())
+        await self._run(
+            "INSERT INTO dossier_jobs (id, user_id, filing_id, status, inputs, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, user_id, filing_id, QUEUED, json.dumps(inputs), now, now),
+        )
+        rows, _ = await self._run("SELECT * FROM dossier_jobs WHERE id = ?", (job_id,))
+        return rows[0]
+
+    async def get(self, job_id: str, user_id: str) -> dict[str, Any] | None:
+        rows, _ = await self._run("SELECT * FROM dossier_jobs WHERE id = ? AND user_id = ?", (job_id, user_id))
+        return rows[0] if rows else None
+
+    async def claim(self, job_id: str) -> bool:
+        _, count = await self._run(
+            "UPDATE dossier_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, _now(), job_id, QUEUED),
+        )
+        return count == 1
+
+    async def update(self, job_id: str, fields: dict[str, Any]) -> None:
+        fields = {**fields, "updated_at": _now()}
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        await self._run(f"UPDATE dossier_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    async def requeue_stale(self, updated_before: str) -> None:
+        await self._run(
+            "UPDATE dossier_jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+            (QUEUED, _now(), RUNNING, updated_before),
+        )
+
+    async def list_queued(self) -> list[dict[str, Any]]:
+        rows, _ = await self._run("SELECT * FROM dossier_jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+        return rows
+
+
+JobStore = SupabaseJobStore | SQLiteJobStore
+
+
+class DossierJobRunner:
+    """Runs dossier jobs in the background, at most ``concurrency`` at a time.
+
+    Jobs are claimed with a QUEUED -> RUNNING transition so a job is only picked up once,
+    and ``recover`` re-enqueues jobs left behind by a previous worker.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int = 2) -> None:
+        self.store = store
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: set[asyncio.Task] = set()
+
+    async def enqueue(self, inputs: DossierInputs) -> dict[str, Any]:
+        job = await self.store.create(inputs.user_id, inputs.filing_id, inputs.model_dump())
+        self._spawn(job)
+        return job
+
+    def _spawn(self, job: dict[str, Any]) -> None:
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: dict[str, Any]) -> None:
+        async with self._semaphore:
+            if not await self.store.claim(job["id"]):
+                return
+            try:
+                client = get_supabase_client()
+                inputs = DossierInputs(**job["inputs"])
+                # A duplicate job queued behind one that already built this dossier has nothing to do.
+                blockchain_record = await client.get_blockchain_record(inputs.filing_id, inputs.user_id)
+                dossier_path = cached_dossier_path(inputs.filing_id, blockchain_record) or await produce_dossier(client, inputs)
+            except asyncio.CancelledError:
+                await asyncio.shield(self.store.update(job["id"], {"status": QUEUED}))
+                raise
+            except Exception as exc:
+                logger.exception("Dossier job %s failed", job["id"])
+                await self.store.update(job["id"], {"status": FAILED, "error": str(exc)})
+                return
+            await self.store.update(job["id"], {"status": DONE, "dossier_path": dossier_path, "error": None})
+
+    async def recover(self, stale_after_seconds: float) -> None:
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_after_seconds)
+        await self.store.requeue_stale(cutoff.isoformat())
+        for job in await self.store.list_queued():
+            self._spawn(job)
+
+    async def join(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def close(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+_job_runner: DossierJobRunner | None = None
+
+
+def get_job_runner() -> DossierJobRunner:
+    global _job_runner
+    if _job_runner is None:
+        settings = get_settings()
+        if settings.dossier_job_store == "sqlite":
+            store: JobStore = SQLiteJobStore(settings.dossier_job_db_path)
+        else:
+            store = SupabaseJobStore()
+        _job_runner = DossierJobRunner(store, concurrency=settings.dossier_job_concurrency)
+    return _job_runner
+
+
+async def start_job_runner() -> None:
+    try:
+        await get_job_runner().recover(get_settings().dossier_job_stale_seconds)
+    except Exception:
+        logger.exception("Could not recover pending dossier jobs")
+
+
+async def close_job_runner() -> None:
+    global _job_runner
+    if _job_runner is not None:
+        await _job_runner.close()
+        _job_runner = None
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from fastapi import Depends
+
+from app.auth import AuthenticatedUser, ensure_user_record
+from app.services.supabase_client import AsyncSupabaseService, get_supabase_client
+
+
+def _single(rows: Any) -> dict[str, Any] | None:
+    # One-to-many embeds come back as lists; callers want the latest row, like maybe_single() did.
+    if isinstance(rows, list):
+        return max(rows, key=lambda row: str(row.get("created_at") or "")) if rows else None
+    return rows or None
+
+
+class FilingLoader:
+    """Request-scoped reads of one user's filings.
+
+    Identical loads share a single in-flight call, and documents, ML results and risk flags
+    are served from the filing row that already embeds them. Independent loads can be
+    awaited together with ``asyncio.gather`` to run concurrently.
+    """
+
+    def __init__(self, client: AsyncSupabaseService, user_id: str) -> None:
+        self.client = client
+        self.user_id = user_id
+        self._loads: dict[tuple[str, str], asyncio.Future[Any]] = {}
+
+    def _load(self, kind: str, filing_id: str, fetch: Callable[[str, str], Awaitable[Any]]) -> asyncio.Future[Any]:
+        key = (kind, filing_id)
+        load = self._loads.get(key)
+        if load is None:
+            load = self._loads[key] = asyncio.ensure_future(fetch(filing_id, self.user_id))
+        return load
+
+    async def filing(self, filing_id: str) -> dict[str, Any] | None:
+        return await self._load("filing", filing_id, self.client.get_filing)
+
+    async def blockchain_record(self, filing_id: str) -> dict[str, Any] | None:
+        return await self._load("blockchain_record", filing_id, self.client.get_blockchain_record)
+
+    async def documents(self, filing_id: str) -> list[dict[str, Any]]:
+        filing = await self.filing(filing_id)
+        return (filing or {}).get("documents") or []
+
+    async def ml_result(self, filing_id: str) -> dict[str, Any] | None:
+        filing = await self.filing(filing_id)
+        return _single((filing or {}).get("ml_results"))
+
+    async def risk_flags(self, filing_id: str) -> dict[str, Any] | None:
+        filing = await self.filing(filing_id)
+        return _single((filing or {}).get("risk_flags"))
+
+
+async def get_filing_loader(user: AuthenticatedUser = Depends(ensure_user_record)) -> FilingLoader:
+    return FilingLoader(get_supabase_client(), user.user_id)
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, TypeVar
+
+# Upper bounds in seconds, Prometheus-style.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Operations such as hashing or cache hits run well below the request-level buckets.
+OPERATION_BUCKETS = (0.0001, 0.0005, 0.001) + DEFAULT_BUCKETS
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    """Latency histogram with fixed buckets; ``snapshot`` reports cumulative counts per upper bound."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        # Observations also come from worker threads (to_thread hashing, DB pool).
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets, self._counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+
+class Counter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _Family:
+    """A metric name with one child per label-value tuple."""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...], factory: Callable[[], Any]) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> list[tuple[tuple[str, ...], Any]]:
+        return sorted(self._children.items())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Counters, histograms and scrape-time gauges, rendered in the Prometheus text format.
+
+    When ``enabled`` is off the ``timed`` wrappers and the request middleware skip all
+    bookkeeping, so instrumentation costs one attribute check per call.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self._counters: dict[str, _Family] = {}
+        self._histograms: dict[str, _Family] = {}
+        self._gauges: dict[str, tuple[str, tuple[str, ...], Callable[[], dict[tuple[str, ...], float]]]] = {}
+        self._collectors: list[Callable[[], list[str]]] = []
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> _Family:
+        return self._counters.setdefault(name, _Family(name, help, labelnames, Counter))
+
+    def histogram(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> _Family:
+        buckets = tuple(buckets)
+        return self._histograms.setdefault(name, _Family(name, help, labelnames, lambda: Histogram(buckets)))
+
+    def gauge(
+        self,
+        name: str,
+        help: str,
+        collect: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        """Register a gauge whose values are read from ``collect`` at scrape time."""
+        self._gauges[name] = (help, labelnames, collect)
+
+    def collector(self, collect: Callable[[], list[str]]) -> None:
+        """Register a callable returning ready-made exposition lines, for metrics kept elsewhere."""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for family in self._counters.values():
+            lines += [f"# HELP {family.name} {family.help}", f"# TYPE {family.name} counter"]
+            for values, counter in family.children():
+                lines.append(f"{family.name}{_labels(family.labelnames, values)} {_number(counter.value)}")
+        for family in self._histograms.values():
+            lines += [f"# HELP {family.name} {family.help}", f"# TYPE {family.name} histogram"]
+            for values, histogram in family.children():
+                lines += histogram_lines(family.name, family.labelnames, values, histogram)
+        for name, (help, labelnames, collect) in self._gauges.items():
+            lines += [f"# HELP {name} {help}", f"# TYPE {name} gauge"]
+            for values, value in sorted(collect().items()):
+                lines.append(f"{name}{_labels(labelnames, values)} {_number(value)}")
+        for collect in self._collectors:
+            lines += collect()
+        return "\n".join(lines) + "\n"
+
+
+def histogram_lines(name: str, labelnames: tuple[str, ...], values: tuple[str, ...], histogram: Histogram) -> list[str]:
+    """Exposition lines for one histogram; also used for histograms kept outside the registry."""
+    snapshot = histogram.snapshot()
+    lines = [
+        f"{name}_bucket{_labels((*labelnames, 'le'), (*values, bound))} {count}"
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{_labels(labelnames, values)} {_number(snapshot['sum'])}")
+    lines.append(f"{name}_count{_labels(labelnames, values)} {snapshot['count']}")
+    return lines
+
+
+_registry = MetricsRegistry()
+
+OPERATION_SECONDS = _registry.histogram(
+    "dhanrakshak_operation_duration_seconds",
+    "Time spent in instrumented dependency calls and CPU-heavy steps.",
+    ("operation",),
+    buckets=OPERATION_BUCKETS,
+)
+OPERATION_ERRORS = _registry.counter(
+    "dhanrakshak_operation_errors_total",
+    "Instrumented calls that raised.",
+    ("operation",),
+)
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    _registry.enabled = enabled
+
+
+def timed(operation: str) -> Callable[[F], F]:
+    """Record each call's duration under ``operation``; works on sync and async functions."""
+
+    def decorate(fn: F) -> F:
+        histogram = OPERATION_SECONDS.labels(operation)
+        errors = OPERATION_ERRORS.labels(operation)
+        registry = _registry
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not registry.enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                except BaseException:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - start)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def instrument_methods(prefix: str, exclude: Iterable[str] = ()) -> Callable[[type], type]:
+    """Class decorator applying ``timed(f"{prefix}.{name}")`` to every public method."""
+    skip = set(exclude)
+
+    def decorate(cls: type) -> type:
+        for name, attr in list(vars(cls).items()):
+            if name.startswith("_") or name in skip or not inspect.isfunction(attr) or inspect.isasyncgenfunction(attr):
+                continue
+            setattr(cls, name, timed(f"{prefix}.{name}")(attr))
+        return cls
+
+    return decorate
@@ -0,0 +1,164 @@
+"""Versioned SQL migrations.
+
+Migrations are ``sql/migrations/NNNN_name.sql`` files applied in version order, each in its own
+transaction, and recorded in ``schema_migrations`` with a checksum so an edited migration is caught.
+
+    python -m app.services.migrations                 # apply pending migrations to SUPABASE_DB_URL
+    python -m app.services.migrations --list          # show applied and pending versions
+    python -m app.services.migrations --baseline 1    # record 0001 as applied on a pre-existing database
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+import psycopg2
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "sql" / "migrations"
+
+_FILENAME = re.compile(r"^(\d{4})_(\w+)\.sql$")
+# Arbitrary constant; holding it keeps two deploys from migrating the same database at once.
+_LOCK_KEY = 4_193_517_019
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+  version integer PRIMARY KEY,
+  name text NOT NULL,
+  checksum text NOT NULL,
+  applied_at timestamptz NOT NULL DEFAULT now()
+)
+"""
+
+
+class MigrationError(RuntimeError):
+    pass
+
+
+class Migration(BaseModel):
+    version: int
+    name: str
+    path: Path
+    checksum: str
+
+    def sql(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    migrations: dict[int, Migration] = {}
+    for path in sorted(directory.glob("*.sql")):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise MigrationError(f"Migration file name must look like NNNN_name.sql: {path.name}")
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Duplicate migration version {version:04d}")
+        migrations[version] = Migration(
+            version=version,
+            name=match.group(2),
+            path=path,
+            checksum=hashlib.sha256(path.read_bytes()).hexdigest(),
+        )
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_migrations(conn: Any) -> dict[int, str]:
+    """Version -> checksum of every recorded migration, creating the tracking table if needed."""
+    with conn.cursor() as cursor:
+        cursor.execute(_CREATE_TABLE)
+        cursor.execute("SELECT version, checksum FROM schema_migrations")
+        rows = cursor.fetchall()
+    conn.commit()
+    return {version: checksum for version, checksum in rows}
+
+
+def pending_migrations(migrations: list[Migration], applied: dict[int, str]) -> list[Migration]:
+    for migration in migrations:
+        checksum = applied.get(migration.version)
+        if checksum is not None and checksum != migration.checksum:
+            raise MigrationError(f"Migration {migration.version:04d}_{migration.name} changed after it was applied")
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def migrate(
+    conn: Any,
+    directory: Path = MIGRATIONS_DIR,
+    target: int | None = None,
+    baseline: int | None = None,
+) -> list[Migration]:
+    """Apply pending migrations up to ``target``; return the ones applied.
+
+    With ``baseline``, migrations up to that version are recorded without running them, for
+    databases created before migrations existed.
+    """
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", (_LOCK_KEY,))
+    try:
+        pending = pending_migrations(discover_migrations(directory), applied_migrations(conn))
+        done = []
+        for migration in pending:
+            if target is not None and migration.version > target:
+                break
+            skip = baseline is not None and migration.version <= baseline
+            _apply(conn, migration, run=not skip)
+            if not skip:
+                done.append(migration)
+        return done
+    finally:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (_LOCK_KEY,))
+        conn.commit()
+
+
+def _apply(conn: Any, migration: Migration, run: bool = True) -> None:
+    try:
+        with conn.cursor() as cursor:
+            if run:
+                cursor.execute(migration.sql())
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration.version, migration.name, migration.checksum),
+            )
+        conn.commit()
+    except psycopg2.Error as exc:
+        conn.rollback()
+        raise MigrationError(f"Migration {migration.version:04d}_{migration.name} failed: {exc}") from exc
+    logger.info("%s migration %04d_%s", "Applied" if run else "Baselined", migration.version, migration.name)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Apply versioned SQL migrations.")
+    parser.add_argument("--database-url", default=os.getenv("SUPABASE_DB_URL"))
+    parser.add_argument("--target", type=int, help="stop after this version")
+    parser.add_argument("--baseline", type=int, help="record versions up to this one as applied without running them")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations and exit")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or SUPABASE_DB_URL is required")
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    conn = psycopg2.connect(args.database_url)
+    try:
+        if args.list:
+            applied = applied_migrations(conn)
+            for migration in discover_migrations():
+                state = "applied" if migration.version in applied else "pending"
+                print(f"{migration.version:04d}_{migration.name}  {state}")
+            return
+        applied = migrate(conn, target=args.target, baseline=args.baseline)
+        print(f"Applied {len(applied)} migration(s)")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
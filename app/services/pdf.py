@@ -1,48 +1,183 @@
 from __future__ import annotations
 
 import io
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable, Iterable
 
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 
+FONT = "Helvetica"
+_SLOT = b"%DR-SLOT"
+_SUMMARY_LINES_PER_PAGE = 28
 
-def create_summary_pdf(summary: dict[str, Any]) -> bytes:
+
+def _new_canvas(buffer: io.BytesIO) -> canvas.Canvas:
+    # invariant=1 pins the creation date and document ID so identical inputs give identical bytes.
+    return canvas.Canvas(buffer, pagesize=letter, invariant=1, pageCompression=0)
+
+
+def _render_direct(draw: Callable[[canvas.Canvas], None]) -> bytes:
     buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    pdf.setFont("Helvetica", 12)
-    pdf.drawString(1 * inch, 10 * inch, "DhanRakshak Filing Summary")
-    y = 9.5 * inch
-    for key, value in summary.items():
-        pdf.drawString(1 * inch, y, f"{key}: {value}")
-        y -= 0.3 * inch
-        if y < 1 * inch:
-            pdf.showPage()
-            pdf.setFont("Helvetica", 12)
-            y = 10 * inch
+    pdf = _new_canvas(buffer)
+    draw(pdf)
     pdf.showPage()
     pdf.save()
     return buffer.getvalue()
 
 
+class PageTemplate:
+    """Single-page PDF whose static content is rendered by ReportLab once per process.
+
+    ``render`` formats only the per-filing text operators and splices them into the cached
+    page content stream, patching the stream length and xref offsets. Output is byte-identical
+    to drawing the same strings on a fresh canvas.
+    """
+
+    def __init__(self, draw_static: Callable[[canvas.Canvas], None], font_size: int) -> None:
+        self.font_size = font_size
+
+        def draw(pdf: canvas.Canvas) -> None:
+            pdf.setFont(FONT, font_size)
+            draw_static(pdf)
+            pdf.addLiteral(_SLOT.decode("ascii"))
+
+        data = _render_direct(draw)
+        self._data = data
+        self._slot = data.index(_SLOT)
+        self._length_start = data.rindex(b"/Length ", 0, self._slot) + len(b"/Length ")
+        self._length_end = self._length_start
+        while data[self._length_end : self._length_end + 1].isdigit():
+            self._length_end += 1
+        self._stream_length = int(data[self._length_start : self._length_end])
+        self._xref = data.rindex(b"\nxref\n") + 1
+        xref_lines = data[self._xref :].split(b"\n")
+        count = int(xref_lines[1].split()[1])
+        self._offsets = [int(line[:10]) for line in xref_lines[3 : 2 + count]]
+        self._trailer = data[data.index(b"trailer", self._xref) : data.rindex(b"startxref")]
+
+    def render(self, lines: Iterable[tuple[float, float, str]]) -> bytes:
+        ops = _text_ops(self.font_size, lines)
+        data = self._data
+        length = str(self._stream_length - len(_SLOT) + len(ops)).encode("ascii")
+        body = b"".join(
+            [
+                data[: self._length_start],
+                length,
+                data[self._length_end : self._slot],
+                ops,
+                data[self._slot + len(_SLOT) : self._xref],
+            ]
+        )
+        length_shift = len(length) - (self._length_end - self._length_start)
+        ops_shift = len(ops) - len(_SLOT)
+
+        def moved(offset: int) -> int:
+            if offset > self._slot:
+                return offset + length_shift + ops_shift
+            if offset > self._length_start:
+                return offset + length_shift
+            return offset
+
+        xref = [b"xref", b"0 %d" % (len(self._offsets) + 1), b"0000000000 65535 f "]
+        xref.extend(b"%010d 00000 n " % moved(offset) for offset in self._offsets)
+        return b"".join(
+            [body, b"\n".join(xref), b"\n", self._trailer, b"startxref\n", str(len(body)).encode("ascii"), b"\n%%EOF\n"]
+        )
+
+
+def _text_ops(font_size: int, lines: Iterable[tuple[float, float, str]]) -> bytes:
+    # Same operators Canvas.drawString emits, produced on a scratch canvas without serializing it.
+    scratch = canvas.Canvas(io.BytesIO(), pagesize=letter)
+    scratch.setFont(FONT, font_size)
+    codes = []
+    for x, y, text in lines:
+        text_object = scratch.beginText(x, y)
+        text_object.textLine(text)
+        codes.append(text_object.getCode())
+    return "\n".join(codes).encode("latin-1")
+
+
+def _templatable(*texts: str) -> bool:
+    # Standard Type1 fonts only carry WinAnsi glyphs; anything else takes the direct path.
+    try:
+        for text in texts:
+            text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _summary_template() -> PageTemplate:
+    return PageTemplate(lambda pdf: pdf.drawString(1 * inch, 10 * inch, "DhanRakshak Filing Summary"), 12)
+
+
+@lru_cache(maxsize=None)
+def _heatmap_template() -> PageTemplate:
+    return PageTemplate(lambda pdf: pdf.drawString(1 * inch, 10 * inch, "Heatmap"), 12)
+
+
+@lru_cache(maxsize=None)
+def _certificate_template() -> PageTemplate:
+    return PageTemplate(lambda pdf: None, 16)
+
+
+def _draw_summary(lines: tuple[str, ...]) -> Callable[[canvas.Canvas], None]:
+    def draw(pdf: canvas.Canvas) -> None:
+        pdf.setFont(FONT, 12)
+        pdf.drawString(1 * inch, 10 * inch, "DhanRakshak Filing Summary")
+        y = 9.5 * inch
+        for line in lines:
+            pdf.drawString(1 * inch, y, line)
+            y -= 0.3 * inch
+            if y < 1 * inch:
+                pdf.showPage()
+                pdf.setFont(FONT, 12)
+                y = 10 * inch
+
+    return draw
+
+
+@lru_cache(maxsize=256)
+def _summary_pdf(lines: tuple[str, ...]) -> bytes:
+    if len(lines) > _SUMMARY_LINES_PER_PAGE or not _templatable(*lines):
+        return _render_direct(_draw_summary(lines))
+    return _summary_template().render((1 * inch, 9.5 * inch - i * 0.3 * inch, line) for i, line in enumerate(lines))
+
+
+def create_summary_pdf(summary: dict[str, Any]) -> bytes:
+    return _summary_pdf(tuple(f"{key}: {value}" for key, value in summary.items()))
+
+
+@lru_cache(maxsize=256)
 def create_certificate_pdf(full_name: str, tx_hash: str) -> bytes:
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    pdf.setFont("Helvetica", 16)
-    pdf.drawCentredString(4.25 * inch, 6 * inch, full_name)
-    pdf.drawCentredString(4.25 * inch, 5.5 * inch, tx_hash)
-    pdf.showPage()
-    pdf.save()
-    return buffer.getvalue()
+    if not _templatable(full_name, tx_hash):
+
+        def draw(pdf: canvas.Canvas) -> None:
+            pdf.setFont(FONT, 16)
+            pdf.drawCentredString(4.25 * inch, 6 * inch, full_name)
+            pdf.drawCentredString(4.25 * inch, 5.5 * inch, tx_hash)
 
+        return _render_direct(draw)
+    return _certificate_template().render(
+        [
+            (4.25 * inch - stringWidth(full_name, FONT, 16) / 2, 6 * inch, full_name),
+            (4.25 * inch - stringWidth(tx_hash, FONT, 16) / 2, 5.5 * inch, tx_hash),
+        ]
+    )
 
+
+@lru_cache(maxsize=64)
 def create_heatmap_pdf(notes: str = "Heatmap placeholder") -> bytes:
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    pdf.setFont("Helvetica", 12)
-    pdf.drawString(1 * inch, 10 * inch, "Heatmap")
-    pdf.drawString(1 * inch, 9.5 * inch, notes)
-    pdf.showPage()
-    pdf.save()
-    return buffer.getvalue()
+    if not _templatable(notes):
+
+        def draw(pdf: canvas.Canvas) -> None:
+            pdf.setFont(FONT, 12)
+            pdf.drawString(1 * inch, 10 * inch, "Heatmap")
+            pdf.drawString(1 * inch, 9.5 * inch, notes)
+
+        return _render_direct(draw)
+    return _heatmap_template().render([(1 * inch, 9.5 * inch, notes)])
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import secrets
+import sys
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+
+from app.config import get_settings
+from app.models import ProfileInfo
+from app.services.supabase_client import get_supabase_client
+
+# Profile ids double as file names, so only this shape is ever read or written.
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}Z-[A-Z]+-[\w.-]{1,80}-[0-9a-f]{8}$")
+PROFILE_SUFFIX = ".collapsed"
+_PATH_CHARS = re.compile(r"[^\w.-]+")
+
+
+def new_profile_id(method: str, path: str) -> str:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    slug = _PATH_CHARS.sub("_", path.strip("/"))[:80] or "root"
+    return f"{stamp}-{method.upper()}-{slug}-{secrets.token_hex(4)}"
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every ``interval`` seconds from a helper thread.
+
+    The profiled code is never traced or interrupted, so its only cost is the sampler
+    competing for the GIL. Stacks are counted in collapsed form (``root;...;leaf``), the
+    input format of flamegraph.pl and speedscope. When ``task`` is given, each stack is rooted
+    at ``request`` if that task was running on ``loop`` when it was sampled, ``idle`` if no
+    task was, and ``other`` otherwise, since the event loop also serves concurrent requests.
+    """
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float = 0.005,
+        loop: asyncio.AbstractEventLoop | None = None,
+        task: asyncio.Task | None = None,
+    ) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.loop = loop
+        self.task = task
+        self.samples = 0
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self._stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if self.task is not None:
+                running = asyncio.current_task(self.loop)
+                stack.append("request" if running is self.task else "idle" if running is None else "other")
+            self._stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+
+def collapsed(stacks: Counter[str]) -> bytes:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()).encode()
+
+
+class LocalProfileStore:
+    """Profiles as files in a local directory, pruned to the newest ``keep``."""
+
+    def __init__(self, directory: str, keep: int = 100) -> None:
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def _paths(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"), reverse=True)
+
+    async def save(self, profile_id: str, data: bytes) -> None:
+        def write() -> None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / f"{profile_id}{PROFILE_SUFFIX}").write_bytes(data)
+            for stale in self._paths()[self.keep :]:
+                stale.unlink(missing_ok=True)
+
+        await asyncio.to_thread(write)
+
+    async def list(self, limit: int) -> list[ProfileInfo]:
+        def scan() -> list[ProfileInfo]:
+            profiles = []
+            for path in self._paths()[:limit]:
+                stat = path.stat()
+                created_at = datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+                profiles.append(ProfileInfo(profile_id=path.name[: -len(PROFILE_SUFFIX)], size=stat.st_size, created_at=created_at))
+            return profiles
+
+        return await asyncio.to_thread(scan)
+
+    async def load(self, profile_id: str) -> bytes | None:
+        path = self.directory / f"{profile_id}{PROFILE_SUFFIX}"
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            return None
+
+
+class BucketProfileStore:
+    """Profiles under ``profiles/`` in the dossier bucket, for workers without persistent disk."""
+
+    prefix = "profiles"
+
+    def __init__(self, bucket: str) -> None:
+        self.bucket = bucket
+
+    async def save(self, profile_id: str, data: bytes) -> None:
+        await get_supabase_client().upload_file(self.bucket, f"{self.prefix}/{profile_id}{PROFILE_SUFFIX}", data, "text/plain")
+
+    async def list(self, limit: int) -> list[ProfileInfo]:
+        objects = await get_supabase_client().list_objects(self.bucket, self.prefix, limit=limit)
+        return [
+            ProfileInfo(
+                profile_id=item["name"][: -len(PROFILE_SUFFIX)],
+                size=(item.get("metadata") or {}).get("size"),
+                created_at=item.get("created_at"),
+            )
+            for item in objects
+            if item.get("name", "").endswith(PROFILE_SUFFIX)
+        ]
+
+    async def load(self, profile_id: str) -> bytes | None:
+        chunks = await get_supabase_client().stream_file(self.bucket, f"{self.prefix}/{profile_id}{PROFILE_SUFFIX}")
+        if chunks is None:
+            return None
+        return b"".join([chunk async for chunk in chunks])
+
+
+def get_profile_store() -> LocalProfileStore | BucketProfileStore:
+    # Stores hold no connections of their own, so they are cheap to build per use.
+    settings = get_settings()
+    if settings.profile_store == "bucket":
+        return BucketProfileStore(settings.dossier_bucket)
+    return LocalProfileStore(settings.profile_dir, keep=settings.profile_keep)
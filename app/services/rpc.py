@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Any
+
+import httpx
+
+from app.config import get_settings
+from app.services.metrics import Histogram, get_metrics_registry, histogram_lines
+
+logger = logging.getLogger(__name__)
+
+_TRANSIENT_STATUS = {429, 502, 503, 504}
+
+
+class RPCError(Exception):
+    """A JSON-RPC error object returned by the node."""
+
+    def __init__(self, code: int, message: str, data: Any = None) -> None:
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+class RPCTransientError(Exception):
+    """The node could not be reached or answered with a retryable HTTP status."""
+
+
+class JsonRpcClient:
+    """Async JSON-RPC 2.0 client over a persistent httpx connection pool.
+
+    At most ``max_concurrency`` requests are in flight; connection errors, timeouts and
+    429/5xx gateway responses are retried ``retries`` times with full-jitter backoff.
+    Latency of every call (including retries) is recorded per method.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_connections: int = 10,
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.2,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.url = url
+        self.retries = retries
+        self.backoff = backoff
+        self._http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._ids = itertools.count(1)
+        self._latency: defaultdict[str, Histogram] = defaultdict(Histogram)
+
+    async def call(self, method: str, params: list[Any] | None = None) -> Any:
+        request = self._request(method, params)
+        response = await self._send(request, method)
+        return _result(response)
+
+    async def batch(self, calls: list[tuple[str, list[Any] | None]]) -> list[Any]:
+        """Send several calls in one HTTP request; results come back in call order.
+
+        A call the node rejected yields its ``RPCError`` in place of a result.
+        """
+        if not calls:
+            return []
+        requests = [self._request(method, params) for method, params in calls]
+        responses = await self._send(requests, "batch")
+        if not isinstance(responses, list):
+            # Nodes answer a malformed batch with a single error object.
+            error = _error(responses) or RPCError(-32603, "Invalid batch response")
+            return [error for _ in requests]
+        by_id = {response.get("id"): response for response in responses}
+        results = []
+        for request in requests:
+            response = by_id.get(request["id"])
+            if response is None:
+                results.append(RPCError(-32603, "Missing response"))
+            else:
+                error = _error(response)
+                results.append(error if error else response.get("result"))
+        return results
+
+    def _request(self, method: str, params: list[Any] | None) -> dict[str, Any]:
+        return {"jsonrpc": "2.0", "method": method, "params": params or [], "id": next(self._ids)}
+
+    async def _send(self, payload: Any, label: str) -> Any:
+        start = time.perf_counter()
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    async with self._semaphore:
+                        response = await self._http.post(self.url, json=payload)
+                    if response.status_code in _TRANSIENT_STATUS:
+                        raise RPCTransientError(f"RPC node returned {response.status_code}")
+                    response.raise_for_status()
+                    return response.json()
+                except (httpx.TransportError, RPCTransientError) as exc:
+                    if attempt == self.retries:
+                        raise RPCTransientError(str(exc) or type(exc).__name__) from exc
+                    # Back off without holding a concurrency slot.
+                    delay = random.uniform(0, self.backoff * 2**attempt)
+                    logger.warning("RPC %s failed (%s), retrying in %.2fs", label, exc, delay)
+                    await asyncio.sleep(delay)
+        finally:
+            self._latency[label].observe(time.perf_counter() - start)
+
+    def latency_stats(self) -> dict[str, dict[str, Any]]:
+        return {method: histogram.snapshot() for method, histogram in self._latency.items()}
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+def _error(response: dict[str, Any]) -> RPCError | None:
+    error = response.get("error")
+    if not error:
+        return None
+    return RPCError(error.get("code", -32603), error.get("message", ""), error.get("data"))
+
+
+def _result(response: dict[str, Any]) -> Any:
+    error = _error(response)
+    if error:
+        raise error
+    return response.get("result")
+
+
+_rpc_client: JsonRpcClient | None = None
+
+
+def get_rpc_client() -> JsonRpcClient:
+    global _rpc_client
+    if _rpc_client is None:
+        settings = get_settings()
+        if not settings.blockchain_rpc:
+            raise RuntimeError("BLOCKCHAIN_RPC required for RPC access")
+        _rpc_client = JsonRpcClient(
+            settings.blockchain_rpc,
+            max_connections=settings.blockchain_rpc_max_connections,
+            max_concurrency=settings.blockchain_rpc_concurrency,
+            timeout=settings.blockchain_rpc_timeout_seconds,
+            retries=settings.blockchain_rpc_retries,
+        )
+    return _rpc_client
+
+
+def _latency_lines() -> list[str]:
+    name = "dhanrakshak_rpc_duration_seconds"
+    lines = [f"# HELP {name} Blockchain JSON-RPC calls, retries included.", f"# TYPE {name} histogram"]
+    if _rpc_client is not None:
+        for method, histogram in sorted(_rpc_client._latency.items()):
+            lines += histogram_lines(name, ("method",), (method,), histogram)
+    return lines
+
+
+get_metrics_registry().collector(_latency_lines)
+
+
+async def close_rpc_client() -> None:
+    global _rpc_client
+    if _rpc_client is not None:
+        await _rpc_client.aclose()
+        _rpc_client = None
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from app import IMPORT_STARTED
+from app.auth import warm_auth
+from app.config import get_settings
+from app.services.db import init_db_pool
+from app.services.metrics import get_metrics_registry
+from app.services.supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+# Best-effort steps run concurrently before the worker starts serving; each opens something the
+# first request would otherwise wait for.
+WARMUP_STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "supabase": lambda: get_supabase_client().warm_up(),
+    "db_pool": init_db_pool,
+    "auth": warm_auth,
+}
+
+# Phase -> seconds for the current worker: "imports", "lifespan", "total" and "warmup.<step>".
+_timings: dict[str, float] = {}
+
+
+def startup_timings() -> dict[str, float]:
+    return dict(_timings)
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[None]]) -> None:
+    start = time.perf_counter()
+    try:
+        await step()
+    except Exception as exc:
+        logger.warning("Warm-up step %s failed, it will connect on first use: %s", name, exc)
+    finally:
+        _timings[f"warmup.{name}"] = time.perf_counter() - start
+
+
+async def warm_up() -> None:
+    """Run ``WARMUP_STEPS`` in parallel, abandoning any still running after the warm-up timeout."""
+    settings = get_settings()
+    if not settings.startup_warmup:
+        return
+    tasks = {name: asyncio.create_task(_run_step(name, step)) for name, step in WARMUP_STEPS.items()}
+    _, pending = await asyncio.wait(tasks.values(), timeout=settings.startup_warmup_timeout_seconds)
+    if pending:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        late = [name for name, task in tasks.items() if task in pending]
+        logger.warning("Warm-up timed out after %ss waiting for %s", settings.startup_warmup_timeout_seconds, ", ".join(late))
+
+
+def report_startup(lifespan_started: float) -> None:
+    """Log how long this worker took to import and to warm up, and keep the numbers for /metrics."""
+    now = time.perf_counter()
+    _timings["imports"] = lifespan_started - IMPORT_STARTED
+    _timings["lifespan"] = now - lifespan_started
+    _timings["total"] = now - IMPORT_STARTED
+    steps = ", ".join(
+        f"{name.removeprefix('warmup.')} {1000 * seconds:.0f}ms"
+        for name, seconds in _timings.items()
+        if name.startswith("warmup.")
+    )
+    logger.info(
+        "Started in %.0fms: imports %.0fms, lifespan %.0fms%s",
+        1000 * _timings["total"],
+        1000 * _timings["imports"],
+        1000 * _timings["lifespan"],
+        f" (warm-up: {steps})" if steps else "",
+    )
+
+
+get_metrics_registry().gauge(
+    "dhanrakshak_startup_seconds",
+    "Time this worker spent starting, by phase.",
+    lambda: {(phase,): seconds for phase, seconds in _timings.items()},
+    ("phase",),
+)
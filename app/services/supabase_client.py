@@ -1,33 +1,62 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
 import json
 import uuid
 from datetime import datetime
-from typing import Any
+from typing import IO, TYPE_CHECKING, Any, AsyncIterator
 
-from supabase import create_client, Client
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.exceptions import APIError
+from storage3 import AsyncStorageClient
+from storage3.utils import StorageException
 
-from app.config import get_settings
-from app.auth import AuthenticatedUser
+from app.config import Settings, get_settings
+from app.services.blockchain import canonical_hash, document_section, ml_section
+from app.services.cache import TTLCache
+from app.services.metrics import instrument_methods
 
+if TYPE_CHECKING:
+    from supabase import Client
 
+    from app.auth import AuthenticatedUser
+
+
+def dossier_object_path(filing_id: str) -> str:
+    return f"{filing_id}/dossier.zip"
+
+
+def filing_etag(filing: dict[str, Any]) -> str:
+    """Strong ETag for a filing row with its embedded documents, ML results and risk flags."""
+    digest = hashlib.sha256(json.dumps(filing, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _user_row(user: AuthenticatedUser) -> dict[str, Any]:
+    # Claims missing from the JWT are left out so an upsert never blanks stored values.
+    row: dict[str, Any] = {"id": user.user_id}
+    if user.email is not None:
+        row["email"] = user.email
+    if user.full_name is not None:
+        row["full_name"] = user.full_name
+    return row
+
+
+@instrument_methods("supabase_sync")
 class SupabaseService:
     def __init__(self) -> None:
         settings = get_settings()
         self.settings = settings
+        # The full SDK (gotrue, realtime, ...) costs ~100ms to import and only this legacy client needs it.
+        from supabase import create_client
+
         self.client: Client = create_client(settings.supabase_url, settings.supabase_service_role_key)
 
     def ensure_user(self, user: AuthenticatedUser) -> None:
-        existing = self.client.table("users").select("id").eq("id", user.user_id).execute()
-        if not existing.data:
-            self.client.table("users").insert(
-                {
-                    "id": user.user_id,
-                    "email": user.email,
-                    "full_name": user.full_name,
-                }
-            ).execute()
+        self.client.table("users").upsert(_user_row(user), on_conflict="id").execute()
 
     def create_filing(self, user: AuthenticatedUser, metadata: dict[str, Any] | None) -> dict[str, Any]:
         payload = {
@@ -113,7 +142,7 @@ class SupabaseService:
         return response.get("signedURL")
 
     def store_dossier(self, bucket: str, filing_id: str, content: bytes) -> str:
-        dossier_path = f"{filing_id}/dossier.zip"
+        dossier_path = dossier_object_path(filing_id)
         self.upload_file(bucket, dossier_path, content, "application/zip")
         return dossier_path
 
@@ -133,6 +162,8 @@ class SupabaseService:
             .select("*")
             .eq("filing_id", filing_id)
             .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .limit(1)
             .maybe_single()
             .execute()
         )
@@ -172,11 +203,521 @@ class SupabaseService:
         return response.data
 
 
-_supabase_service: SupabaseService | None = None
+def _pooled_session(base_url: str, headers: dict[str, str], settings: Settings) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers=headers,
+        timeout=settings.supabase_timeout_seconds,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_max_connections,
+            max_keepalive_connections=settings.supabase_max_keepalive,
+        ),
+        follow_redirects=True,
+        http2=True,
+    )
+
+
+_STREAM_CHUNK_SIZE = 256 * 1024
+_MISSING: Any = object()
+
+
+async def iter_file(fileobj: IO[bytes], chunk_size: int = _STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    while chunk := fileobj.read(chunk_size):
+        yield chunk
+
+
+def _is_not_found(status_code: int, body: dict[str, Any]) -> bool:
+    # Supabase storage reports missing objects as 400 with a not_found error body.
+    return status_code == 404 or str(body.get("statusCode")) == "404" or body.get("error") == "not_found"
+
+
+def _error_body(response: httpx.Response) -> dict[str, Any]:
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout, verify=True) -> httpx.AsyncClient:
+        return _pooled_session(base_url, headers, get_settings())
+
+
+class _PooledStorageClient(AsyncStorageClient):
+    def _create_session(self, base_url, headers, timeout, verify=True) -> httpx.AsyncClient:
+        return _pooled_session(base_url, headers, get_settings())
+
+
+@instrument_methods(
+    "supabase",
+    exclude=("table", "cached_filing_etag", "invalidate_filing", "filing_cache_stats", "signed_url_cache_stats"),
+)
+class AsyncSupabaseService:
+    """Non-blocking counterpart of SupabaseService.
+
+    PostgREST and storage calls go through long-lived httpx.AsyncClient sessions, so
+    connections are kept alive and shared by every request on the worker.
+    """
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.settings = settings
+        base_url = str(settings.supabase_url).rstrip("/")
+        headers = {
+            "apiKey": settings.supabase_service_role_key,
+            "Authorization": f"Bearer {settings.supabase_service_role_key}",
+        }
+        self.postgrest = _PooledPostgrestClient(f"{base_url}/rest/v1", headers=headers)
+        self.storage = _PooledStorageClient(f"{base_url}/storage/v1", headers)
+        self._known_users: TTLCache[str, tuple[str | None, str | None]] = TTLCache(
+            maxsize=settings.known_user_cache_size
+        )
+        # (bucket, path) -> signed URL, or None for an object known to be missing.
+        self._signed_urls: TTLCache[tuple[str, str], str | None] = TTLCache(maxsize=settings.signed_url_cache_size)
+        # filing_id -> (user_id, etag, filing).
+        self._filings: TTLCache[str, tuple[str, str, dict[str, Any]]] = TTLCache(
+            maxsize=settings.filing_cache_size, ttl=settings.filing_cache_ttl_seconds
+        )
+        # filing_id -> [reads in flight, invalidations seen by them]. An entry lives exactly as long as
+        # a read of that filing is in flight, so it cannot be evicted while the read still needs it;
+        # a read whose counter moved raced with a write and is not cached.
+        self._filing_reads: dict[str, list[int]] = {}
+
+    def table(self, name: str):
+        return self.postgrest.from_(name)
+
+    async def aclose(self) -> None:
+        await self.postgrest.aclose()
+        await self.storage.aclose()
+
+    async def warm_up(self) -> None:
+        """Open a PostgREST and a storage connection so the first request skips DNS and TLS setup."""
+        await asyncio.gather(self.postgrest.session.head("/"), self.storage.session.head("/"))
+
+    async def ensure_user(self, user: AuthenticatedUser) -> None:
+        # Skip the write entirely for users already upserted with the same profile.
+        profile = (user.email, user.full_name)
+        if self._known_users.get(user.user_id) == profile:
+            return
+        await self.table("users").upsert(_user_row(user), on_conflict="id").execute()
+        self._known_users.set(user.user_id, profile)
+
+    async def create_filing(self, user: AuthenticatedUser, metadata: dict[str, Any] | None) -> dict[str, Any]:
+        payload = {
+            "user_id": user.user_id,
+            "status": "DRAFT",
+            "metadata": metadata or {},
+        }
+        response = await self.table("filings").insert(payload).execute()
+        return response.data[0]
+
+    async def insert_document(
+        self,
+        filing_id: str,
+        user_id: str,
+        storage_path: str,
+        content_type: str,
+        sha256: str | None = None,
+    ) -> dict[str, Any]:
+        row = {
+            "filing_id": filing_id,
+            "user_id": user_id,
+            "document_type": "FORM16",
+            "storage_path": storage_path,
+            "content_type": content_type,
+            "sha256": sha256,
+        }
+        row["content_hash"] = canonical_hash(document_section(row))
+        response = await self.table("documents").insert(row).execute()
+        self.invalidate_filing(filing_id)
+        return response.data[0]
+
+    async def insert_ml_results(self, filing_id: str, user_id: str, parsed_json: dict[str, Any]) -> dict[str, Any]:
+        # Parsed Form-16 payloads can be large, so their section hash is computed off the event loop.
+        content_hash = await asyncio.to_thread(canonical_hash, ml_section({"parsed_json": parsed_json}))
+        response = await self.table("ml_results").insert(
+            {
+                "filing_id": filing_id,
+                "user_id": user_id,
+                "parsed_json": parsed_json,
+                "content_hash": content_hash,
+            }
+        ).execute()
+        self.invalidate_filing(filing_id)
+        return response.data[0]
+
+    async def upsert_risk_flags(self, filing_id: str, user_id: str, flags: dict[str, str]) -> dict[str, Any]:
+        response = await self.table("risk_flags").upsert(
+            {
+                "filing_id": filing_id,
+                "user_id": user_id,
+                "flags": flags,
+            },
+            on_conflict="filing_id",
+        ).execute()
+        self.invalidate_filing(filing_id)
+        return response.data[0]
+
+    async def get_owned_filing_ids(self, filing_ids: list[str], user_id: str) -> set[str]:
+        response = await self.table("filings").select("id").in_("id", filing_ids).eq("user_id", user_id).execute()
+        return {row["id"] for row in response.data}
+
+    async def insert_ml_results_batch(self, user_id: str, items: list[tuple[str, dict[str, Any]]]) -> list[dict[str, Any]]:
+        """Insert ``(filing_id, parsed_json)`` pairs as one multi-row insert; rows come back in input order."""
+        content_hashes = await asyncio.to_thread(
+            lambda: [canonical_hash(ml_section({"parsed_json": parsed_json})) for _, parsed_json in items]
+        )
+        rows = [
+            {"filing_id": filing_id, "user_id": user_id, "parsed_json": parsed_json, "content_hash": content_hash}
+            for (filing_id, parsed_json), content_hash in zip(items, content_hashes)
+        ]
+        response = await self.table("ml_results").insert(rows).execute()
+        for filing_id in {filing_id for filing_id, _ in items}:
+            self.invalidate_filing(filing_id)
+        return response.data
+
+    async def upsert_risk_flags_batch(self, user_id: str, flags_by_filing: dict[str, dict[str, str]]) -> None:
+        rows = [{"filing_id": filing_id, "user_id": user_id, "flags": flags} for filing_id, flags in flags_by_filing.items()]
+        await self.table("risk_flags").upsert(rows, on_conflict="filing_id").execute()
+        for filing_id in flags_by_filing:
+            self.invalidate_filing(filing_id)
+
+    async def update_filings_status(self, filing_ids: list[str], user_id: str, status: str) -> None:
+        await self.table("filings").update({"status": status}).in_("id", filing_ids).eq("user_id", user_id).execute()
+        for filing_id in filing_ids:
+            self.invalidate_filing(filing_id)
+
+    async def get_filing(self, filing_id: str, user_id: str) -> dict[str, Any] | None:
+        """Fetch a filing with its sub-resources from the database and refresh the filing cache."""
+        filing, _ = await self._fetch_filing(filing_id, user_id)
+        return filing
+
+    async def get_filing_cached(self, filing_id: str, user_id: str) -> tuple[dict[str, Any] | None, str | None]:
+        """Return ``(filing, etag)``, from the filing cache when possible. Treat the filing as read-only."""
+        entry = self._filings.get(filing_id)
+        if entry is not None and entry[0] == user_id:
+            return entry[2], entry[1]
+        return await self._fetch_filing(filing_id, user_id)
+
+    def cached_filing_etag(self, filing_id: str, user_id: str) -> str | None:
+        entry = self._filings.get(filing_id)
+        return entry[1] if entry is not None and entry[0] == user_id else None
+
+    def invalidate_filing(self, filing_id: str) -> None:
+        reads = self._filing_reads.get(filing_id)
+        if reads is not None:
+            reads[1] += 1
+        self._filings.pop(filing_id)
+
+    def filing_cache_stats(self) -> dict[str, int]:
+        return self._filings.stats()
+
+    async def _fetch_filing(self, filing_id: str, user_id: str) -> tuple[dict[str, Any] | None, str | None]:
+        reads = self._filing_reads.setdefault(filing_id, [0, 0])
+        reads[0] += 1
+        version = reads[1]
+        try:
+            response = await (
+                self.table("filings")
+                .select("*, documents(*), ml_results(*), risk_flags(*)")
+                .eq("id", filing_id)
+                .eq("user_id", user_id)
+                .maybe_single()
+                .execute()
+            )
+        finally:
+            raced = reads[1] != version
+            reads[0] -= 1
+            if not reads[0]:
+                del self._filing_reads[filing_id]
+        filing = response.data if response else None
+        if filing is None:
+            return None, None
+        etag = filing_etag(filing)
+        if not raced:
+            self._filings.set(filing_id, (user_id, etag, filing))
+        return filing, etag
+
+    async def update_filing_status(self, filing_id: str, user_id: str, status: str) -> None:
+        await self.table("filings").update({"status": status}).eq("id", filing_id).eq("user_id", user_id).execute()
+        self.invalidate_filing(filing_id)
+
+    async def insert_audit(self, user_id: str, event_type: str, metadata: dict[str, Any] | None = None) -> None:
+        await self.table("audit_logs").insert(
+            {
+                "user_id": user_id,
+                "event_type": event_type,
+                "metadata": metadata or {},
+            }
+        ).execute()
+
+    async def insert_audit_batch(self, rows: list[dict[str, Any]]) -> None:
+        await self.table("audit_logs").insert(rows).execute()
+
+    async def list_audit_logs(
+        self,
+        limit: int = 100,
+        after: tuple[str, str] | None = None,
+        user_id: str | None = None,
+        event_type: str | None = None,
+        filing_id: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """Newest-first audit rows, optionally only those after the ``(created_at, id)`` keyset ``after``.
+
+        The keyset predicate lets every page use the ``(created_at, id)`` indexes, so deep pages cost
+        the same as the first one.
+        """
+        query = self.table("audit_logs").select("*")
+        if user_id:
+            query = query.eq("user_id", user_id)
+        if event_type:
+            query = query.eq("event_type", event_type)
+        if filing_id:
+            query = query.eq("metadata->>filing_id", filing_id)
+        if since:
+            query = query.gte("created_at", since.isoformat())
+        if until:
+            query = query.lt("created_at", until.isoformat())
+        if after:
+            created_at, row_id = after
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})')
+        response = await query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+        return response.data
+
+    async def upload_file(self, bucket: str, storage_path: str, content: bytes, content_type: str) -> None:
+        await self.storage.from_(bucket).upload(
+            path=storage_path,
+            file=content,
+            file_options={"content-type": content_type, "upsert": "true"},
+        )
+        self._signed_urls.pop((bucket, storage_path))
+
+    async def upload_stream(
+        self,
+        bucket: str,
+        storage_path: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+    ) -> None:
+        """Upload an object from an async byte stream without holding it in memory."""
+        response = await self.storage.session.post(
+            f"/object/{bucket}/{storage_path}",
+            content=chunks,
+            headers={"content-type": content_type, "x-upsert": "true"},
+        )
+        if response.is_error:
+            raise StorageException({**_error_body(response), "statusCode": response.status_code})
+        self._signed_urls.pop((bucket, storage_path))
+
+    async def download_file(self, bucket: str, storage_path: str) -> bytes:
+        return await self.storage.from_(bucket).download(storage_path)
+
+    async def stream_file(self, bucket: str, storage_path: str) -> AsyncIterator[bytes] | None:
+        """Open an object for streaming download; returns None if it does not exist."""
+        request = self.storage.session.build_request("GET", f"/object/{bucket}/{storage_path}")
+        response = await self.storage.session.send(request, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
+            body = _error_body(response)
+            if _is_not_found(response.status_code, body):
+                return None
+            raise StorageException({**body, "statusCode": response.status_code})
+
+        async def chunks() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in response.aiter_bytes(_STREAM_CHUNK_SIZE):
+                    yield chunk
+            finally:
+                await response.aclose()
+
+        return chunks()
+
+    async def download_to_file(self, bucket: str, storage_path: str, fileobj: IO[bytes]) -> None:
+        chunks = await self.stream_file(bucket, storage_path)
+        if chunks is None:
+            raise StorageException({"statusCode": 404, "error": "not_found", "message": storage_path})
+        async for chunk in chunks:
+            fileobj.write(chunk)
+        fileobj.seek(0)
+
+    async def list_objects(self, bucket: str, prefix: str, limit: int = 100) -> list[dict[str, Any]]:
+        """Objects directly under ``prefix``, newest first."""
+        options = {"limit": limit, "sortBy": {"column": "created_at", "order": "desc"}}
+        return await self.storage.from_(bucket).list(prefix, options)
+
+    async def create_signed_url(self, bucket: str, storage_path: str, expires_in: int = 3600) -> str | None:
+        """Signed URL for an object, or None if it does not exist.
+
+        URLs are reused until fewer than ``SIGNED_URL_MIN_REMAINING_SECONDS`` of their lifetime
+        remain; misses are remembered for ``SIGNED_URL_NEGATIVE_TTL_SECONDS``. Uploads through
+        this service drop the entry for the object they write.
+        """
+        key = (bucket, storage_path)
+        cached = self._signed_urls.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        try:
+            response = await self.storage.from_(bucket).create_signed_url(storage_path, expires_in)
+        except StorageException as exc:
+            body = exc.args[0] if exc.args and isinstance(exc.args[0], dict) else {}
+            if not _is_not_found(0, body):
+                raise
+            self._signed_urls.set(key, None, ttl=self.settings.signed_url_negative_ttl_seconds)
+            return None
+        signed_url = response.get("signedURL")
+        self._signed_urls.set(key, signed_url, ttl=expires_in - self.settings.signed_url_min_remaining_seconds)
+        return signed_url
+
+    def signed_url_cache_stats(self) -> dict[str, int]:
+        return self._signed_urls.stats()
+
+    async def store_dossier(self, bucket: str, filing_id: str, archive: IO[bytes]) -> str:
+        dossier_path = dossier_object_path(filing_id)
+        await self.upload_stream(bucket, dossier_path, iter_file(archive), "application/zip")
+        return dossier_path
+
+    async def get_documents(self, filing_id: str, user_id: str) -> list[dict[str, Any]]:
+        response = await (
+            self.table("documents")
+            .select("*")
+            .eq("filing_id", filing_id)
+            .eq("user_id", user_id)
+            .execute()
+        )
+        return response.data
+
+    async def get_ml_result(self, filing_id: str, user_id: str) -> dict[str, Any] | None:
+        # Newest row: filings re-parsed (or posted twice without an Idempotency-Key) have several.
+        response = await (
+            self.table("ml_results")
+            .select("*")
+            .eq("filing_id", filing_id)
+            .eq("user_id", user_id)
+            .order("created_at", desc=True)
+            .limit(1)
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
+
+    async def get_risk_flags(self, filing_id: str, user_id: str) -> dict[str, Any] | None:
+        response = await (
+            self.table("risk_flags")
+            .select("*")
+            .eq("filing_id", filing_id)
+            .eq("user_id", user_id)
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
+
+    async def record_blockchain(self, filing_id: str, user_id: str, tx_hash: str, payload_hash: str) -> dict[str, Any]:
+        response = await self.table("blockchain_records").insert(
+            {
+                "filing_id": filing_id,
+                "user_id": user_id,
+                "tx_hash": tx_hash,
+                "payload_hash": payload_hash,
+            }
+        ).execute()
+        return response.data[0]
+
+    async def get_blockchain_record(self, filing_id: str, user_id: str) -> dict[str, Any] | None:
+        response = await (
+            self.table("blockchain_records")
+            .select("*")
+            .eq("filing_id", filing_id)
+            .eq("user_id", user_id)
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
+
+    async def set_dossier_key(self, filing_id: str, user_id: str, dossier_key: str) -> None:
+        await (
+            self.table("blockchain_records")
+            .update({"dossier_key": dossier_key})
+            .eq("filing_id", filing_id)
+            .eq("user_id", user_id)
+            .execute()
+        )
+
+    async def create_dossier_job(self, job: dict[str, Any]) -> dict[str, Any]:
+        response = await self.table("dossier_jobs").insert(job).execute()
+        return response.data[0]
+
+    async def get_dossier_job(self, job_id: str, user_id: str) -> dict[str, Any] | None:
+        response = await (
+            self.table("dossier_jobs")
+            .select("*")
+            .eq("id", job_id)
+            .eq("user_id", user_id)
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
+
+    async def update_dossier_job(self, job_id: str, fields: dict[str, Any], from_status: str | None = None) -> bool:
+        """Update a job, optionally only while it is in ``from_status``; returns whether a row changed."""
+        query = self.table("dossier_jobs").update(fields).eq("id", job_id)
+        if from_status is not None:
+            query = query.eq("status", from_status)
+        response = await query.execute()
+        return bool(response.data)
+
+    async def insert_idempotency_key(self, row: dict[str, Any]) -> bool:
+        """Insert a key reservation; False if the ``(user_id, key)`` pair already exists."""
+        try:
+            await self.table("idempotency_keys").insert(row).execute()
+        except APIError as exc:
+            if exc.code == "23505":
+                return False
+            raise
+        return True
+
+    async def get_idempotency_key(self, user_id: str, key: str) -> dict[str, Any] | None:
+        response = await (
+            self.table("idempotency_keys").select("*").eq("user_id", user_id).eq("key", key).maybe_single().execute()
+        )
+        return response.data if response else None
+
+    async def update_idempotency_key(self, user_id: str, key: str, fields: dict[str, Any]) -> None:
+        await self.table("idempotency_keys").update(fields).eq("user_id", user_id).eq("key", key).execute()
+
+    async def delete_idempotency_keys(
+        self, user_id: str | None = None, key: str | None = None, expired_before: str | None = None
+    ) -> None:
+        query = self.table("idempotency_keys").delete()
+        if user_id is not None:
+            query = query.eq("user_id", user_id).eq("key", key)
+        if expired_before is not None:
+            query = query.lt("expires_at", expired_before)
+        await query.execute()
+
+    async def list_dossier_jobs(self, status: str, updated_before: str | None = None) -> list[dict[str, Any]]:
+        query = self.table("dossier_jobs").select("*").eq("status", status)
+        if updated_before is not None:
+            query = query.lt("updated_at", updated_before)
+        response = await query.order("created_at").execute()
+        return response.data
+
+
+_supabase_service: AsyncSupabaseService | None = None
 
 
-def get_supabase_client() -> SupabaseService:
+def get_supabase_client() -> AsyncSupabaseService:
     global _supabase_service
     if _supabase_service is None:
-        _supabase_service = SupabaseService()
+        _supabase_service = AsyncSupabaseService()
     return _supabase_service
+
+
+async def close_supabase_client() -> None:
+    global _supabase_service
+    if _supabase_service is not None:
+        await _supabase_service.aclose()
+        _supabase_service = None
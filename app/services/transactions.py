@@ -1,42 +1,143 @@
 from __future__ import annotations
 
 from typing import Any
-import json
-
-import psycopg2
-from psycopg2.extras import Json
 
 from app.config import get_settings
+from app.services.audit import insert_audit_sql
+from app.services.blockchain import canonical_hash, ml_section
+from app.services.db import get_db_pool
+from app.services.metrics import timed
+from app.services.supabase_client import get_supabase_client
 
 
-def finalize_filing_transaction(
+@timed("db.finalize_transaction")
+async def finalize_filing_transaction(
     filing_id: str,
     user_id: str,
     tx_hash: str,
     payload_hash: str,
+    merkle_root: str | None = None,
+    merkle_proof: list[dict[str, str]] | None = None,
+    hash_version: int = 1,
+    section_hashes: dict[str, Any] | None = None,
 ) -> None:
     settings = get_settings()
     if not settings.supabase_db_url:
         raise RuntimeError("SUPABASE_DB_URL required for transactional finalize")
 
-    with psycopg2.connect(settings.supabase_db_url) as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(
-                "SELECT status FROM filings WHERE id = %s AND user_id = %s FOR UPDATE",
-                (filing_id, user_id),
-            )
-            row = cursor.fetchone()
-            if not row:
-                raise ValueError("Filing not found")
-            if row[0] == "FINAL":
-                raise ValueError("Filing already finalized")
-
-            cursor.execute(
-                "INSERT INTO blockchain_records (filing_id, user_id, tx_hash, payload_hash) VALUES (%s, %s, %s, %s)",
-                (filing_id, user_id, tx_hash, payload_hash),
-            )
-            cursor.execute(
-                "UPDATE filings SET status = 'FINAL' WHERE id = %s AND user_id = %s",
-                (filing_id, user_id),
+    try:
+        await get_db_pool().run(
+            _finalize, filing_id, user_id, tx_hash, payload_hash, merkle_root, merkle_proof, hash_version, section_hashes
+        )
+    finally:
+        # The write bypasses the service, so drop its cached view of the filing here.
+        get_supabase_client().invalidate_filing(filing_id)
+
+
+def _finalize(
+    conn: Any,
+    filing_id: str,
+    user_id: str,
+    tx_hash: str,
+    payload_hash: str,
+    merkle_root: str | None,
+    merkle_proof: list[dict[str, str]] | None,
+    hash_version: int,
+    section_hashes: dict[str, Any] | None,
+) -> None:
+    from psycopg2.extras import Json
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT status FROM filings WHERE id = %s AND user_id = %s FOR UPDATE",
+            (filing_id, user_id),
+        )
+        row = cursor.fetchone()
+        if not row:
+            raise ValueError("Filing not found")
+        if row[0] == "FINAL":
+            raise ValueError("Filing already finalized")
+
+        cursor.execute(
+            "INSERT INTO blockchain_records"
+            " (filing_id, user_id, tx_hash, payload_hash, merkle_root, merkle_proof, hash_version, section_hashes)"
+            " VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            (
+                filing_id,
+                user_id,
+                tx_hash,
+                payload_hash,
+                merkle_root,
+                Json(merkle_proof) if merkle_proof is not None else None,
+                hash_version,
+                Json(section_hashes) if section_hashes is not None else None,
+            ),
+        )
+        cursor.execute(
+            "UPDATE filings SET status = 'FINAL' WHERE id = %s AND user_id = %s",
+            (filing_id, user_id),
+        )
+        insert_audit_sql(cursor, user_id, "BLOCKCHAIN_WRITTEN", {"filing_id": filing_id, "tx_hash": tx_hash})
+        insert_audit_sql(cursor, user_id, "FINALIZED", {"filing_id": filing_id})
+
+
+@timed("db.ml_results_transaction")
+async def write_ml_results_transaction(
+    user_id: str,
+    items: list[tuple[str, dict[str, Any]]],
+    risk_flags: dict[str, dict[str, str]],
+    status: str,
+) -> list[str]:
+    """Insert ``(filing_id, parsed_json)`` rows, upsert risk flags and set the filings' status atomically.
+
+    Returns the new ml_results ids in input order.
+    """
+    settings = get_settings()
+    if not settings.supabase_db_url:
+        raise RuntimeError("SUPABASE_DB_URL required for transactional ML results")
+
+    rows = [
+        (filing_id, user_id, parsed_json, canonical_hash(ml_section({"parsed_json": parsed_json})))
+        for filing_id, parsed_json in items
+    ]
+    filing_ids = sorted({filing_id for filing_id, _ in items})
+    try:
+        return await get_db_pool().run(_write_ml_results, user_id, rows, risk_flags, filing_ids, status)
+    finally:
+        client = get_supabase_client()
+        for filing_id in filing_ids:
+            client.invalidate_filing(filing_id)
+
+
+def _write_ml_results(
+    conn: Any,
+    user_id: str,
+    rows: list[tuple[str, str, dict[str, Any], str]],
+    risk_flags: dict[str, dict[str, str]],
+    filing_ids: list[str],
+    status: str,
+) -> list[str]:
+    from psycopg2.extras import Json, execute_values
+
+    with conn.cursor() as cursor:
+        # One page, so RETURNING yields every id in VALUES order.
+        inserted = execute_values(
+            cursor,
+            "INSERT INTO ml_results (filing_id, user_id, parsed_json, content_hash) VALUES %s RETURNING id",
+            [(filing_id, owner, Json(parsed), content_hash) for filing_id, owner, parsed, content_hash in rows],
+            page_size=len(rows),
+            fetch=True,
+        )
+        if risk_flags:
+            execute_values(
+                cursor,
+                "INSERT INTO risk_flags (filing_id, user_id, flags) VALUES %s"
+                " ON CONFLICT (filing_id) DO UPDATE SET flags = EXCLUDED.flags",
+                [(filing_id, user_id, Json(flags)) for filing_id, flags in risk_flags.items()],
+                page_size=len(risk_flags),
             )
-        conn.commit()
+        cursor.execute(
+            "UPDATE filings SET status = %s WHERE id = ANY(%s::uuid[]) AND user_id = %s",
+            (status, filing_ids, user_id),
+        )
+    return [str(row[0]) for row in inserted]
@@ -0,0 +1,29 @@
+import pytest
+
+from app.config import get_settings
+from app.services import idempotency, supabase_client
+from app.tests.fakes import FakeSupabase
+
+
+@pytest.fixture(autouse=True)
+def _reset_settings():
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def fake_supabase(monkeypatch):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setenv("JWT_SECRET", "secret")
+    monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+    monkeypatch.setenv("DOSSIER_JOB_STORE", "sqlite")
+    monkeypatch.setenv("DOSSIER_JOB_DB_PATH", ":memory:")
+    monkeypatch.setenv("DOSSIER_RENDER_PROCESSES", "0")
+    monkeypatch.setenv("IDEMPOTENCY_STORE", "memory")
+    monkeypatch.setattr(idempotency, "_idempotency_store", None)
+    fake = FakeSupabase()
+    monkeypatch.setattr(supabase_client, "_supabase_service", fake)
+    return fake
+
@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime
+
+from app.services.audit import audit_row
+from app.services.supabase_client import filing_etag
+
+
+class FakeSupabase:
+    def __init__(self) -> None:
+        self.users = {}
+        self.filings = {}
+        self.documents = {}
+        self.ml_results = {}
+        self.risk_flags = {}
+        self.blockchain = {}
+        self.audit_logs = []
+        self.storage = {}
+        self.idempotency_keys = {}
+
+    async def warm_up(self):
+        pass
+
+    async def aclose(self):
+        pass
+
+    async def ensure_user(self, user):
+        self.users[user.user_id] = {"id": user.user_id, "email": user.email, "full_name": user.full_name}
+
+    async def create_filing(self, user, metadata):
+        filing_id = str(uuid.uuid4())
+        filing = {"id": filing_id, "user_id": user.user_id, "status": "DRAFT", "metadata": metadata or {}}
+        self.filings[filing_id] = filing
+        return filing
+
+    async def insert_document(self, filing_id, user_id, storage_path, content_type, sha256=None):
+        doc_id = str(uuid.uuid4())
+        doc = {
+            "id": doc_id,
+            "filing_id": filing_id,
+            "user_id": user_id,
+            "storage_path": storage_path,
+            "content_type": content_type,
+            "sha256": sha256,
+        }
+        self.documents.setdefault(filing_id, []).append(doc)
+        return doc
+
+    async def insert_ml_results(self, filing_id, user_id, parsed_json):
+        ml_id = str(uuid.uuid4())
+        ml = {"id": ml_id, "filing_id": filing_id, "user_id": user_id, "parsed_json": parsed_json}
+        self.ml_results[filing_id] = ml
+        return ml
+
+    async def upsert_risk_flags(self, filing_id, user_id, flags):
+        entry = {"id": str(uuid.uuid4()), "filing_id": filing_id, "user_id": user_id, "flags": flags}
+        self.risk_flags[filing_id] = entry
+        return entry
+
+    async def get_owned_filing_ids(self, filing_ids, user_id):
+        return {filing_id for filing_id in filing_ids if self.filings.get(filing_id, {}).get("user_id") == user_id}
+
+    async def insert_ml_results_batch(self, user_id, items):
+        return [await self.insert_ml_results(filing_id, user_id, parsed_json) for filing_id, parsed_json in items]
+
+    async def upsert_risk_flags_batch(self, user_id, flags_by_filing):
+        for filing_id, flags in flags_by_filing.items():
+            await self.upsert_risk_flags(filing_id, user_id, flags)
+
+    async def update_filings_status(self, filing_ids, user_id, status):
+        for filing_id in filing_ids:
+            self.filings[filing_id]["status"] = status
+
+    async def get_filing(self, filing_id, user_id):
+        filing = self.filings.get(filing_id)
+        if not filing or filing["user_id"] != user_id:
+            return None
+        return {
+            **filing,
+            "documents": self.documents.get(filing_id, []),
+            "ml_results": self.ml_results.get(filing_id),
+            "risk_flags": self.risk_flags.get(filing_id),
+        }
+
+    async def get_filing_cached(self, filing_id, user_id):
+        filing = await self.get_filing(filing_id, user_id)
+        return filing, filing_etag(filing) if filing else None
+
+    def cached_filing_etag(self, filing_id, user_id):
+        return None
+
+    def invalidate_filing(self, filing_id):
+        pass
+
+    async def update_filing_status(self, filing_id, user_id, status):
+        self.filings[filing_id]["status"] = status
+
+    async def insert_audit(self, user_id, event_type, metadata=None):
+        await self.insert_audit_batch([audit_row(user_id, event_type, metadata)])
+
+    async def insert_audit_batch(self, rows):
+        self.audit_logs.extend({"id": str(uuid.uuid4()), **row} for row in rows)
+
+    async def list_audit_logs(self, limit=100, after=None, user_id=None, event_type=None, filing_id=None, since=None, until=None):
+        def matches(row):
+            created_at = datetime.fromisoformat(row["created_at"])
+            return (
+                (user_id is None or row["user_id"] == user_id)
+                and (event_type is None or row["event_type"] == event_type)
+                and (filing_id is None or (row.get("metadata") or {}).get("filing_id") == filing_id)
+                and (since is None or created_at >= since)
+                and (until is None or created_at < until)
+                and (after is None or (row["created_at"], row["id"]) < after)
+            )
+
+        rows = sorted(self.audit_logs, key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        return [row for row in rows if matches(row)][:limit]
+
+    async def upload_file(self, bucket, storage_path, content, content_type):
+        self.storage[(bucket, storage_path)] = content
+
+    async def upload_stream(self, bucket, storage_path, chunks, content_type):
+        self.storage[(bucket, storage_path)] = b"".join([chunk async for chunk in chunks])
+
+    async def download_file(self, bucket, storage_path):
+        return self.storage[(bucket, storage_path)]
+
+    async def stream_file(self, bucket, storage_path):
+        if (bucket, storage_path) not in self.storage:
+            return None
+
+        async def chunks():
+            yield self.storage[(bucket, storage_path)]
+
+        return chunks()
+
+    async def download_to_file(self, bucket, storage_path, fileobj):
+        fileobj.write(self.storage[(bucket, storage_path)])
+        fileobj.seek(0)
+
+    async def list_objects(self, bucket, prefix, limit=100):
+        objects = [
+            {"name": path[len(prefix) + 1 :], "metadata": {"size": len(content)}}
+            for (b, path), content in self.storage.items()
+            if b == bucket and path.startswith(f"{prefix}/")
+        ]
+        return sorted(objects, key=lambda item: item["name"], reverse=True)[:limit]
+
+    async def create_signed_url(self, bucket, storage_path, expires_in=3600):
+        if (bucket, storage_path) not in self.storage:
+            return None
+        return f"https://example.com/{bucket}/{storage_path}?exp={expires_in}"
+
+    async def store_dossier(self, bucket, filing_id, archive):
+        path = f"{filing_id}/dossier.zip"
+        await self.upload_file(bucket, path, archive.read(), "application/zip")
+        return path
+
+    async def insert_idempotency_key(self, row):
+        if (row["user_id"], row["key"]) in self.idempotency_keys:
+            return False
+        self.idempotency_keys[(row["user_id"], row["key"])] = dict(row)
+        return True
+
+    async def get_idempotency_key(self, user_id, key):
+        return self.idempotency_keys.get((user_id, key))
+
+    async def update_idempotency_key(self, user_id, key, fields):
+        self.idempotency_keys[(user_id, key)].update(fields)
+
+    async def delete_idempotency_keys(self, user_id=None, key=None, expired_before=None):
+        for pair, row in list(self.idempotency_keys.items()):
+            if (user_id is None or pair == (user_id, key)) and (expired_before is None or row["expires_at"] < expired_before):
+                del self.idempotency_keys[pair]
+
+    async def get_documents(self, filing_id, user_id):
+        return self.documents.get(filing_id, [])
+
+    async def get_ml_result(self, filing_id, user_id):
+        return self.ml_results.get(filing_id)
+
+    async def get_risk_flags(self, filing_id, user_id):
+        return self.risk_flags.get(filing_id)
+
+    async def get_blockchain_record(self, filing_id, user_id):
+        return self.blockchain.get(filing_id)
+
+    async def set_dossier_key(self, filing_id, user_id, dossier_key):
+        self.blockchain[filing_id]["dossier_key"] = dossier_key
+
+    async def record_blockchain(self, filing_id, user_id, tx_hash, payload_hash):
+        entry = {"filing_id": filing_id, "user_id": user_id, "tx_hash": tx_hash, "payload_hash": payload_hash}
+        self.blockchain[filing_id] = entry
+        return entry
+
+
+class FakeJsonRpcServer:
+    """Minimal JSON-RPC 2.0 node as an ASGI app; serve it through ``httpx.ASGITransport``.
+
+    ``fail_first`` answers that many HTTP requests with 503 and ``latency`` delays each one.
+    """
+
+    def __init__(self, fail_first=0, latency=0.0):
+        self.fail_first = fail_first
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.methods = {
+            "eth_sendRawTransaction": lambda params: "0x" + hashlib.sha256(params[0].encode()).hexdigest(),
+            "eth_blockNumber": lambda params: "0x10",
+        }
+
+    async def __call__(self, scope, receive, send):
+        body, more = b"", True
+        while more:
+            message = await receive()
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+        payload = json.loads(body)
+        self.requests.append(payload)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            status, content = 503, b"{}"
+        else:
+            result = [self._handle(item) for item in payload] if isinstance(payload, list) else self._handle(payload)
+            status, content = 200, json.dumps(result).encode()
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": content})
+
+    def _handle(self, request):
+        method = self.methods.get(request["method"])
+        if method is None:
+            return {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request["id"], "result": method(request["params"])}
+
+
+def seed_final_filing(fake, user_id="user-123", filing_id="filing-1"):
+    fake.filings[filing_id] = {"id": filing_id, "user_id": user_id, "status": "FINAL", "metadata": {"full_name": "Jane Doe"}}
+    fake.documents[filing_id] = [{"id": "doc-1", "filing_id": filing_id, "storage_path": f"{user_id}/{filing_id}/form16.pdf"}]
+    fake.storage[("filings", f"{user_id}/{filing_id}/form16.pdf")] = b"%PDF-1.4 test"
+    fake.blockchain[filing_id] = {"filing_id": filing_id, "user_id": user_id, "tx_hash": "0xabc", "payload_hash": "00" * 32}
+    return filing_id
@@ -0,0 +1,37 @@
+"""Throwaway schemas on the disposable Postgres named by ``TEST_DATABASE_URL``."""
+
+import os
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@contextmanager
+def throwaway_schema(prefix):
+    """Yield a connection whose search_path is a fresh schema, dropped afterwards."""
+    conn = psycopg2.connect(DATABASE_URL)
+    schema = f"{prefix}_{uuid.uuid4().hex[:8]}"
+    with conn.cursor() as cursor:
+        # Stand-ins for what Supabase provides, only when the database lacks them.
+        cursor.execute("CREATE SCHEMA IF NOT EXISTS auth")
+        cursor.execute(
+            "DO $$ BEGIN IF to_regprocedure('auth.uid()') IS NULL THEN"
+            " CREATE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE"
+            " AS 'SELECT nullif(current_setting(''request.jwt.claim.sub'', true), '''')::uuid'; END IF;"
+            " IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN"
+            " CREATE ROLE authenticated; END IF; END $$"
+        )
+        cursor.execute(f"CREATE SCHEMA {schema}")
+        cursor.execute(f"SET search_path TO {schema}, public")
+    conn.commit()
+    try:
+        yield conn
+    finally:
+        conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP SCHEMA {schema} CASCADE")
+        conn.commit()
+        conn.close()
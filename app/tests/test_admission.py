@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import QUEUE_FULL, QUEUE_TIMEOUT, AdmissionRejected, ConcurrencyLimiter
+
+
+def test_limiter_queues_in_order_and_rejects_when_full():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=2, timeout=5)
+        order = []
+
+        async def worker(name):
+            await limiter.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            limiter.release()
+
+        await limiter.acquire()
+        workers = [asyncio.create_task(worker(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        assert limiter.queued == 2
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == QUEUE_FULL
+        limiter.release()
+        await asyncio.gather(*workers)
+        return order, limiter.active
+
+    assert asyncio.run(run()) == (["a", "b"], 0)
+
+
+def test_limiter_times_out_and_forgets_cancelled_waiters():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, queue_size=5, timeout=0.01)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == QUEUE_TIMEOUT
+
+        limiter.timeout = 5
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release()
+        return limiter.queued, limiter.active
+
+    assert asyncio.run(run()) == (0, 0)
+
+
+def _token(user_id):
+    import jwt
+
+    return {"Authorization": f"Bearer {jwt.encode({'sub': user_id}, 'secret', algorithm='HS256')}"}
+
+
+def test_middleware_answers_429_per_user_and_503_when_the_queue_is_full(fake_supabase, monkeypatch):
+    import httpx
+
+    from app.middleware import AdmissionControlMiddleware
+    from app.services.metrics import get_metrics_registry
+
+    monkeypatch.setenv("FINALIZE_CONCURRENCY", "1")
+    monkeypatch.setenv("ADMISSION_QUEUE_SIZE", "1")
+    monkeypatch.setenv("PER_USER_CONCURRENCY", "2")
+    monkeypatch.setenv("ADMISSION_RETRY_AFTER_SECONDS", "7")
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def endpoint(scope, receive, send):
+            await gate.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        app = AdmissionControlMiddleware(endpoint)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/finalize", headers=_token("alice")))
+            queued = asyncio.create_task(client.post("/finalize", headers=_token("alice")))
+            await asyncio.sleep(0.01)
+            over_user = await client.post("/finalize", headers=_token("alice"))
+            over_queue = await client.post("/finalize", headers=_token("bob"))
+            unguarded = asyncio.create_task(client.post("/ml-results", headers=_token("bob")))
+            await asyncio.sleep(0.01)
+            gate.set()
+            return over_user, over_queue, await first, await queued, await unguarded
+
+    over_user, over_queue, first, queued, unguarded = asyncio.run(run())
+    assert (over_user.status_code, over_user.headers["retry-after"]) == (429, "7")
+    assert (over_queue.status_code, over_queue.headers["retry-after"]) == (503, "7")
+    assert first.status_code == queued.status_code == unguarded.status_code == 200
+    rendered = get_metrics_registry().render()
+    assert 'dhanrakshak_admission_rejections_total{route="/finalize",reason="user_limit"}' in rendered
+    assert 'dhanrakshak_admission_queue_depth{route="/finalize"} 0' in rendered
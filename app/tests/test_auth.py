@@ -0,0 +1,72 @@
+import asyncio
+import json
+import time
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from jwt.algorithms import ECAlgorithm
+
+from app import auth
+
+
+def _setup(monkeypatch, handler):
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon-key")
+    monkeypatch.delenv("JWT_SECRET", raising=False)
+    http = httpx.AsyncClient(base_url="https://example.supabase.co", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(auth, "_auth_http", http)
+    monkeypatch.setattr(auth, "_token_cache", None)
+    monkeypatch.setattr(auth, "_jwks", auth._JWKSKeys())
+
+
+def test_supabase_validation_is_cached_until_exp(monkeypatch):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/auth/v1/user":
+            return httpx.Response(200, json={"id": "user-1", "email": "a@example.com"})
+        return httpx.Response(404)
+
+    _setup(monkeypatch, handler)
+    token = jwt.encode({"sub": "user-1", "exp": int(time.time()) + 60}, "remote-secret", algorithm="HS256")
+
+    async def run():
+        first = await auth._verify_token(token)
+        second = await auth._verify_token(token)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == {"id": "user-1", "email": "a@example.com"}
+    assert calls.count("/auth/v1/user") == 1
+    stats = auth.token_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert auth._get_token_cache().remaining(next(iter(auth._token_cache._data))) <= 60
+
+
+def test_jwks_keys_verify_locally(monkeypatch):
+    # Supabase signs with asymmetric keys, which PyJWT loads only with ``cryptography`` installed.
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = {**json.loads(ECAlgorithm.to_jwk(private_key.public_key())), "kid": "k1", "alg": "ES256"}
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if request.url.path == "/auth/v1/.well-known/jwks.json":
+            return httpx.Response(200, json={"keys": [jwk]})
+        return httpx.Response(401)
+
+    _setup(monkeypatch, handler)
+    tokens = [
+        jwt.encode({"sub": f"user-{i}", "exp": int(time.time()) + 60}, private_key, algorithm="ES256", headers={"kid": "k1"})
+        for i in range(3)
+    ]
+
+    async def run():
+        return [await auth._verify_token(token) for token in tokens]
+
+    payloads = asyncio.run(run())
+    assert [p["sub"] for p in payloads] == ["user-0", "user-1", "user-2"]
+    assert calls == ["/auth/v1/.well-known/jwks.json"]
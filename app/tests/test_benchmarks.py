@@ -0,0 +1,28 @@
+import asyncio
+
+from benchmarks import bench_workflow
+from benchmarks.common import percentile
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(i) for i in range(1, 101)]
+    assert [percentile(samples, p) for p in (50, 95, 99)] == [50.0, 95.0, 99.0]
+    assert percentile([], 99) == 0.0
+
+
+def test_workflow_benchmark_runs_every_step(fake_supabase):
+    results = asyncio.run(bench_workflow.run_benchmark(workflows=4, concurrency=2, latency_ms=1, warmup=0, upload_kb=1))
+
+    assert results["errors"] == {}
+    assert {step: stats["count"] for step, stats in results["endpoints"].items()} == dict.fromkeys(bench_workflow.STEPS, 4)
+    assert results["backend_calls"]["create_filing"] == 4
+
+
+def test_startup_benchmark_measures_a_cold_start():
+    from benchmarks import bench_startup
+
+    results = bench_startup.run_benchmark(runs=1, latency_ms=1, connect_ms=5)
+
+    assert results["errors"] == 0 and results["loaded_modules"] == []
+    assert set(results["phases"]) == set(bench_startup.PHASES)
+    assert results["phases"]["time_to_first_request"]["p50_ms"] >= results["phases"]["import"]["p50_ms"]
@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import json
+
+import jwt
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import finalize
+from app.services import blockchain
+from app.services.anchoring import AnchorBatcher
+from app.tests.fakes import seed_final_filing
+
+
+def test_merkle_proofs_verify_for_every_leaf():
+    for size in range(1, 10):
+        hashes = [blockchain.canonical_hash({"n": i}) for i in range(size)]
+        levels = blockchain.merkle_levels(hashes)
+        root = blockchain.merkle_root(levels)
+        for index, payload_hash in enumerate(hashes):
+            proof = blockchain.merkle_proof(levels, index)
+            assert blockchain.verify_merkle_proof(payload_hash, proof, root)
+            assert not blockchain.verify_merkle_proof(hashes[(index + 1) % size] + "0", proof, root)
+
+
+def test_batcher_anchors_one_root_per_batch():
+    anchored = []
+
+    async def anchor(root):
+        anchored.append(root)
+        return f"0xtx{len(anchored)}"
+
+    async def run():
+        batcher = AnchorBatcher(anchor, batch_size=4, max_wait=0.05)
+        return await asyncio.gather(*(batcher.submit(f"{i:064x}") for i in range(5)))
+
+    receipts = asyncio.run(run())
+    assert len(anchored) == 2
+    assert [receipt.tx_hash for receipt in receipts] == ["0xtx1"] * 4 + ["0xtx2"]
+    for i, receipt in enumerate(receipts):
+        assert blockchain.verify_merkle_proof(f"{i:064x}", receipt.merkle_proof, receipt.merkle_root)
+
+
+def test_batch_mode_finalize_stores_verifiable_proof(fake_supabase, monkeypatch):
+    monkeypatch.setenv("BLOCKCHAIN_ANCHOR_MODE", "batch")
+    monkeypatch.setenv("ANCHOR_BATCH_WAIT_SECONDS", "0.01")
+    monkeypatch.delenv("BLOCKCHAIN_RPC", raising=False)
+    filing_ids = [seed_final_filing(fake_supabase, filing_id=f"filing-{i}") for i in range(2)]
+    for filing_id in filing_ids:
+        fake_supabase.filings[filing_id]["status"] = "ML_PARSED"
+        fake_supabase.ml_results[filing_id] = {"id": f"ml-{filing_id}", "parsed_json": {"filing": filing_id}}
+    fake_supabase.blockchain.clear()
+
+    async def fake_finalize(filing_id, user_id, tx_hash, payload_hash, **columns):
+        fake_supabase.blockchain[filing_id] = {"filing_id": filing_id, "tx_hash": tx_hash, "payload_hash": payload_hash, **columns}
+
+    monkeypatch.setattr(finalize, "finalize_filing_transaction", fake_finalize)
+    headers = {"Authorization": f"Bearer {jwt.encode({'sub': 'user-123'}, 'secret', algorithm='HS256')}"}
+
+    with TestClient(app) as client:
+        finalized = [client.post("/finalize", json={"filing_id": filing_id}, headers=headers).json() for filing_id in filing_ids]
+        verified = client.get(f"/blockchain/verify/{filing_ids[0]}", headers=headers).json()
+        tampered = client.post(
+            "/blockchain/verify",
+            json={**{k: verified[k] for k in ("merkle_root", "merkle_proof")}, "payload_hash": "00" * 32},
+            headers=headers,
+        ).json()
+
+    assert finalized[0]["tx_hash"].startswith("SIMULATED_TX_")
+    assert finalized[0]["merkle_root"] == blockchain.merkle_root(blockchain.merkle_levels([finalized[0]["payload_hash"]]))
+    assert verified["verified"] is True and verified["tx_hash"] == finalized[0]["tx_hash"]
+    assert tampered["verified"] is False
+
+
+def test_payload_hash_versions_stay_verifiable():
+    filing = {"id": "f1", "user_id": "u1", "status": "ML_PARSED", "metadata": {"full_name": "Jänë"}}
+    documents = [
+        {"id": "d1", "document_type": "FORM16", "storage_path": "u1/f1/form16.pdf", "content_type": "application/pdf", "sha256": "aa"},
+        {"id": "d2", "document_type": "FORM16", "storage_path": "u1/f1/other.pdf", "content_type": "application/pdf", "sha256": "bb"},
+    ]
+    ml_result = {"id": "m1", "parsed_json": {"salary": [1, 2.5, None], "name": "ü"}}
+    legacy_payload = {"filing": filing, "documents": documents, "ml_results": ml_result}
+    legacy = hashlib.sha256(
+        json.dumps(legacy_payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+    assert blockchain.compute_payload_hash(1, {**filing, "documents": documents}, documents, ml_result) == legacy
+
+    v2 = blockchain.compute_payload_hash(2, filing, documents, ml_result)
+    stored = [{**doc, "content_hash": blockchain.canonical_hash(blockchain.document_section(doc))} for doc in documents]
+    assert blockchain.compute_payload_hash(2, {**filing, "status": "FINAL"}, stored[::-1], ml_result) == v2
+    assert blockchain.compute_payload_hash(2, filing, documents, {**ml_result, "parsed_json": {}}) != v2
+
+    tampered = [{**stored[0], "content_hash": "00"}, stored[1]]
+    assert blockchain.compute_payload_hash(2, filing, tampered, ml_result, use_stored=False) == v2
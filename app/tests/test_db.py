@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.db import DatabasePool
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(**kwargs):
+    opened = []
+
+    def connect(dsn):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return DatabasePool("postgresql://test", connect=connect, **kwargs), opened
+
+
+def test_pool_reuses_connections_and_commits():
+    pool, opened = _pool(minconn=1, maxconn=2)
+
+    def work(conn, value):
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT %s", (value,))
+        return value
+
+    async def run():
+        await pool.open()
+        results = [await pool.run(work, i) for i in range(3)]
+        await pool.close()
+        return results
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert len(opened) == 1
+    assert opened[0].commits == 3
+    assert opened[0].closed
+
+
+def test_pool_rolls_back_and_replaces_closed_connections():
+    pool, opened = _pool(minconn=1, maxconn=1)
+
+    def fail(conn):
+        raise ValueError("Filing not found")
+
+    async def run():
+        await pool.open()
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        opened[0].close()
+        await pool.run(lambda conn: None)
+
+    asyncio.run(run())
+    assert opened[0].rollbacks == 1
+    assert len(opened) == 2
+
+
+def test_pool_caps_concurrent_checkouts():
+    pool, opened = _pool(minconn=0, maxconn=2)
+    peak = 0
+
+    async def hold():
+        nonlocal peak
+        async with pool.connection():
+            peak = max(peak, pool.stats()["in_use"])
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*(hold() for _ in range(6)))
+
+    asyncio.run(run())
+    assert peak == 2
+    assert len(opened) == 2
+
+
+def test_cancelled_run_keeps_the_connection_until_its_thread_finishes():
+    pool, opened = _pool(minconn=1, maxconn=1)
+    started, release = threading.Event(), threading.Event()
+
+    def slow(conn):
+        started.set()
+        release.wait(5)
+
+    async def run():
+        await pool.open()
+        task = asyncio.create_task(pool.run(slow))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        # Still mid-transaction on the worker thread: not back in the pool yet.
+        assert pool.stats() == {"idle": 0, "in_use": 1, "max": 1}
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert pool.stats()["idle"] == 1
+        await pool.run(lambda conn: None)
+
+    asyncio.run(run())
+    assert len(opened) == 1 and opened[0].commits == 2
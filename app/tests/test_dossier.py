@@ -0,0 +1,130 @@
+import asyncio
+import io
+import os
+import time
+import zipfile
+
+import jwt
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.dossier import DossierInputs, build_dossier
+from app.services.jobs import DONE, FAILED, DossierJobRunner, SQLiteJobStore
+from app.tests.fakes import seed_final_filing
+
+
+def test_build_dossier_picks_compression_per_entry():
+    form16 = io.BytesIO(os.urandom(200 * 1024))
+    with build_dossier(form16, {"filing_id": "f1", "notes": "x" * 5000}, "Jane Doe", "0xabc") as archive:
+        with zipfile.ZipFile(archive) as zipf:
+            infos = {info.filename: info for info in zipf.infolist()}
+            assert zipf.read("form16.pdf") == form16.getvalue()
+            assert zipf.testzip() is None
+
+    assert list(infos) == ["form16.pdf", "summary.pdf", "heatmap.pdf", "certificate.pdf"]
+    assert infos["form16.pdf"].compress_type == zipfile.ZIP_STORED
+
+
+def test_render_through_a_spawned_process_pool(monkeypatch, tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    from app.services import dossier
+
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setenv("DOSSIER_RENDER_PROCESSES", "1")
+    monkeypatch.setattr(dossier, "_render_executor", None)
+    form16 = os.urandom(200 * 1024)
+    (tmp_path / "form16.pdf").write_bytes(form16)
+    summary = {"filing_id": "f1", "notes": "x" * 5000}
+
+    async def render():
+        # Pickles the arguments and imports the renderer in a fresh interpreter, as in production.
+        await dossier._render_dossier_file(
+            str(tmp_path / "form16.pdf"), summary, "Jane Doe", "0xabc", str(tmp_path / "dossier.zip")
+        )
+
+    try:
+        asyncio.run(render())
+        assert isinstance(dossier._render_executor, ProcessPoolExecutor)
+    finally:
+        dossier.shutdown_render_executor()
+
+    local = build_dossier(io.BytesIO(form16), summary, "Jane Doe", "0xabc")
+    with zipfile.ZipFile(tmp_path / "dossier.zip") as zipf, local:
+        assert zipf.testzip() is None and zipf.read("form16.pdf") == form16
+        expected = [(info.filename, info.compress_type) for info in zipfile.ZipFile(local).infolist()]
+        assert [(info.filename, info.compress_type) for info in zipf.infolist()] == expected
+    assert expected[0] == ("form16.pdf", zipfile.ZIP_STORED)
+
+def test_async_dossier_job_completes_in_background(fake_supabase):
+    filing_id = seed_final_filing(fake_supabase)
+    token = jwt.encode({"sub": "user-123"}, "secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with TestClient(app) as client:
+        response = client.post("/generate-dossier?mode=async", json={"filing_id": filing_id}, headers=headers)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        for _ in range(100):
+            job = client.get(f"/dossier-jobs/{job_id}", headers=headers).json()
+            if job["status"] in (DONE, FAILED):
+                break
+            time.sleep(0.02)
+
+    assert job["status"] == DONE, job
+    assert job["signed_url"].endswith(f"{filing_id}/dossier.zip?exp=3600")
+    assert ("dossiers", f"{filing_id}/dossier.zip") in fake_supabase.storage
+
+
+def test_job_runner_recovers_jobs_from_previous_worker(fake_supabase):
+    filing_id = seed_final_filing(fake_supabase)
+    inputs = DossierInputs(
+        filing_id=filing_id,
+        user_id="user-123",
+        form16_path=f"user-123/{filing_id}/form16.pdf",
+        summary_data={"filing_id": filing_id, "status": "FINAL"},
+        full_name="Jane Doe",
+        tx_hash="0xabc",
+    )
+    store = SQLiteJobStore()
+
+    async def run():
+        queued = await store.create("user-123", filing_id, inputs.model_dump())
+        crashed = await store.create("user-123", filing_id, inputs.model_dump())
+        await store.claim(crashed["id"])
+        store._execute("UPDATE dossier_jobs SET updated_at = ? WHERE id = ?", ("2000-01-01T00:00:00+00:00", crashed["id"]))
+
+        runner = DossierJobRunner(store, concurrency=1)
+        await runner.recover(stale_after_seconds=60)
+        await runner.join()
+        return [await store.get(job["id"], "user-123") for job in (queued, crashed)]
+
+    jobs = asyncio.run(run())
+    assert [job["status"] for job in jobs] == [DONE, DONE]
+
+
+def test_generate_dossier_reuses_artifact_for_same_payload(fake_supabase, monkeypatch):
+    filing_id = seed_final_filing(fake_supabase)
+    token = jwt.encode({"sub": "user-123"}, "secret", algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    stored = []
+    original_store = fake_supabase.store_dossier
+
+    async def counting_store(bucket, filing_id, archive):
+        stored.append(filing_id)
+        return await original_store(bucket, filing_id, archive)
+
+    monkeypatch.setattr(fake_supabase, "store_dossier", counting_store)
+    client = TestClient(app)
+
+    first = client.post("/generate-dossier", json={"filing_id": filing_id}, headers=headers)
+    second = client.post("/generate-dossier?mode=async", json={"filing_id": filing_id}, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert stored == [filing_id]
+
+    monkeypatch.setattr("app.services.dossier.TEMPLATE_VERSION", 2)
+    client.post("/generate-dossier", json={"filing_id": filing_id}, headers=headers)
+    assert stored == [filing_id, filing_id]
@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+
+from app.services.idempotency import BodyHasher, SupabaseIdempotencyStore
+
+
+def _headers(key=None, user_id="user-1"):
+    headers = {"Authorization": f"Bearer {jwt.encode({'sub': user_id}, 'secret', algorithm='HS256')}"}
+    return {**headers, "Idempotency-Key": key} if key else headers
+
+
+def _hash(body, boundary, chunk_size):
+    hasher = BodyHasher(boundary)
+    for start in range(0, len(body), chunk_size):
+        hasher.update(body[start : start + chunk_size])
+    return hasher.hexdigest()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_body_hash_ignores_the_multipart_boundary(chunk_size):
+    def body(boundary):
+        return b"--%s\r\nContent-Disposition: form-data; name=\"file\"\r\n\r\n%%PDF-1.4\r\n--%s--\r\n" % (boundary, boundary)
+
+    first = _hash(body(b"aaaaaaaaaaaaaaaa"), b"aaaaaaaaaaaaaaaa", chunk_size)
+    assert first == _hash(body(b"b1b2b3b4b5b6b7b8"), b"b1b2b3b4b5b6b7b8", 3)
+    assert first != _hash(body(b"aaaaaaaaaaaaaaaa").replace(b"PDF", b"PNG"), b"aaaaaaaaaaaaaaaa", chunk_size)
+
+
+def test_retries_replay_the_first_response_without_redoing_work(fake_supabase):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    client = TestClient(app)
+    created = client.post("/filing/create", json={"metadata": {"a": 1}}, headers=_headers("create-1"))
+    retried = client.post("/filing/create", json={"metadata": {"a": 1}}, headers=_headers("create-1"))
+    assert retried.json() == created.json() and retried.headers["idempotent-replayed"] == "true"
+    assert len(fake_supabase.filings) == 1
+    assert client.post("/filing/create", json={"metadata": {"a": 2}}, headers=_headers("create-1")).status_code == 422
+    # Keys belong to one user.
+    client.post("/filing/create", json={"metadata": {"a": 1}}, headers=_headers("create-1", user_id="user-2"))
+    assert len(fake_supabase.filings) == 2
+
+    filing_id = created.json()["id"]
+    uploads = [
+        client.post(
+            f"/documents/upload?filing_id={filing_id}",
+            files={"file": ("form16.pdf", b"%PDF-1.4 test", "application/pdf")},
+            headers=_headers("upload-1"),
+        )
+        for _ in range(2)
+    ]
+    assert [response.status_code for response in uploads] == [200, 200]
+    assert uploads[0].json() == uploads[1].json() and len(fake_supabase.documents[filing_id]) == 1
+
+    # Rejections are stored too; a fixed request under a new key goes through.
+    bad = {"filing_id": filing_id, "parsed_json": {}, "risk_flags": {"income": "red"}}
+    assert client.post("/ml-results", json=bad, headers=_headers("ml-1")).status_code == 400
+    assert client.post("/ml-results", json=bad, headers=_headers("ml-1")).headers["idempotent-replayed"] == "true"
+    assert client.post("/ml-results", json={**bad, "risk_flags": {}}, headers=_headers("ml-2")).status_code == 200
+
+
+def test_signed_url_responses_are_signed_again_on_retry(fake_supabase):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.tests.fakes import seed_final_filing
+
+    filing_id = seed_final_filing(fake_supabase, user_id="user-1")
+    signed, original = [], fake_supabase.create_signed_url
+
+    async def counting_sign(bucket, storage_path, expires_in=3600):
+        signed.append(storage_path)
+        return await original(bucket, storage_path, expires_in)
+
+    fake_supabase.create_signed_url = counting_sign
+    client = TestClient(app)
+    responses = [
+        client.post("/generate-dossier", json={"filing_id": filing_id}, headers=_headers("dossier-1")) for _ in range(2)
+    ]
+
+    assert [response.status_code for response in responses] == [200, 200]
+    assert "idempotent-replayed" not in responses[1].headers
+    # The retry reuses the stored dossier but signs a fresh URL.
+    assert len(signed) == 2 and len([key for key in fake_supabase.storage if key[1].endswith("dossier.zip")]) == 1
+
+def test_concurrent_duplicates_wait_for_the_original_and_failures_are_not_stored(fake_supabase):
+    import httpx
+
+    from app.middleware import IdempotencyMiddleware
+
+    calls = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def endpoint(scope, receive, send):
+            calls.append(scope["path"])
+            await gate.wait()
+            status = 500 if scope["path"] == "/fail" and len(calls) == 1 else 200
+            await send({"type": "http.response.start", "status": status, "headers": []})
+            await send({"type": "http.response.body", "body": f"call {len(calls)}".encode()})
+
+        transport = httpx.ASGITransport(app=IdempotencyMiddleware(endpoint), raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            requests = [asyncio.create_task(client.post("/fail", headers=_headers("k"))) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert calls == ["/fail"]
+            gate.set()
+            return await asyncio.gather(*requests)
+
+    first, second = asyncio.run(run())
+    # The original failed, so the waiting duplicate ran the request itself.
+    assert (first.status_code, second.status_code) == (500, 200) and calls == ["/fail", "/fail"]
+    assert second.text == "call 2"
+
+
+def test_supabase_store_reserves_once_and_takes_over_expired_keys(fake_supabase):
+    store = SupabaseIdempotencyStore()
+
+    async def run():
+        assert await store.reserve("u1", "k", "hash", 60) is None
+        assert (await store.reserve("u1", "k", "hash", 60))["status"] == "IN_PROGRESS"
+        await store.complete("u1", "k", "body", {"response_status": 201}, 3600)
+        assert (await store.get("u1", "k"))["response_status"] == 201
+
+        expired = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+        fake_supabase.idempotency_keys[("u1", "k")]["expires_at"] = expired
+        assert await store.get("u1", "k") is None
+        assert await store.reserve("u1", "k", "other", 60) is None
+        return fake_supabase.idempotency_keys[("u1", "k")]
+
+    row = asyncio.run(run())
+    assert (row["request_hash"], row["status"]) == ("other", "IN_PROGRESS")
@@ -0,0 +1,79 @@
+import asyncio
+
+import jwt
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import finalize
+from app.services import blockchain
+from app.services.loader import FilingLoader
+from app.tests.fakes import seed_final_filing
+
+READS = ("get_filing", "get_documents", "get_ml_result", "get_risk_flags", "get_blockchain_record")
+
+
+def _count_reads(monkeypatch, fake):
+    calls = []
+    for name in READS:
+        original = getattr(fake, name)
+
+        async def counted(*args, _name=name, _original=original):
+            calls.append(_name)
+            await asyncio.sleep(0)
+            return await _original(*args)
+
+        monkeypatch.setattr(fake, name, counted)
+    return calls
+
+
+def test_routes_use_one_or_two_round_trips(fake_supabase, monkeypatch):
+    filing_id = seed_final_filing(fake_supabase)
+    fake_supabase.filings[filing_id]["status"] = "ML_PARSED"
+    fake_supabase.blockchain.clear()
+    fake_supabase.ml_results[filing_id] = {"id": "ml-1", "filing_id": filing_id, "parsed_json": {"income": 1}}
+
+    async def fake_finalize(filing_id, user_id, tx_hash, payload_hash, **columns):
+        fake_supabase.blockchain[filing_id] = {"filing_id": filing_id, "tx_hash": tx_hash, "payload_hash": payload_hash}
+        fake_supabase.filings[filing_id]["status"] = "FINAL"
+
+    monkeypatch.setattr(finalize, "finalize_filing_transaction", fake_finalize)
+
+    async def fake_send(payload_hash):
+        return "0xabc"
+
+    monkeypatch.setattr(blockchain, "send_to_blockchain", fake_send)
+    calls = _count_reads(monkeypatch, fake_supabase)
+    headers = {"Authorization": f"Bearer {jwt.encode({'sub': 'user-123'}, 'secret', algorithm='HS256')}"}
+    client = TestClient(app)
+
+    assert client.post("/finalize", json={"filing_id": filing_id}, headers=headers).status_code == 200
+    assert calls == ["get_filing"]
+
+    calls.clear()
+    assert client.post("/generate-dossier", json={"filing_id": filing_id}, headers=headers).status_code == 200
+    assert calls == ["get_blockchain_record", "get_filing"]
+
+    calls.clear()
+    assert client.post("/generate-dossier", json={"filing_id": filing_id}, headers=headers).status_code == 200
+    assert calls == ["get_blockchain_record"]
+
+
+def test_loader_dedupes_concurrent_loads(fake_supabase, monkeypatch):
+    filing_id = seed_final_filing(fake_supabase)
+    calls = _count_reads(monkeypatch, fake_supabase)
+    loader = FilingLoader(fake_supabase, "user-123")
+
+    async def run():
+        return await asyncio.gather(
+            loader.filing(filing_id),
+            loader.documents(filing_id),
+            loader.ml_result(filing_id),
+            loader.blockchain_record(filing_id),
+            loader.blockchain_record(filing_id),
+        )
+
+    filing, documents, ml_result, record, same_record = asyncio.run(run())
+    assert sorted(calls) == ["get_blockchain_record", "get_filing"]
+    assert documents == filing["documents"]
+    assert ml_result is None
+    assert record is same_record
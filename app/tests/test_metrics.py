@@ -0,0 +1,70 @@
+import asyncio
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.metrics import OPERATION_ERRORS, OPERATION_SECONDS, MetricsRegistry, set_metrics_enabled, timed
+from app.tests.fakes import seed_final_filing
+
+
+def test_timed_records_sync_and_async_calls_and_errors():
+    @timed("test.sync")
+    def double(value):
+        return value * 2
+
+    @timed("test.async")
+    async def fail():
+        raise ValueError("boom")
+
+    assert double(2) == 4
+    with pytest.raises(ValueError):
+        asyncio.run(fail())
+    assert OPERATION_SECONDS.labels("test.sync").count == 1
+    assert OPERATION_SECONDS.labels("test.async").count == 1
+    assert OPERATION_ERRORS.labels("test.async").value == 1
+
+    set_metrics_enabled(False)
+    try:
+        assert double(3) == 6
+    finally:
+        set_metrics_enabled(True)
+    assert OPERATION_SECONDS.labels("test.sync").count == 1
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs.", ("state",)).labels('do"ne').inc(2)
+    registry.histogram("wait_seconds", "Wait.", buckets=(0.1, 1.0)).labels().observe(0.5)
+    registry.gauge("queue_depth", "Depth.", lambda: {(): 3})
+
+    text = registry.render()
+    assert '# TYPE jobs_total counter\njobs_total{state="do\\"ne"} 2\n' in text
+    assert 'wait_seconds_bucket{le="0.1"} 0\nwait_seconds_bucket{le="1.0"} 1\nwait_seconds_bucket{le="+Inf"} 1\n' in text
+    assert "wait_seconds_sum 0.5\nwait_seconds_count 1\n" in text
+    assert "# TYPE queue_depth gauge\nqueue_depth 3\n" in text
+
+
+def test_metrics_endpoint_reports_routes_by_template(fake_supabase):
+    filing_id = seed_final_filing(fake_supabase)
+    token = jwt.encode({"sub": "user-123"}, "secret", algorithm="HS256")
+    with TestClient(app) as client:
+        assert client.get(f"/filing/{filing_id}", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.get("/no-such-route").status_code == 404
+        text = client.get("/metrics").text
+
+    assert 'dhanrakshak_http_requests_total{method="GET",route="/filing/{filing_id}",status="200"}' in text
+    assert 'dhanrakshak_http_requests_total{method="GET",route="unmatched",status="404"}' in text
+    assert 'dhanrakshak_http_request_duration_seconds_bucket{method="GET",route="/filing/{filing_id}",status="200",le="+Inf"}' in text
+    assert "dhanrakshak_http_requests_in_flight 1" in text
+    assert 'dhanrakshak_operation_duration_seconds_count{operation="canonical_hash"}' in text
+
+
+def test_metrics_can_be_disabled(fake_supabase, monkeypatch):
+    monkeypatch.setenv("METRICS_ENABLED", "false")
+    try:
+        with TestClient(app) as client:
+            assert client.get("/metrics").status_code == 404
+    finally:
+        set_metrics_enabled(True)
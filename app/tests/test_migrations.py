@@ -0,0 +1,151 @@
+import psycopg2
+import pytest
+
+from app.services import migrations
+from app.services.migrations import MigrationError, discover_migrations, migrate
+from app.tests.postgres import DATABASE_URL, throwaway_schema
+
+# sha256 of the schema.sql that databases were created from before migrations existed. ``--baseline 1``
+# records 0001 without running it, so 0001 must stay exactly that file.
+ORIGINAL_SCHEMA_SHA256 = "21ec040f5688ee910021ace5bde9b784b6123faa9b204764a95aedec20a1b861"
+LATER_COLUMNS = {
+    ("documents", "sha256"),
+    ("documents", "content_hash"),
+    ("ml_results", "content_hash"),
+    ("blockchain_records", "dossier_key"),
+    ("blockchain_records", "merkle_root"),
+    ("blockchain_records", "merkle_proof"),
+    ("blockchain_records", "hash_version"),
+    ("blockchain_records", "section_hashes"),
+    ("dossier_jobs", "inputs"),
+}
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if "FAIL" in sql:
+            raise psycopg2.ProgrammingError("syntax error")
+        self.conn.statements.append(sql.strip())
+        if sql.startswith("INSERT INTO schema_migrations"):
+            self.conn.pending.append(params)
+        elif sql.startswith("SELECT version"):
+            self.rows = [(version, checksum) for version, _, checksum in self.conn.recorded]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.recorded = []
+        self.pending = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.recorded.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+def _write(directory, name, sql):
+    (directory / name).write_text(sql)
+
+
+def test_migrate_applies_pending_in_order_once(tmp_path):
+    _write(tmp_path, "0002_indexes.sql", "CREATE INDEX b;")
+    _write(tmp_path, "0001_initial.sql", "CREATE TABLE a;")
+    conn = FakeConnection()
+
+    assert [m.version for m in migrate(conn, tmp_path)] == [1, 2]
+    assert [s for s in conn.statements if s.startswith("CREATE ") and "schema_migrations" not in s] == [
+        "CREATE TABLE a;",
+        "CREATE INDEX b;",
+    ]
+    assert migrate(conn, tmp_path) == []
+
+    _write(tmp_path, "0003_more.sql", "CREATE INDEX c;")
+    assert [m.version for m in migrate(conn, tmp_path, target=2)] == []
+    assert [m.version for m in migrate(conn, tmp_path)] == [3]
+    assert conn.statements[-1] == "SELECT pg_advisory_unlock(%s)"
+
+
+def test_migrate_rejects_edited_and_failed_migrations(tmp_path):
+    _write(tmp_path, "0001_initial.sql", "CREATE TABLE a;")
+    conn = FakeConnection()
+    migrate(conn, tmp_path)
+
+    _write(tmp_path, "0001_initial.sql", "CREATE TABLE a (id int);")
+    with pytest.raises(MigrationError, match="changed after it was applied"):
+        migrate(conn, tmp_path)
+
+    _write(tmp_path, "0001_initial.sql", "CREATE TABLE a;")
+    _write(tmp_path, "0002_broken.sql", "FAIL")
+    with pytest.raises(MigrationError, match="0002_broken failed"):
+        migrate(conn, tmp_path)
+    assert [version for version, _, _ in conn.recorded] == [1]
+
+
+def test_baseline_records_without_running(tmp_path):
+    _write(tmp_path, "0001_initial.sql", "FAIL")
+    _write(tmp_path, "0002_indexes.sql", "CREATE INDEX b;")
+    conn = FakeConnection()
+
+    assert [m.version for m in migrate(conn, tmp_path, baseline=1)] == [2]
+    assert [version for version, _, _ in conn.recorded] == [1, 2]
+
+
+def test_discover_rejects_bad_names_and_duplicates(tmp_path):
+    _write(tmp_path, "0001_initial.sql", "")
+    _write(tmp_path, "0001_again.sql", "")
+    with pytest.raises(MigrationError, match="Duplicate"):
+        discover_migrations(tmp_path)
+    (tmp_path / "0001_again.sql").unlink()
+    _write(tmp_path, "indexes.sql", "")
+    with pytest.raises(MigrationError, match="NNNN_name"):
+        discover_migrations(tmp_path)
+
+
+def test_shipped_migrations_are_contiguous():
+    versions = [m.version for m in discover_migrations(migrations.MIGRATIONS_DIR)]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_initial_migration_is_the_original_schema_sql():
+    assert discover_migrations()[0].checksum == ORIGINAL_SCHEMA_SHA256
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+# Databases were created from schema.sql as first shipped, or from a later copy that already had some
+# of the additions; both must come out of the baseline with the full schema.
+@pytest.mark.parametrize("created_through", [1, 5])
+def test_baselined_database_gains_later_columns(created_through):
+    with throwaway_schema("baseline") as conn:
+        with conn.cursor() as cursor:
+            for migration in discover_migrations()[:created_through]:
+                cursor.execute(migration.sql())
+        conn.commit()
+
+        applied = migrate(conn, baseline=1)
+
+        assert applied[0].version == 2
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = current_schema()"
+            )
+            columns = set(cursor.fetchall())
+        assert LATER_COLUMNS <= columns
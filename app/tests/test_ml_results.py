@@ -0,0 +1,173 @@
+import json
+import uuid
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.tests.postgres import DATABASE_URL, throwaway_schema
+
+
+def _headers(user_id="user-123"):
+    token = jwt.encode({"sub": user_id, "email": f"{user_id}@example.com"}, "secret", algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _create_filings(client, count):
+    return [
+        client.post("/filing/create", json={"metadata": {"full_name": f"Jane {i}"}}, headers=_headers()).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_batch_json_array_reports_each_item(fake_supabase, monkeypatch):
+    monkeypatch.setenv("ML_BATCH_CHUNK_SIZE", "2")
+    calls = []
+    original = fake_supabase.insert_ml_results_batch
+
+    async def counting_insert(user_id, items):
+        calls.append(len(items))
+        return await original(user_id, items)
+
+    fake_supabase.insert_ml_results_batch = counting_insert
+    with TestClient(app) as client:
+        first, second, third = _create_filings(client, 3)
+        other = client.post("/filing/create", json={"metadata": {}}, headers=_headers("user-999")).json()["id"]
+        items = [
+            {"filing_id": first, "parsed_json": {"income": 1}, "risk_flags": {"income": "green"}},
+            {"filing_id": second, "parsed_json": {"income": 2}},
+            {"filing_id": third},
+            {"filing_id": third, "parsed_json": {"income": 3}, "risk_flags": {"income": "red"}},
+            {"filing_id": other, "parsed_json": {"income": 4}},
+            {"filing_id": third, "parsed_json": {"income": 5}},
+        ]
+        response = client.post("/ml-results/batch", json=items, headers=_headers())
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["accepted"], body["rejected"], body["failed"]) == (3, 3, 0)
+    assert [result["status"] for result in body["results"]] == [
+        "ACCEPTED", "ACCEPTED", "REJECTED", "REJECTED", "REJECTED", "ACCEPTED",
+    ]
+    assert body["results"][4]["error"] == "Filing not found"
+    assert calls == [2, 1]
+    assert fake_supabase.ml_results[third]["parsed_json"] == {"income": 5}
+    assert fake_supabase.risk_flags[first]["flags"] == {"income": "green"}
+    assert fake_supabase.filings[first]["status"] == "ML_PARSED"
+    assert fake_supabase.filings[other]["status"] != "ML_PARSED"
+
+
+def test_batch_rejects_non_uuid_filing_ids_and_isolates_failed_lookups(fake_supabase, monkeypatch):
+    monkeypatch.setenv("ML_BATCH_CHUNK_SIZE", "1")
+    original = fake_supabase.get_owned_filing_ids
+    failures = iter([True, False])
+
+    async def flaky_lookup(filing_ids, user_id):
+        if next(failures):
+            raise RuntimeError("lookup failed")
+        return await original(filing_ids, user_id)
+
+    fake_supabase.get_owned_filing_ids = flaky_lookup
+    with TestClient(app) as client:
+        filing_id = _create_filings(client, 1)[0]
+        items = [
+            {"filing_id": "not-a-uuid", "parsed_json": {}},
+            {"filing_id": filing_id, "parsed_json": {"n": 1}},
+            {"filing_id": filing_id, "parsed_json": {"n": 2}},
+        ]
+        response = client.post("/ml-results/batch", json=items, headers=_headers())
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["status"] for result in results] == ["REJECTED", "FAILED", "ACCEPTED"]
+    assert "UUID" in results[0]["error"]
+    assert fake_supabase.ml_results[filing_id]["parsed_json"] == {"n": 2}
+
+def test_batch_ndjson_stream_partial_chunk_and_item_limit(fake_supabase, monkeypatch):
+    monkeypatch.setenv("ML_BATCH_CHUNK_SIZE", "2")
+    monkeypatch.setenv("ML_BATCH_MAX_ITEMS", "4")
+    original = fake_supabase.update_filings_status
+    failures = iter([True, False])
+
+    async def flaky_update(filing_ids, user_id, status):
+        if next(failures):
+            raise RuntimeError("write failed")
+        await original(filing_ids, user_id, status)
+
+    fake_supabase.update_filings_status = flaky_update
+    with TestClient(app) as client:
+        filing_ids = _create_filings(client, 2)
+        lines = [json.dumps({"filing_id": filing_id, "parsed_json": {"n": i}}) for i, filing_id in enumerate(filing_ids * 2)]
+        lines.insert(1, "{not json")
+        lines.extend(json.dumps({"filing_id": filing_ids[0], "parsed_json": {}}) for _ in range(100))
+        response = client.post(
+            "/ml-results/batch",
+            content="\n".join(lines).encode(),
+            headers={**_headers(), "Content-Type": "application/x-ndjson"},
+        )
+        malformed = client.post("/ml-results/batch", content=b"{", headers={**_headers(), "Content-Type": "application/json"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["PARTIAL", "REJECTED", "PARTIAL", "ACCEPTED", "REJECTED"]
+    # The rows of the partial chunk were stored, so the client must not resend them.
+    assert body["results"][0]["ml_result_id"] and body["partial"] == 2
+    assert body["truncated"] and body["results"][4]["error"] == "Batch item limit exceeded"
+    assert malformed.status_code == 400
+
+
+def test_batch_writes_each_chunk_in_one_transaction_when_configured(fake_supabase, monkeypatch):
+    from app.routers import ml_results
+
+    monkeypatch.setenv("SUPABASE_DB_URL", "postgresql://test")
+    committed = []
+    outcomes = iter([RuntimeError("deadlock"), None])
+
+    async def fake_transaction(user_id, items, risk_flags, status):
+        if error := next(outcomes):
+            raise error
+        committed.append((items, risk_flags, status))
+        return [f"ml-{i}" for i in range(len(items))]
+
+    monkeypatch.setattr(ml_results, "write_ml_results_transaction", fake_transaction)
+    with TestClient(app) as client:
+        filing_id = _create_filings(client, 1)[0]
+        item = {"filing_id": filing_id, "parsed_json": {"income": 1}, "risk_flags": {"income": "green"}}
+        failed = client.post("/ml-results/batch", json=[item], headers=_headers()).json()
+        accepted = client.post("/ml-results/batch", json=[item], headers=_headers()).json()
+
+    assert [result["status"] for result in failed["results"]] == ["FAILED"]
+    assert accepted["results"][0]["ml_result_id"] == "ml-0"
+    assert committed == [([(filing_id, {"income": 1})], {filing_id: {"income": "green"}}, "ML_PARSED")]
+    assert filing_id not in fake_supabase.ml_results
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+def test_ml_results_transaction_sql_writes_everything_or_nothing():
+    from app.services.migrations import migrate
+    from app.services.transactions import _write_ml_results
+
+    user_id, filing_id = str(uuid.uuid4()), str(uuid.uuid4())
+    with throwaway_schema("ml_results") as conn:
+        migrate(conn)
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (id) VALUES (%s)", (user_id,))
+            cursor.execute("INSERT INTO filings (id, user_id, status) VALUES (%s, %s, 'DRAFT')", (filing_id, user_id))
+        conn.commit()
+
+        rows = [(filing_id, user_id, {"n": n}, f"hash-{n}") for n in range(2)]
+        ids = _write_ml_results(conn, user_id, rows, {filing_id: {"income": "green"}}, [filing_id], "ML_PARSED")
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id::text FROM ml_results ORDER BY content_hash")
+            assert [row[0] for row in cursor.fetchall()] == ids
+            cursor.execute("SELECT status FROM filings")
+            assert cursor.fetchone()[0] == "ML_PARSED"
+        conn.rollback()
+
+        with pytest.raises(Exception):
+            _write_ml_results(conn, user_id, rows, {str(uuid.uuid4()): {"income": "green"}}, [filing_id], "ML_PARSED")
+        conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM ml_results")
+            assert cursor.fetchone()[0] == 0
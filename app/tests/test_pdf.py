@@ -0,0 +1,40 @@
+import re
+
+from reportlab.lib.units import inch
+
+from app.services import pdf
+
+
+def _assert_xref_valid(data: bytes) -> None:
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[startxref:].startswith(b"xref\n")
+    offsets = [int(entry) for entry in re.findall(rb"(\d{10}) 00000 n ", data[startxref:])]
+    for number, offset in enumerate(offsets, start=1):
+        assert data[offset:].startswith(b"%d 0 obj" % number)
+
+
+def test_template_render_matches_direct_reportlab_render():
+    notes = "Jane (Doe) \\ é " + "x" * 200
+
+    def draw(canvas) -> None:
+        canvas.setFont(pdf.FONT, 12)
+        canvas.drawString(1 * inch, 10 * inch, "Heatmap")
+        canvas.drawString(1 * inch, 9.5 * inch, notes)
+
+    rendered = pdf.create_heatmap_pdf(notes)
+
+    assert rendered == pdf._render_direct(draw)
+    _assert_xref_valid(rendered)
+
+
+def test_renders_are_memoized_and_fall_back_for_unsupported_text():
+    summary = {"filing_id": "f1", "status": "FINAL"}
+    assert pdf.create_summary_pdf(summary) is pdf.create_summary_pdf(dict(summary))
+    assert pdf.create_certificate_pdf("Jane Doe", "0xabc") is pdf.create_certificate_pdf("Jane Doe", "0xabc")
+
+    long_summary = {f"line{i}": i for i in range(40)}
+    multi_page = pdf.create_summary_pdf(long_summary)
+    assert multi_page.count(b"/Type /Page\n") == 2
+    _assert_xref_valid(multi_page)
+
+    _assert_xref_valid(pdf.create_certificate_pdf("देव", "0xabc"))
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from app.services.profiler import PROFILE_ID, SamplingProfiler, collapsed, new_profile_id
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collapses_stacks_and_tags_the_request_task():
+    async def run():
+        profiler = SamplingProfiler(threading.get_ident(), 0.001, asyncio.get_running_loop(), asyncio.current_task())
+        profiler.start()
+        _busy(0.05)
+        await asyncio.sleep(0.02)
+        return profiler.stop()
+
+    stacks = asyncio.run(run())
+    lines = collapsed(stacks).decode().splitlines()
+    assert any(line.startswith("request;") and "_busy (test_profiler.py:" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_profile_ids_cannot_escape_the_store():
+    assert PROFILE_ID.match(new_profile_id("post", "/generate-dossier"))
+    assert PROFILE_ID.match(new_profile_id("GET", "/"))
+    assert not PROFILE_ID.match("20240101T000000Z-GET-..-00000000/../secret")
+
+
+def _headers(role=None):
+    import jwt
+
+    claims = {"sub": "admin-1", **({"app_metadata": {"role": role}} if role else {})}
+    return {"Authorization": f"Bearer {jwt.encode(claims, 'secret', algorithm='HS256')}"}
+
+
+def test_admin_can_profile_a_request_and_fetch_it(fake_supabase, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    monkeypatch.setenv("PROFILE_DIR", str(tmp_path))
+    monkeypatch.setenv("PROFILE_SAMPLE_INTERVAL_MS", "1")
+    client = TestClient(app)
+
+    plain = client.get("/audit", headers=_headers("admin"))
+    assert plain.status_code == 200 and "x-profile-id" not in plain.headers
+    assert client.get("/audit", params={"profile": "1"}, headers=_headers()).status_code == 403
+    assert not list(tmp_path.iterdir())
+
+    profiled = client.get("/audit", headers={**_headers("admin"), "X-Profile": "1"})
+    assert profiled.status_code == 200
+    profile_id = profiled.headers["x-profile-id"]
+    assert "-GET-audit-" in profile_id
+
+    listed = client.get("/admin/profiles", headers=_headers("admin")).json()["profiles"]
+    assert [item["profile_id"] for item in listed] == [profile_id]
+    artifact = client.get(f"/admin/profiles/{profile_id}", headers=_headers("admin"))
+    assert artifact.status_code == 200 and artifact.headers["content-type"].startswith("text/plain")
+    assert artifact.content == (tmp_path / f"{profile_id}.collapsed").read_bytes()
+    assert client.get("/admin/profiles/missing", headers=_headers("admin")).status_code == 404
+    assert client.get("/admin/profiles", headers=_headers()).status_code == 403
+
+
+def test_bucket_store_round_trips_through_storage(fake_supabase, monkeypatch):
+    from app.services.profiler import get_profile_store
+
+    monkeypatch.setenv("PROFILE_STORE", "bucket")
+    store = get_profile_store()
+    profile_id = new_profile_id("POST", "/finalize")
+
+    async def run():
+        await store.save(profile_id, b"request;finalize (finalize.py:1) 3\n")
+        return await store.list(10), await store.load(profile_id), await store.load("absent")
+
+    listed, data, missing = asyncio.run(run())
+    assert [item.profile_id for item in listed] == [profile_id]
+    assert data == b"request;finalize (finalize.py:1) 3\n" and missing is None
+    assert ("dossiers", f"profiles/{profile_id}.collapsed") in fake_supabase.storage
@@ -0,0 +1,99 @@
+"""EXPLAIN the hot queries against a real Postgres built from the migrations.
+
+Runs only when ``TEST_DATABASE_URL`` points at a disposable Postgres 13+ database. Everything is
+created in a throwaway schema and dropped afterwards.
+"""
+
+import pytest
+
+from app.services.migrations import migrate
+from app.tests.postgres import DATABASE_URL, throwaway_schema
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+# A sequential scan is only a regression on tables at least this large.
+SEQ_SCAN_ROW_THRESHOLD = 1000
+
+USERS, FILINGS = 2000, 20000
+TABLES = ("users", "filings", "documents", "ml_results", "risk_flags", "blockchain_records", "dossier_jobs", "audit_logs")
+FILING = "md5('f1')::uuid"
+OWNER = "md5('u2')::uuid"
+
+# Filing n belongs to user (n % USERS) + 1; ids are md5 hashes so they are deterministic.
+SEED = f"""
+INSERT INTO users (id) SELECT md5('u' || g)::uuid FROM generate_series(1, {USERS}) g;
+INSERT INTO filings (id, user_id, status)
+  SELECT md5('f' || g)::uuid, md5('u' || (g % {USERS} + 1))::uuid, 'DRAFT' FROM generate_series(1, {FILINGS}) g;
+INSERT INTO documents (filing_id, user_id, document_type, storage_path, content_type)
+  SELECT f.id, f.user_id, 'FORM16', f.id || '/form16.pdf', 'application/pdf'
+  FROM filings f CROSS JOIN generate_series(1, 2);
+INSERT INTO ml_results (filing_id, user_id, parsed_json) SELECT id, user_id, '{{}}'::jsonb FROM filings;
+INSERT INTO risk_flags (filing_id, user_id, flags) SELECT id, user_id, '{{}}'::jsonb FROM filings;
+INSERT INTO blockchain_records (filing_id, user_id, tx_hash, payload_hash) SELECT id, user_id, 'tx', 'hash' FROM filings;
+INSERT INTO dossier_jobs (user_id, filing_id, status, inputs)
+  SELECT user_id, id, CASE WHEN random() < 0.01 THEN 'QUEUED' ELSE 'DONE' END, '{{}}'::jsonb FROM filings;
+INSERT INTO audit_logs (user_id, event_type, metadata, created_at)
+  SELECT f.user_id, 'EVENT_' || (g % 10), jsonb_build_object('filing_id', f.id::text), now() - g * interval '1 second'
+  FROM filings f CROSS JOIN generate_series(1, 3) g;
+"""
+
+HOT_QUERIES = {
+    "filing": f"SELECT * FROM filings WHERE id = {FILING} AND user_id = {OWNER}",
+    "owned_filings": f"SELECT id FROM filings WHERE id = ANY(ARRAY[{FILING}, md5('f2')::uuid]) AND user_id = {OWNER}",
+    "documents": f"SELECT * FROM documents WHERE filing_id = {FILING} AND user_id = {OWNER}",
+    "ml_result": f"SELECT * FROM ml_results WHERE filing_id = {FILING} AND user_id = {OWNER} ORDER BY created_at DESC LIMIT 1",
+    "risk_flags": f"SELECT * FROM risk_flags WHERE filing_id = {FILING} AND user_id = {OWNER}",
+    "blockchain_record": (
+        f"SELECT * FROM blockchain_records WHERE filing_id = {FILING} AND user_id = {OWNER} ORDER BY created_at DESC LIMIT 1"
+    ),
+    "dossier_job": f"SELECT * FROM dossier_jobs WHERE id = md5('j1')::uuid AND user_id = {OWNER}",
+    "queued_jobs": "SELECT * FROM dossier_jobs WHERE status = 'QUEUED' ORDER BY created_at",
+    "stale_jobs": "SELECT * FROM dossier_jobs WHERE status = 'RUNNING' AND updated_at < now() - interval '10 minutes'",
+    "audit_page": "SELECT * FROM audit_logs ORDER BY created_at DESC, id DESC LIMIT 101",
+    "audit_keyset": (
+        "SELECT * FROM audit_logs WHERE created_at < now() - interval '1 hour'"
+        " OR (created_at = now() - interval '1 hour' AND id < md5('a1')::uuid)"
+        " ORDER BY created_at DESC, id DESC LIMIT 101"
+    ),
+    "audit_by_user": f"SELECT * FROM audit_logs WHERE user_id = {OWNER} ORDER BY created_at DESC, id DESC LIMIT 101",
+    "audit_by_event": "SELECT * FROM audit_logs WHERE event_type = 'EVENT_3' ORDER BY created_at DESC, id DESC LIMIT 101",
+    "audit_by_filing": (
+        f"SELECT * FROM audit_logs WHERE metadata->>'filing_id' = ({FILING})::text ORDER BY created_at DESC, id DESC LIMIT 101"
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def database():
+    with throwaway_schema("query_plans") as conn:
+        migrate(conn)
+        with conn.cursor() as cursor:
+            cursor.execute(SEED)
+            for table in TABLES:
+                cursor.execute(f"ANALYZE {table}")
+        conn.commit()
+        yield conn
+
+
+def _plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_avoids_seq_scans_on_large_tables(database, name):
+    with database.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {HOT_QUERIES[name]}")
+        plan = cursor.fetchone()[0][0]["Plan"]
+        cursor.execute(
+            "SELECT relname, reltuples FROM pg_class"
+            " WHERE relnamespace = (SELECT oid FROM pg_namespace WHERE nspname = current_schema())"
+        )
+        sizes = dict(cursor.fetchall())
+    scans = [
+        node["Relation Name"]
+        for node in _plan_nodes(plan)
+        if node["Node Type"] == "Seq Scan" and sizes.get(node["Relation Name"], 0) >= SEQ_SCAN_ROW_THRESHOLD
+    ]
+    assert not scans, f"{name} sequentially scans {scans}: {plan}"
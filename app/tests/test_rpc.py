@@ -0,0 +1,65 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from app.services import blockchain, rpc
+from app.services.rpc import JsonRpcClient, RPCError, RPCTransientError
+from app.tests.fakes import FakeJsonRpcServer
+
+
+def _client(server, **kwargs):
+    return JsonRpcClient("http://rpc.test/", transport=httpx.ASGITransport(app=server), backoff=0, **kwargs)
+
+
+def test_call_retries_transient_failures_and_records_latency():
+    server = FakeJsonRpcServer(fail_first=2)
+    client = _client(server, retries=3)
+
+    result = asyncio.run(client.call("eth_blockNumber"))
+
+    assert result == "0x10"
+    assert len(server.requests) == 3
+    assert client.latency_stats()["eth_blockNumber"]["count"] == 1
+
+    failing = _client(FakeJsonRpcServer(fail_first=5), retries=1)
+    with pytest.raises(RPCTransientError):
+        asyncio.run(failing.call("eth_blockNumber"))
+
+
+def test_batch_returns_results_in_order_with_per_call_errors():
+    server = FakeJsonRpcServer()
+    client = _client(server)
+
+    results = asyncio.run(client.batch([("eth_blockNumber", []), ("eth_nope", []), ("eth_sendRawTransaction", ["0xab"])]))
+
+    assert len(server.requests) == 1 and len(server.requests[0]) == 3
+    assert results[0] == "0x10"
+    assert isinstance(results[1], RPCError) and results[1].code == -32601
+    assert results[2] == "0x" + hashlib.sha256(b"0xab").hexdigest()
+
+
+def test_concurrency_is_bounded():
+    server = FakeJsonRpcServer(latency=0.02)
+    client = _client(server, max_concurrency=2)
+
+    async def run():
+        return await asyncio.gather(*(client.call("eth_blockNumber") for _ in range(6)))
+
+    assert asyncio.run(run()) == ["0x10"] * 6
+    assert server.max_in_flight == 2
+
+
+def test_send_to_blockchain_uses_pooled_client(monkeypatch):
+    server = FakeJsonRpcServer()
+    monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+    monkeypatch.setenv("SUPABASE_SERVICE_ROLE_KEY", "service-key")
+    monkeypatch.setenv("BLOCKCHAIN_RPC", "http://rpc.test/")
+    monkeypatch.setenv("BLOCKCHAIN_PRIVATE_KEY", "key")
+    monkeypatch.setattr(rpc, "_rpc_client", _client(server))
+
+    tx_hash = asyncio.run(blockchain.send_to_blockchain("00" * 32))
+
+    assert tx_hash == "0x" + hashlib.sha256(("00" * 32).encode()).hexdigest()
+    assert server.requests[0]["method"] == "eth_sendRawTransaction"
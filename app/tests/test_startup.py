@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+
+def test_importing_the_app_leaves_heavy_dependencies_unloaded():
+    code = "import sys, app.main; print(sorted(m for m in ('reportlab', 'supabase', 'psycopg2') if m in sys.modules))"
+    root = Path(__file__).parents[2]
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root).stdout
+    assert output.strip() == "[]"
+
+
+def test_warm_up_runs_steps_in_parallel_and_tolerates_failures(fake_supabase, monkeypatch, caplog):
+    from app.services import startup
+
+    async def slow():
+        await asyncio.sleep(0.05)
+
+    async def broken():
+        raise OSError("connection refused")
+
+    async def stuck():
+        await asyncio.sleep(60)
+
+    monkeypatch.setenv("STARTUP_WARMUP_TIMEOUT_SECONDS", "0.2")
+    monkeypatch.setattr(startup, "WARMUP_STEPS", {"a": slow, "b": slow, "broken": broken, "stuck": stuck})
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await startup.warm_up()
+        return loop.time() - started
+
+    with caplog.at_level(logging.WARNING, logger="app.services.startup"):
+        elapsed = asyncio.run(run())
+    assert 0.2 <= elapsed < 1
+    assert "connection refused" in caplog.text and "waiting for stuck" in caplog.text
+    assert startup.startup_timings()["warmup.a"] < 0.1
+
+
+def test_lifespan_warms_the_client_and_reports_timings(fake_supabase, monkeypatch, caplog):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    calls = []
+
+    async def warm_up():
+        calls.append("supabase")
+
+    monkeypatch.setattr(fake_supabase, "warm_up", warm_up)
+    with caplog.at_level(logging.INFO, logger="app.services.startup"), TestClient(app) as client:
+        metrics = client.get("/metrics").text
+    assert calls == ["supabase"]
+    assert "Started in" in caplog.text and "supabase" in caplog.text
+    assert 'dhanrakshak_startup_seconds{phase="imports"}' in metrics
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+from app.services import supabase_client
+
+
+def _service(monkeypatch, handler):
+    os.environ["SUPABASE_URL"] = "https://example.supabase.co"
+    os.environ["SUPABASE_SERVICE_ROLE_KEY"] = "service-key"
+    sessions = []
+
+    def pooled_session(base_url, headers, settings):
+        session = httpx.AsyncClient(base_url=base_url, headers=headers, transport=httpx.MockTransport(handler))
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(supabase_client, "_pooled_session", pooled_session)
+    return supabase_client.AsyncSupabaseService(), sessions
+
+
+def test_async_service_reuses_pooled_sessions(monkeypatch):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/filings"):
+            if "missing" in str(request.url):
+                return httpx.Response(
+                    406,
+                    json={"code": "PGRST116", "message": "no rows", "details": "The result contains 0 rows", "hint": None},
+                )
+            return httpx.Response(200, json={"id": "f1", "status": "DRAFT"})
+        if request.url.path.endswith("/audit_logs"):
+            return httpx.Response(201, json=[json.loads(request.content)])
+        return httpx.Response(404)
+
+    service, sessions = _service(monkeypatch, handler)
+
+    async def run():
+        filing = await service.get_filing("f1", "u1")
+        missing = await service.get_filing("missing", "u1")
+        await service.insert_audit("u1", "TEST", {"filing_id": "f1"})
+        await service.aclose()
+        return filing, missing
+
+    filing, missing = asyncio.run(run())
+    assert filing == {"id": "f1", "status": "DRAFT"}
+    assert missing is None
+    assert len(sessions) == 2
+    assert all(r.headers["apikey"] == "service-key" for r in requests)
+    assert sessions[0].is_closed and sessions[1].is_closed
+
+
+def test_ensure_user_upserts_once_per_profile(monkeypatch):
+    from app.auth import AuthenticatedUser
+
+    upserts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.method == "POST" and request.url.path.endswith("/users")
+        upserts.append((request.headers.get("prefer"), json.loads(request.content)))
+        return httpx.Response(201, json=[])
+
+    service, _ = _service(monkeypatch, handler)
+    user = AuthenticatedUser(user_id="u1", email="a@example.com")
+
+    async def run():
+        for _ in range(3):
+            await service.ensure_user(user)
+        await service.ensure_user(user.model_copy(update={"email": "b@example.com"}))
+
+    asyncio.run(run())
+    assert [row for _, row in upserts] == [
+        {"id": "u1", "email": "a@example.com"},
+        {"id": "u1", "email": "b@example.com"},
+    ]
+    assert "resolution=merge-duplicates" in upserts[0][0]
+
+
+def test_upload_stream_posts_chunks(monkeypatch):
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["path"] = request.url.path
+        received["headers"] = request.headers
+        received["body"] = request.read()
+        return httpx.Response(200, json={"Key": "filings/u1/f1/form16.pdf"})
+
+    service, _ = _service(monkeypatch, handler)
+
+    async def chunks():
+        for part in (b"%PDF-", b"1.4 ", b"body"):
+            yield part
+
+    asyncio.run(service.upload_stream("filings", "u1/f1/form16.pdf", chunks(), "application/pdf"))
+    assert received["path"] == "/storage/v1/object/filings/u1/f1/form16.pdf"
+    assert received["headers"]["x-upsert"] == "true"
+    assert received["body"] == b"%PDF-1.4 body"
+
+
+def test_signed_urls_are_cached_and_invalidated_by_uploads(monkeypatch):
+    signs = []
+    stored = {"dossiers/f1/dossier.zip"}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path.removeprefix("/storage/v1/object/")
+        if path.startswith("sign/"):
+            signs.append(path)
+            if path.removeprefix("sign/") not in stored:
+                return httpx.Response(400, json={"statusCode": "404", "error": "not_found", "message": "Object not found"})
+            return httpx.Response(200, json={"signedURL": f"/object/{path}?token=t{len(signs)}"})
+        stored.add(path)
+        return httpx.Response(200, json={"Key": path})
+
+    service, _ = _service(monkeypatch, handler)
+
+    async def chunks():
+        yield b"PK"
+
+    async def run():
+        urls = [await service.create_signed_url("dossiers", "f1/dossier.zip") for _ in range(3)]
+        missing = [await service.create_signed_url("dossiers", "f2/dossier.zip") for _ in range(3)]
+        await service.upload_stream("dossiers", "f2/dossier.zip", chunks(), "application/zip")
+        created = await service.create_signed_url("dossiers", "f2/dossier.zip")
+        return urls, missing, created
+
+    urls, missing, created = asyncio.run(run())
+    assert len(set(urls)) == 1 and urls[0].endswith("token=t1")
+    assert missing == [None, None, None]
+    assert created.endswith("token=t3")
+    assert signs == ["sign/dossiers/f1/dossier.zip", "sign/dossiers/f2/dossier.zip", "sign/dossiers/f2/dossier.zip"]
+
+
+def test_filing_cache_is_invalidated_by_mutations(monkeypatch):
+    reads = []
+    service = None
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "GET":
+            reads.append(request.url.path)
+            if len(reads) == 3:
+                # A write lands while this read is in flight; its result must not be cached.
+                service.invalidate_filing("f1")
+            return httpx.Response(200, json={"id": "f1", "status": f"S{len(reads)}", "documents": []})
+        return httpx.Response(200, json=[{"id": "f1"}])
+
+    service, _ = _service(monkeypatch, handler)
+
+    async def run():
+        seen = [await service.get_filing_cached("f1", "u1") for _ in range(2)]
+        assert service.cached_filing_etag("f1", "other-user") is None
+        await service.update_filing_status("f1", "u1", "ML_PARSED")
+        seen += [await service.get_filing_cached("f1", "u1") for _ in range(2)]
+        return seen
+
+    seen = asyncio.run(run())
+    assert [filing["status"] for filing, _ in seen] == ["S1", "S1", "S2", "S2"]
+    assert seen[0][1] == seen[1][1] != seen[2][1]
+    assert len(reads) == 2
+
+    async def racing_read():
+        await service.update_filing_status("f1", "u1", "FINAL")
+        await service.get_filing_cached("f1", "u1")
+        return service.cached_filing_etag("f1", "u1")
+
+    assert asyncio.run(racing_read()) is None
+
+
+def test_racing_write_is_detected_however_many_filings_are_invalidated(monkeypatch):
+    monkeypatch.setenv("FILING_CACHE_SIZE", "1")
+    service = None
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # The write to f1 lands mid-read, followed by writes to other filings that would push a
+        # size-bounded version counter for f1 out.
+        for filing_id in ("f1", "f2", "f3"):
+            service.invalidate_filing(filing_id)
+        return httpx.Response(200, json={"id": "f1", "status": "STALE", "documents": []})
+
+    service, _ = _service(monkeypatch, handler)
+    asyncio.run(service.get_filing_cached("f1", "u1"))
+    assert service.cached_filing_etag("f1", "u1") is None
+    assert service._filing_reads == {}
+
+def test_inserts_store_section_hashes(monkeypatch):
+    from app.services.blockchain import canonical_hash
+
+    rows = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        rows.append(json.loads(request.content))
+        return httpx.Response(201, json=[{"id": "row-1", **rows[-1]}])
+
+    service, _ = _service(monkeypatch, handler)
+
+    async def run():
+        await service.insert_document("f1", "u1", "u1/f1/form16.pdf", "application/pdf", sha256="ab" * 32)
+        await service.insert_ml_results("f1", "u1", {"salary": 100})
+
+    asyncio.run(run())
+    document, ml_result = rows
+    assert document["content_hash"] == canonical_hash(
+        {"document_type": "FORM16", "storage_path": "u1/f1/form16.pdf", "content_type": "application/pdf", "sha256": "ab" * 32}
+    )
+    assert ml_result["content_hash"] == canonical_hash({"parsed_json": {"salary": 100}})
+
+
+def test_list_audit_logs_builds_keyset_query(monkeypatch):
+    from datetime import datetime, timezone
+
+    params = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        params.append(request.url.params)
+        return httpx.Response(200, json=[])
+
+    service, _ = _service(monkeypatch, handler)
+    after = ("2024-05-01T10:00:00.5+00:00", "7b0c1f3e-2a4d-4d5e-9f1a-0c2b3d4e5f60")
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    asyncio.run(service.list_audit_logs(limit=50, after=after, event_type="FINALIZED", filing_id="f1", since=since))
+
+    query = params[0]
+    assert query["order"] == "created_at.desc,id.desc"
+    assert query["limit"] == "50"
+    assert query["event_type"] == "eq.FINALIZED"
+    assert query["metadata->>filing_id"] == "eq.f1"
+    assert query["created_at"] == "gte.2024-01-01T00:00:00+00:00"
+    assert query["or"] == f'(created_at.lt."{after[0]}",and(created_at.eq."{after[0]}",id.lt.{after[1]}))'
@@ -0,0 +1,87 @@
+"""Micro-benchmark for dossier PDF rendering.
+
+Compares a full ReportLab render per document ("direct") with the pre-rendered page
+templates ("template", memoization bypassed) and the memoized path ("cached").
+
+    python -m benchmarks.bench_pdf [--seconds 2]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from reportlab.lib.units import inch
+
+from app.services import pdf
+
+SUMMARY = {"filing_id": "filing-1", "status": "FINAL", "total_income": 1250000, "tax_paid": 187500}
+FULL_NAME = "Jane Doe"
+TX_HASH = "0x" + "ab" * 32
+
+
+def _direct_summary() -> bytes:
+    return pdf._render_direct(pdf._draw_summary(tuple(f"{key}: {value}" for key, value in SUMMARY.items())))
+
+
+def _direct_heatmap() -> bytes:
+    def draw(canvas) -> None:
+        canvas.setFont(pdf.FONT, 12)
+        canvas.drawString(1 * inch, 10 * inch, "Heatmap")
+        canvas.drawString(1 * inch, 9.5 * inch, "Heatmap placeholder")
+
+    return pdf._render_direct(draw)
+
+
+def _direct_certificate() -> bytes:
+    def draw(canvas) -> None:
+        canvas.setFont(pdf.FONT, 16)
+        canvas.drawCentredString(4.25 * inch, 6 * inch, FULL_NAME)
+        canvas.drawCentredString(4.25 * inch, 5.5 * inch, TX_HASH)
+
+    return pdf._render_direct(draw)
+
+
+CASES: dict[str, dict[str, Callable[[], bytes]]] = {
+    "summary": {
+        "direct": _direct_summary,
+        "template": lambda: pdf._summary_pdf.__wrapped__(tuple(f"{key}: {value}" for key, value in SUMMARY.items())),
+        "cached": lambda: pdf.create_summary_pdf(SUMMARY),
+    },
+    "heatmap": {
+        "direct": _direct_heatmap,
+        "template": lambda: pdf.create_heatmap_pdf.__wrapped__(),
+        "cached": lambda: pdf.create_heatmap_pdf(),
+    },
+    "certificate": {
+        "direct": _direct_certificate,
+        "template": lambda: pdf.create_certificate_pdf.__wrapped__(FULL_NAME, TX_HASH),
+        "cached": lambda: pdf.create_certificate_pdf(FULL_NAME, TX_HASH),
+    },
+}
+
+
+def renders_per_second(fn: Callable[[], bytes], seconds: float) -> float:
+    fn()  # warm templates and caches
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        fn()
+        count += 1
+    return count / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="time spent per case")
+    args = parser.parse_args()
+
+    print(f"{'document':<12} {'direct/s':>12} {'template/s':>12} {'cached/s':>14}")
+    for name, variants in CASES.items():
+        assert variants["direct"]() == variants["template"]() == variants["cached"]()
+        rates = {variant: renders_per_second(fn, args.seconds) for variant, fn in variants.items()}
+        print(f"{name:<12} {rates['direct']:>12,.0f} {rates['template']:>12,.0f} {rates['cached']:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
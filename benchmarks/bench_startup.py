@@ -0,0 +1,159 @@
+"""Cold-start benchmark: import time, lifespan warm-up and time to the first request.
+
+Each run starts a fresh interpreter, imports ``app.main``, runs the lifespan against ``FakeSupabase``
+with ``--latency-ms`` added to every backend call (the warm-up included) and sends one authenticated
+request through the ASGI app in-process. The first backend call also pays ``--connect-ms``, standing
+in for the DNS, TCP and TLS setup of a real cold connection, so warm-up shows up as time moved from
+the first request into the lifespan.
+
+    python -m benchmarks.bench_startup [--runs 10] [--latency-ms 20] [--connect-ms 150]
+                                       [--output results.json] [--compare earlier.json]
+
+Per-phase p50/p95 are printed and written as JSON to ``benchmarks/results/`` (or ``--output``), along
+with which heavy optional dependencies were loaded by the import.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from benchmarks.common import load_results, percentile, write_results
+
+PHASES = ("interpreter", "import", "lifespan", "first_request", "time_to_first_request")
+# Should stay out of sys.modules until a request needs them.
+HEAVY_MODULES = ("reportlab", "supabase", "psycopg2")
+
+
+def _child(latency_ms: float, connect_ms: float) -> dict[str, Any]:
+    """Runs in the fresh interpreter; keep this module's top-level imports to the standard library."""
+    started = time.perf_counter()
+    os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-key")
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    os.environ.setdefault("DOSSIER_JOB_STORE", "sqlite")
+    os.environ.setdefault("DOSSIER_JOB_DB_PATH", ":memory:")
+    os.environ.pop("SUPABASE_DB_URL", None)
+
+    from app.main import app
+
+    imported = time.perf_counter()
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    import asyncio
+
+    import httpx
+    import jwt
+
+    from app.services import supabase_client
+    from app.tests.fakes import FakeSupabase
+    from benchmarks.bench_workflow import LatencyBackend
+
+    class ColdBackend(LatencyBackend):
+        connect = connect_ms / 1000
+
+        def _delay(self) -> float:
+            delay, self.connect = super()._delay() + self.connect, 0.0
+            return delay
+
+    supabase_client._supabase_service = ColdBackend(FakeSupabase(), latency_ms / 1000)
+    token = jwt.encode({"sub": "bench-user", "email": "bench@example.com"}, "bench-secret", algorithm="HS256")
+
+    async def run() -> tuple[float, float, int]:
+        lifespan_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                response = await client.post("/auth/init", headers={"Authorization": f"Bearer {token}"})
+            answered = time.perf_counter()
+        return ready - lifespan_started, answered - ready, response.status_code
+
+    # Setting up the fake backend is not part of the app's start, so it is left out of the total.
+    setup = time.perf_counter() - imported
+    lifespan, first_request, status = asyncio.run(run())
+    return {
+        "wall_clock": time.time(),
+        "import": imported - started,
+        "lifespan": lifespan,
+        "first_request": first_request,
+        "time_to_first_request": imported - started + lifespan + first_request,
+        "setup": setup,
+        "status": status,
+        "loaded_modules": loaded,
+    }
+
+
+def measure_once(latency_ms: float = 20.0, connect_ms: float = 150.0) -> dict[str, Any]:
+    spawned = time.time()
+    command = ["--child", "--latency-ms", str(latency_ms), "--connect-ms", str(connect_ms)]
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", *command],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    ).stdout
+    sample = json.loads(output.strip().splitlines()[-1])
+    # Interpreter start-up is whatever of the wall-clock span the child did not measure itself.
+    child_span = sample["import"] + sample["setup"] + sample["lifespan"] + sample["first_request"]
+    sample["interpreter"] = max(0.0, sample.pop("wall_clock") - spawned - child_span)
+    return sample
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(1000 * percentile(samples, 50), 2),
+        "p95_ms": round(1000 * percentile(samples, 95), 2),
+        "min_ms": round(1000 * min(samples), 2) if samples else 0.0,
+        "max_ms": round(1000 * max(samples), 2) if samples else 0.0,
+    }
+
+
+def run_benchmark(runs: int = 10, latency_ms: float = 20.0, connect_ms: float = 150.0) -> dict[str, Any]:
+    samples = [measure_once(latency_ms, connect_ms) for _ in range(runs)]
+    return {
+        "config": {"runs": runs, "latency_ms": latency_ms, "connect_ms": connect_ms},
+        "errors": sum(1 for sample in samples if sample["status"] >= 400),
+        "loaded_modules": sorted({name for sample in samples for name in sample["loaded_modules"]}),
+        "phases": {phase: _summary([sample[phase] for sample in samples]) for phase in PHASES},
+    }
+
+
+def _print_results(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    print(f"{results['config']['runs']} cold starts, {results['errors']} failed first requests")
+    print(f"heavy modules loaded by import: {', '.join(results['loaded_modules']) or 'none'}")
+    header = f"{'phase':<22} {'p50 ms':>9} {'p95 ms':>9} {'min ms':>9} {'max ms':>9}"
+    print(header + (f" {'p50 vs base':>12}" if baseline else ""))
+    for phase, stats in results["phases"].items():
+        line = f"{phase:<22} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['min_ms']:>9.1f} {stats['max_ms']:>9.1f}"
+        before = (baseline or {}).get("phases", {}).get(phase)
+        if before and before["p50_ms"]:
+            line += f" {100 * (stats['p50_ms'] / before['p50_ms'] - 1):>+11.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="cold starts to measure")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="latency added to every backend call")
+    parser.add_argument("--connect-ms", type=float, default=150.0, help="extra latency on the first backend call")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/...)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare p50 against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_child(args.latency_ms, args.connect_ms)))
+        return
+    results = run_benchmark(runs=args.runs, latency_ms=args.latency_ms, connect_ms=args.connect_ms)
+    _print_results(results, load_results(args.compare) if args.compare else None)
+    print(f"Results written to {write_results('startup', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""Load test for the full filing workflow.
+
+Each workflow is auth init -> filing create -> upload -> ml-results -> finalize -> generate-dossier ->
+report download, sent through the ASGI app in-process by ``--concurrency`` workers. The backend is
+``FakeSupabase`` with ``--latency-ms`` (± ``--jitter-ms``) injected before every call. With
+``--database-url`` the finalize transaction runs against that Postgres, which must already be migrated
+(``python -m app.services.migrations``).
+
+    python -m benchmarks.bench_workflow [--workflows 200] [--concurrency 20] [--latency-ms 5]
+                                        [--output results.json] [--compare earlier.json]
+
+Per-endpoint throughput and p50/p95/p99 latency are printed and written as JSON to
+``benchmarks/results/`` (or ``--output``).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import inspect
+import logging
+import os
+import random
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+import jwt
+from psycopg2.extras import Json
+
+from benchmarks.common import latency_summary, load_results, write_results
+
+STEPS = ("auth_init", "filing_create", "upload", "ml_results", "finalize", "generate_dossier", "report_download")
+
+
+class LatencyBackend:
+    """Proxy over a fake backend that sleeps ``latency`` (± ``jitter``) seconds before every async call."""
+
+    def __init__(self, backend: Any, latency: float = 0.0, jitter: float = 0.0, seed: int = 0) -> None:
+        self._backend = backend
+        self.latency = latency
+        self.jitter = jitter
+        self.calls: Counter[str] = Counter()
+        self._random = random.Random(seed)
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._backend, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def delayed(*args: Any, **kwargs: Any) -> Any:
+            self.calls[name] += 1
+            delay = self._delay()
+            if delay:
+                await asyncio.sleep(delay)
+            return await attr(*args, **kwargs)
+
+        return delayed
+
+
+def _mirrored_fake() -> Any:
+    """A FakeSupabase that also writes users and filings to Postgres, so the real finalize finds them."""
+    from app.services.db import get_db_pool
+    from app.tests.fakes import FakeSupabase
+
+    def insert_user(conn: Any, user_id: str) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute("INSERT INTO users (id) VALUES (%s) ON CONFLICT (id) DO NOTHING", (user_id,))
+
+    def insert_filing(conn: Any, filing: dict[str, Any]) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO filings (id, user_id, status, metadata) VALUES (%s, %s, %s, %s)",
+                (filing["id"], filing["user_id"], filing["status"], Json(filing["metadata"])),
+            )
+
+    class MirroredFake(FakeSupabase):
+        async def ensure_user(self, user):
+            if user.user_id not in self.users:
+                await get_db_pool().run(insert_user, user.user_id)
+            await super().ensure_user(user)
+
+        async def create_filing(self, user, metadata):
+            filing = await super().create_filing(user, metadata)
+            await get_db_pool().run(insert_filing, filing)
+            return filing
+
+    return MirroredFake()
+
+
+def _finalize_into(fake: Any, real: Callable[..., Awaitable[None]] | None) -> Callable[..., Awaitable[None]]:
+    async def finalize_filing_transaction(filing_id, user_id, tx_hash, payload_hash, **columns):
+        if real is not None:
+            await real(filing_id, user_id, tx_hash, payload_hash, **columns)
+        fake.blockchain[filing_id] = {
+            "filing_id": filing_id,
+            "user_id": user_id,
+            "tx_hash": tx_hash,
+            "payload_hash": payload_hash,
+            **columns,
+        }
+        fake.filings[filing_id]["status"] = "FINAL"
+
+    return finalize_filing_transaction
+
+
+class _StepFailed(Exception):
+    pass
+
+
+async def run_workflow(
+    client: httpx.AsyncClient,
+    secret: str,
+    form16: bytes,
+    timings: dict[str, list[float]],
+    errors: Counter[str],
+) -> None:
+    user_id = str(uuid.uuid4())
+    token = jwt.encode({"sub": user_id, "email": f"{user_id}@example.com"}, secret, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def call(step: str, method: str, url: str, **kwargs: Any) -> dict[str, Any]:
+        start = time.perf_counter()
+        response = await client.request(method, url, headers=headers, **kwargs)
+        timings[step].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            errors[step] += 1
+            raise _StepFailed(step)
+        return response.json()
+
+    try:
+        await call("auth_init", "POST", "/auth/init")
+        filing = await call("filing_create", "POST", "/filing/create", json={"metadata": {"full_name": "Bench User"}})
+        filing_id = filing["id"]
+        await call(
+            "upload",
+            "POST",
+            f"/documents/upload?filing_id={filing_id}",
+            files={"file": ("form16.pdf", form16, "application/pdf")},
+        )
+        await call(
+            "ml_results",
+            "POST",
+            "/ml-results",
+            json={"filing_id": filing_id, "parsed_json": {"income": 1250000}, "risk_flags": {"income": "green"}},
+        )
+        await call("finalize", "POST", "/finalize", json={"filing_id": filing_id})
+        await call("generate_dossier", "POST", "/generate-dossier", json={"filing_id": filing_id})
+        await call("report_download", "GET", f"/reports/download/{filing_id}")
+    except _StepFailed:
+        pass
+
+
+async def run_benchmark(
+    workflows: int = 200,
+    concurrency: int = 20,
+    latency_ms: float = 5.0,
+    jitter_ms: float = 0.0,
+    warmup: int = 5,
+    upload_kb: int = 64,
+    database_url: str | None = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    os.environ.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-key")
+    os.environ.setdefault("JWT_SECRET", "bench-secret")
+    os.environ.setdefault("DOSSIER_JOB_STORE", "sqlite")
+    os.environ.setdefault("DOSSIER_JOB_DB_PATH", ":memory:")
+    if database_url:
+        os.environ["SUPABASE_DB_URL"] = database_url
+    else:
+        os.environ.pop("SUPABASE_DB_URL", None)
+
+    from app.config import get_settings
+    from app.main import app
+    from app.routers import finalize as finalize_router
+    from app.services import supabase_client, transactions
+    from app.tests.fakes import FakeSupabase
+
+    get_settings.cache_clear()
+    secret = get_settings().jwt_secret
+    form16 = b"%PDF-1.4\n" + random.Random(seed).randbytes(upload_kb * 1024)
+    fake = _mirrored_fake() if database_url else FakeSupabase()
+    backend = LatencyBackend(fake, latency_ms / 1000, jitter_ms / 1000, seed=seed)
+    real_finalize = transactions.finalize_filing_transaction
+    previous_service = supabase_client._supabase_service
+    supabase_client._supabase_service = backend
+    finalize_router.finalize_filing_transaction = _finalize_into(fake, real_finalize if database_url else None)
+
+    timings: dict[str, list[float]] = {step: [] for step in STEPS}
+    errors: Counter[str] = Counter()
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for _ in range(warmup):
+                    await run_workflow(client, secret, form16, {step: [] for step in STEPS}, Counter())
+                backend.calls.clear()
+
+                pending = iter(range(workflows))
+
+                async def worker() -> None:
+                    for _ in pending:
+                        await run_workflow(client, secret, form16, timings, errors)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+                elapsed = time.perf_counter() - start
+    finally:
+        finalize_router.finalize_filing_transaction = real_finalize
+        supabase_client._supabase_service = previous_service
+        get_settings.cache_clear()
+
+    return {
+        "config": {
+            "workflows": workflows,
+            "concurrency": concurrency,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "warmup": warmup,
+            "upload_kb": upload_kb,
+            "backend": "postgres" if database_url else "fake",
+            "seed": seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "workflows_per_s": round(workflows / elapsed, 2) if elapsed else 0.0,
+        "errors": dict(errors),
+        "backend_calls": dict(backend.calls),
+        "endpoints": {step: latency_summary(samples, elapsed) for step, samples in timings.items()},
+    }
+
+
+def _print_results(results: dict[str, Any], baseline: dict[str, Any] | None) -> None:
+    print(f"{results['config']['workflows']} workflows in {results['elapsed_s']}s ({results['workflows_per_s']} workflows/s)")
+    header = f"{'endpoint':<18} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    print(header + (f" {'p95 vs base':>12}" if baseline else ""))
+    for step, stats in results["endpoints"].items():
+        line = (
+            f"{step:<18} {stats['throughput_per_s']:>9.1f} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f}"
+            f" {stats['p99_ms']:>9.2f} {results['errors'].get(step, 0):>7}"
+        )
+        before = (baseline or {}).get("endpoints", {}).get(step)
+        if before and before["p95_ms"]:
+            line += f" {100 * (stats['p95_ms'] / before['p95_ms'] - 1):>+11.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workflows", type=int, default=200, help="measured workflows")
+    parser.add_argument("--concurrency", type=int, default=20, help="workflows in flight at once")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="latency added to every backend call")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="uniform jitter around --latency-ms")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured workflows run first")
+    parser.add_argument("--upload-kb", type=int, default=64, help="size of the uploaded Form-16")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the latency jitter")
+    parser.add_argument("--database-url", help="run the finalize transaction against this migrated Postgres")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/...)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to compare p95 latency against")
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    results = asyncio.run(
+        run_benchmark(
+            workflows=args.workflows,
+            concurrency=args.concurrency,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            warmup=args.warmup,
+            upload_kb=args.upload_kb,
+            database_url=args.database_url,
+            seed=args.seed,
+        )
+    )
+    _print_results(results, load_results(args.compare) if args.compare else None)
+    print(f"Results written to {write_results('workflow', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Helpers shared by the benchmarks: latency summaries and JSON result files."""
+from __future__ import annotations
+
+import json
+import math
+import platform
+import subprocess
+import time
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``; 0.0 when there are none."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def latency_summary(samples: list[float], elapsed: float) -> dict[str, float]:
+    """Throughput and latency percentiles, in requests per second and milliseconds."""
+    return {
+        "count": len(samples),
+        "throughput_per_s": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(1000 * sum(samples) / len(samples), 3) if samples else 0.0,
+        "p50_ms": round(1000 * percentile(samples, 50), 3),
+        "p95_ms": round(1000 * percentile(samples, 95), 3),
+        "p99_ms": round(1000 * percentile(samples, 99), 3),
+        "max_ms": round(1000 * max(samples), 3) if samples else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def write_results(name: str, results: dict[str, Any], output: Path | None = None) -> Path:
+    """Write ``results`` with run metadata to ``output``, or to ``results/<name>-<commit>-<time>.json``."""
+    commit = git_commit()
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    document = {
+        "benchmark": name,
+        "commit": commit,
+        "timestamp": stamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **results,
+    }
+    if output is None:
+        output = RESULTS_DIR / f"{name}-{commit or 'nocommit'}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+    return output
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text())
@@ -0,0 +1,22 @@
+-- Background dossier generation jobs (POST /generate-dossier). Databases created from a later
+-- schema.sql already have the table, so every statement tolerates it existing.
+CREATE TABLE IF NOT EXISTS dossier_jobs (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid REFERENCES users(id) NOT NULL,
+  filing_id uuid REFERENCES filings(id) NOT NULL,
+  status text NOT NULL,
+  inputs jsonb NOT NULL,
+  dossier_path text,
+  error text,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+ALTER TABLE dossier_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS select_own_dossier_jobs ON dossier_jobs;
+CREATE POLICY select_own_dossier_jobs ON dossier_jobs
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- The grant in 0001 only covered the tables that existed at the time.
+GRANT ALL ON dossier_jobs TO authenticated;
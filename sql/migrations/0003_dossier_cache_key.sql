@@ -0,0 +1,2 @@
+-- Content address of the stored dossier, so an unchanged filing is not rendered again.
+ALTER TABLE blockchain_records ADD COLUMN IF NOT EXISTS dossier_key text;
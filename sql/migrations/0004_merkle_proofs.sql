@@ -0,0 +1,3 @@
+-- Filings anchored in a Merkle batch store the batch root and their inclusion proof.
+ALTER TABLE blockchain_records ADD COLUMN IF NOT EXISTS merkle_root text;
+ALTER TABLE blockchain_records ADD COLUMN IF NOT EXISTS merkle_proof jsonb;
@@ -0,0 +1,7 @@
+-- Versioned payload hashing: per-section hashes on the anchor record and content hashes on the rows
+-- they are computed from. Existing records keep hash_version 1.
+ALTER TABLE blockchain_records ADD COLUMN IF NOT EXISTS hash_version integer NOT NULL DEFAULT 1;
+ALTER TABLE blockchain_records ADD COLUMN IF NOT EXISTS section_hashes jsonb;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS sha256 text;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS content_hash text;
+ALTER TABLE ml_results ADD COLUMN IF NOT EXISTS content_hash text;
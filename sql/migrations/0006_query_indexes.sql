@@ -0,0 +1,19 @@
+-- Indexes for the hot read paths. Every per-filing query filters on (filing_id, user_id), and the RLS
+-- policies add user_id = auth.uid() to each of them.
+CREATE INDEX IF NOT EXISTS filings_user_id_idx ON filings (user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS documents_filing_user_idx ON documents (filing_id, user_id);
+CREATE INDEX IF NOT EXISTS ml_results_filing_user_created_at_idx ON ml_results (filing_id, user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS risk_flags_user_id_idx ON risk_flags (user_id);
+CREATE INDEX IF NOT EXISTS blockchain_records_filing_user_created_at_idx
+  ON blockchain_records (filing_id, user_id, created_at DESC);
+
+-- Job recovery looks up QUEUED jobs and RUNNING jobs not updated for a while.
+CREATE INDEX IF NOT EXISTS dossier_jobs_status_updated_at_idx ON dossier_jobs (status, updated_at);
+CREATE INDEX IF NOT EXISTS dossier_jobs_user_id_idx ON dossier_jobs (user_id);
+
+-- Keyset pagination on (created_at, id), alone or behind an equality filter.
+CREATE INDEX IF NOT EXISTS audit_logs_created_at_id_idx ON audit_logs (created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS audit_logs_user_created_at_idx ON audit_logs (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS audit_logs_event_created_at_idx ON audit_logs (event_type, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS audit_logs_filing_created_at_idx
+  ON audit_logs ((metadata->>'filing_id'), created_at DESC, id DESC);
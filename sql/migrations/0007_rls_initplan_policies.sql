@@ -0,0 +1,36 @@
+-- Wrap auth.uid() in a sub-select so Postgres evaluates it once per statement (as an InitPlan)
+-- instead of once per row, and the user_id comparison can use an index.
+ALTER POLICY select_own_filings ON filings
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_filings ON filings
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY update_own_filings ON filings
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_documents ON documents
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_documents ON documents
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY update_own_documents ON documents
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY delete_own_documents ON documents
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_ml_results ON ml_results
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_ml_results ON ml_results
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_risk_flags ON risk_flags
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_risk_flags ON risk_flags
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY update_own_risk_flags ON risk_flags
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_blockchain_records ON blockchain_records
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_blockchain_records ON blockchain_records
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_audit_logs ON audit_logs
+  USING ((SELECT auth.uid()) = user_id);
+ALTER POLICY insert_own_audit_logs ON audit_logs
+  WITH CHECK ((SELECT auth.uid()) = user_id);
+ALTER POLICY select_own_dossier_jobs ON dossier_jobs
+  USING ((SELECT auth.uid()) = user_id);
@@ -0,0 +1,20 @@
+-- Stored outcomes of mutating requests sent with an Idempotency-Key header, so retries replay the
+-- first response instead of redoing the work. Written only by the backend's service role.
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  user_id uuid NOT NULL,
+  key text NOT NULL,
+  request_hash text NOT NULL,
+  body_hash text,
+  status text NOT NULL,
+  response_status integer,
+  response_headers jsonb,
+  response_body text,
+  created_at timestamptz DEFAULT now(),
+  expires_at timestamptz NOT NULL,
+  PRIMARY KEY (user_id, key)
+);
+
+CREATE INDEX IF NOT EXISTS idempotency_keys_expires_at_idx ON idempotency_keys (expires_at);
+
+-- No policies: only the service role, which bypasses RLS, may read or write keys.
+ALTER TABLE idempotency_keys ENABLE ROW LEVEL SECURITY;